@@ -0,0 +1,116 @@
+"""
+Compara los parsers de DataLoader ('c' de pandas vs 'pyarrow') sobre CSV
+sintéticos de distintos tamaños.
+
+Uso (desde la carpeta backend):
+    python -m benchmarks.csv_parsing --sizes-mb 100 500 2000 --repeats 3
+
+Los archivos se generan en una carpeta temporal y se borran al terminar.
+Con --dirty se agrega una fila con texto en columnas numéricas ('noventa'
+en promedio_actual, 'Sí' en riesgo): Arrow deja esas columnas como texto
+sin volver a leer el archivo con el parser de pandas.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.config import REQUIRED_COLUMNS
+from src.data.data_loader import DataLoader, PYARROW_AVAILABLE
+
+
+def synthetic_block(rows=100_000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'promedio_actual': rng.uniform(0, 100, rows).round(2),
+        'asistencia_clases': rng.uniform(0, 100, rows).round(2),
+        'tareas_entregadas': rng.uniform(0, 100, rows).round(2),
+        'participacion_clase': rng.uniform(0, 100, rows).round(2),
+        'horas_estudio': rng.uniform(0, 24, rows).round(2),
+        'promedio_evaluaciones': rng.uniform(0, 100, rows).round(2),
+        'cursos_reprobados': rng.integers(0, 6, rows),
+        'actividades_extracurriculares': rng.integers(0, 5, rows),
+        'reportes_disciplinarios': rng.integers(0, 4, rows),
+        'riesgo': rng.integers(0, 2, rows),
+    })
+    return df[REQUIRED_COLUMNS]
+
+
+def write_csv_of_size(path, size_mb, dirty=False):
+    """
+    Escribe bloques repetidos hasta alcanzar size_mb. Devuelve las filas escritas.
+    """
+    block = synthetic_block()
+    body = block.to_csv(index=False, header=False)
+    header = ",".join(REQUIRED_COLUMNS) + "\n"
+
+    target = size_mb * 1024 * 1024
+    rows = 0
+    with open(path, "w") as f:
+        f.write(header)
+        if dirty:
+            # Una fila con texto en columnas numéricas
+            f.write("noventa," + ",".join(["1"] * (len(REQUIRED_COLUMNS) - 2)) + ",Sí\n")
+            rows += 1
+        while f.tell() < target:
+            f.write(body)
+            rows += len(block)
+    return rows
+
+
+def time_parser(loader, path, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        df = loader.read_csv(path)
+        best = min(best, time.perf_counter() - t0)
+        del df
+    return best, loader.last_parser_used
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de parsers de CSV")
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--dirty", action="store_true")
+    args = parser.parse_args()
+
+    if not PYARROW_AVAILABLE:
+        print(" pyarrow no está instalado: pip install pyarrow")
+        return
+
+    tmp_dir = tempfile.mkdtemp(prefix="csv_bench_")
+    loaders = {
+        'c': DataLoader(tmp_dir, parser='c'),
+        'pyarrow': DataLoader(tmp_dir, parser='pyarrow'),
+    }
+
+    print("=" * 72)
+    print(f" {'Tamaño':>8} {'Filas':>12} {'Parser':>10} {'Usado':>8} {'Tiempo':>10} {'MB/s':>10}")
+    print("=" * 72)
+
+    try:
+        for size_mb in args.sizes_mb:
+            path = os.path.join(tmp_dir, f"bench_{size_mb}mb.csv")
+            rows = write_csv_of_size(path, size_mb, dirty=args.dirty)
+            real_mb = os.path.getsize(path) / (1024 * 1024)
+
+            results = {}
+            for name, loader in loaders.items():
+                seconds, used = time_parser(loader, path, args.repeats)
+                results[name] = seconds
+                print(f" {real_mb:>6.0f}MB {rows:>12,} {name:>10} {used:>8} "
+                      f"{seconds:>9.2f}s {real_mb / seconds:>10.1f}")
+
+            print(f" {'':>8} {'':>12} {'speedup':>10} {'':>8} {results['c'] / results['pyarrow']:>9.2f}x")
+            os.remove(path)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Tiempo de la validación cruzada (src/ml/cross_validation.py) contra un
+presupuesto de reloj.
+
+Por cada tamaño de dataset corre la validación cruzada con n_jobs=1 y con
+los núcleos pedidos, y reporta el tiempo de los folds, el del bootstrap y
+el total. También compara el bootstrap vectorizado (multinomial sobre la
+matriz de confusión) con el bootstrap clásico que remuestrea índices de
+filas: los intervalos deben coincidir dentro del ruido de Monte Carlo.
+
+Uso (desde la carpeta backend):
+    python -m benchmarks.cv_budget --rows 2000 20000 100000 --budget-s 10
+    python -m benchmarks.cv_budget --engine random_forest --n-jobs 4
+
+Termina con código 1 si alguna corrida supera el presupuesto.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.config import FEATURE_COLUMNS, TARGET_COLUMN
+from src.ml.cross_validation import (
+    DEFAULT_CONFIDENCE,
+    DEFAULT_FOLDS,
+    DEFAULT_RESAMPLES,
+    METRIC_NAMES,
+    bootstrap_intervals,
+    cross_validate,
+    out_of_fold_predictions
+)
+from benchmarks.solver_convergence import synthetic_dataset
+
+
+def index_bootstrap(y_true, y_pred, n_resamples, confidence, seed=0):
+    """
+    Bootstrap clásico: remuestrea índices de filas (O(n) por remuestreo).
+    """
+    rng = np.random.default_rng(seed)
+    n = len(y_true)
+    samples = {name: np.empty(n_resamples) for name in METRIC_NAMES}
+    for b in range(n_resamples):
+        idx = rng.integers(0, n, n)
+        t, p = y_true[idx], y_pred[idx]
+        tp = np.sum((p == 1) & (t == 1))
+        fp = np.sum((p == 1) & (t == 0))
+        fn = np.sum((p == 0) & (t == 1))
+        tn = n - tp - fp - fn
+        precision = tp / (tp + fp) if tp + fp else 0.0
+        recall = tp / (tp + fn) if tp + fn else 0.0
+        samples["accuracy"][b] = (tp + tn) / n
+        samples["precision"][b] = precision
+        samples["recall"][b] = recall
+        samples["f1_score"][b] = (2 * precision * recall / (precision + recall)
+                                  if precision + recall else 0.0)
+    alpha = (1 - confidence) / 2
+    return {name: np.quantile(samples[name], [alpha, 1 - alpha]) for name in METRIC_NAMES}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validación cruzada vs presupuesto de tiempo")
+    parser.add_argument("--rows", type=int, nargs="+", default=[2_000, 20_000, 100_000])
+    parser.add_argument("--engine", default="logistic_regression")
+    parser.add_argument("--folds", type=int, default=DEFAULT_FOLDS)
+    parser.add_argument("--resamples", type=int, default=DEFAULT_RESAMPLES)
+    parser.add_argument("--n-jobs", type=int, default=-1, help="procesos para los folds")
+    parser.add_argument("--budget-s", type=float, default=10.0, help="presupuesto por corrida")
+    args = parser.parse_args()
+
+    hyperparams = {"engine": args.engine}
+    over_budget = []
+
+    print("\n" + "=" * 78)
+    print(f" {args.engine} | {args.folds} folds | {args.resamples} remuestreos | "
+          f"presupuesto {args.budget_s:.1f} s")
+    print(f" {'Filas':>8} {'n_jobs':>7} {'Folds':>9} {'Bootstrap':>10} {'Total':>9} {'F1 [IC]':>26}")
+    print("=" * 78)
+
+    for rows in args.rows:
+        df = synthetic_dataset(rows)
+        X = df[FEATURE_COLUMNS].values
+        y = df[TARGET_COLUMN].values
+
+        for n_jobs in dict.fromkeys([1, args.n_jobs]):
+            start = time.perf_counter()
+            cv = cross_validate(X, y, hyperparams, folds=args.folds,
+                                n_resamples=args.resamples, n_jobs=n_jobs)
+            total = time.perf_counter() - start
+            f1 = cv["out_of_fold"]["f1_score"]
+            ci = cv["confidence_intervals"]["f1_score"]
+            print(f" {rows:>8} {n_jobs:>7} {cv['folds_time_s']:>8.3f}s "
+                  f"{cv['bootstrap_time_s'] * 1000:>8.2f}ms {total:>8.3f}s "
+                  f"{f1:>8.3f} [{ci['low']:.3f}, {ci['high']:.3f}]")
+            if total > args.budget_s:
+                over_budget.append(f"{rows} filas, n_jobs={n_jobs}: {total:.2f} s")
+
+    # Bootstrap vectorizado vs remuestreo de índices sobre el último dataset
+    y_pred, _ = out_of_fold_predictions(X, y, hyperparams, args.folds, args.n_jobs)
+    start = time.perf_counter()
+    fast = bootstrap_intervals(y, y_pred, args.resamples, DEFAULT_CONFIDENCE)
+    fast_time = time.perf_counter() - start
+    start = time.perf_counter()
+    slow = index_bootstrap(y, y_pred, args.resamples, DEFAULT_CONFIDENCE)
+    slow_time = time.perf_counter() - start
+
+    print(f"\n Bootstrap con {rows} filas: vectorizado {fast_time * 1000:.2f} ms, "
+          f"por índices {slow_time * 1000:.1f} ms ({slow_time / fast_time:.0f}x)")
+    for name in METRIC_NAMES:
+        print(f"   {name:>10}: [{fast[name]['low']:.4f}, {fast[name]['high']:.4f}] vs "
+              f"[{slow[name][0]:.4f}, {slow[name][1]:.4f}]")
+
+    if over_budget:
+        print(f"\n Fuera del presupuesto de {args.budget_s:.1f} s:")
+        for line in over_budget:
+            print(f"   - {line}")
+        raise SystemExit(1)
+
+    print(f"\n Todas las corridas dentro del presupuesto de {args.budget_s:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
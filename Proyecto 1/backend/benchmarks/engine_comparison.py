@@ -0,0 +1,48 @@
+"""
+Compara los motores de modelo (regresión logística, gradient boosting sobre
+histogramas y bosque aleatorio) para elegir uno según el presupuesto de
+latencia.
+
+Uso (desde la carpeta backend):
+    python -m benchmarks.engine_comparison --rows 50000
+    python -m benchmarks.engine_comparison --csv datos_limpios.csv --n-jobs 4
+
+Reporta por motor: tiempo de ajuste, latencia de predict_proba para una
+fila y para 10k filas, tamaño del artefacto (joblib) y F1 en test. No
+guarda nada en el registro de modelos.
+"""
+import argparse
+
+import pandas as pd
+
+from src.ml.engines import MODEL_ENGINES
+from src.ml.training import compare_engines
+from benchmarks.solver_convergence import synthetic_dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparación de motores de modelo")
+    parser.add_argument("--csv", help="CSV limpio (por defecto datos sintéticos)")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--engines", nargs="+", default=list(MODEL_ENGINES))
+    parser.add_argument("--n-jobs", type=int, default=-1, help="n_jobs del bosque aleatorio")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv) if args.csv else synthetic_dataset(args.rows)
+    report = compare_engines(df, args.engines, {"random_forest": {"n_jobs": args.n_jobs}})
+
+    print("\n" + "=" * 84)
+    print(f" {report['n_train']} filas de entrenamiento | {report['n_test']} de prueba")
+    print(f" {'Motor':>24} {'Ajuste':>9} {'1 fila':>10} {'10k filas':>11} {'Tamaño':>10} {'F1':>7}")
+    print("=" * 84)
+    for r in report["engines"]:
+        print(f" {r['engine']:>24} {r['fit_time_s']:>8.3f}s {r['single_row_ms']:>8.3f}ms "
+              f"{r['batch_10k_ms']:>9.2f}ms {r['artifact_size_bytes'] / 1024:>8.1f}KB {r['f1_score']:>7.3f}")
+
+    print(f"\n Mejor F1: {report['best_f1']} | "
+          f"más rápido (1 fila): {report['fastest_single_row']} | "
+          f"más rápido (10k filas): {report['fastest_batch_10k']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Mide cuánto agrega calcular las contribuciones por feature (explain) a
+predict_batch, para una fila y para lotes grandes.
+
+Uso (desde la carpeta backend):
+    python -m benchmarks.explain_overhead --batch-sizes 1 64 10000 --repeats 200
+
+Entrena un modelo sobre datos sintéticos en una carpeta temporal (no toca
+saved_models/ del backend) y compara:
+
+- el cálculo vectorizado (score_matrix vs score_matrix_explained + ranking)
+- predict_batch completo sin explain, con explain=3 (top-3) y con
+  explain=True (todas las features), incluyendo armar los diccionarios
+  de la respuesta
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from src.config import FEATURE_COLUMNS, TARGET_COLUMN
+from benchmarks.solver_convergence import synthetic_dataset
+
+
+def best_time(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Costo de explain en predict_batch")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 64, 10_000])
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix="explain_bench_")
+    previous_dir = os.getcwd()
+    os.chdir(tmp_dir)
+
+    try:
+        # El registro usa rutas relativas: el modelo queda en la carpeta temporal
+        from src.ml.model_registry import registry
+        from src.ml.prediction import (
+            predict_batch,
+            rank_contributions,
+            score_matrix,
+            score_matrix_explained,
+        )
+        from src.ml.training import build_pipeline
+
+        df = synthetic_dataset(20_000)
+        model = build_pipeline()
+        model.fit(df[FEATURE_COLUMNS].to_numpy(dtype=np.float64), df[TARGET_COLUMN].to_numpy())
+        registry.save_model(model)
+
+        rng = np.random.default_rng(1)
+        X_all = df[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+
+        def explained_kernel(X):
+            _, _, contributions, _ = score_matrix_explained(model, X, 0.5)
+            rank_contributions(contributions, 3)
+
+        print("=" * 72)
+        print(" Cálculo vectorizado (probabilidad vs probabilidad + contribuciones top-3)")
+        print(f" {'Filas':>8} {'Sin explain':>14} {'Con explain':>14} {'Overhead':>10}")
+        print("=" * 72)
+
+        for size in args.batch_sizes:
+            X = X_all[rng.integers(0, len(X_all), size)]
+            repeats = max(3, args.repeats // max(1, size // 64))
+
+            base = best_time(lambda: score_matrix(model, X, 0.5), repeats)
+            explained = best_time(lambda: explained_kernel(X), repeats)
+
+            print(f" {size:>8} {base * 1000:>12.3f}ms {explained * 1000:>12.3f}ms "
+                  f"{100 * (explained - base) / base:>+9.1f}%")
+
+        print("\n" + "=" * 72)
+        print(" predict_batch completo (incluye armar la respuesta)")
+        print(f" {'Filas':>8} {'Sin explain':>14} {'Top-3':>14} {'Todas':>14} {'Overhead':>10}")
+        print("=" * 72)
+
+        for size in args.batch_sizes:
+            rows = X_all[rng.integers(0, len(X_all), size)].tolist()
+            repeats = max(3, args.repeats // max(1, size // 64))
+
+            base = best_time(lambda: predict_batch(rows), repeats)
+            top3 = best_time(lambda: predict_batch(rows, explain=3), repeats)
+            full = best_time(lambda: predict_batch(rows, explain=True), repeats)
+
+            print(f" {size:>8} {base * 1000:>12.3f}ms {top3 * 1000:>12.3f}ms "
+                  f"{full * 1000:>12.3f}ms {100 * (top3 - base) / base:>+9.1f}%")
+    finally:
+        os.chdir(previous_dir)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
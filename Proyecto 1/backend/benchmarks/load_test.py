@@ -0,0 +1,149 @@
+"""
+Prueba de carga con tráfico mixto contra un servidor en ejecución.
+
+Varios hilos llaman /api/predict sin parar mientras otro hilo repite
+subida + limpieza + entrenamiento. Al final se reporta throughput y
+latencias (p50 / p95 / p99) de las predicciones.
+
+Uso (desde la carpeta backend, con el servidor ya levantado):
+    # modo síncrono
+    python -m src.app.app
+    # modo asíncrono
+    uvicorn src.app.asgi:asgi_app --port 5000
+
+    python -m benchmarks.load_test --csv datos.csv --duration 30 --predict-workers 16
+"""
+import argparse
+import json
+import os
+import threading
+import time
+import urllib.request
+import uuid
+
+SAMPLE_STUDENT = {
+    "promedio_actual": 62.5,
+    "asistencia_clases": 71.0,
+    "tareas_entregadas": 55.0,
+    "participacion_clase": 40.0,
+    "horas_estudio": 6.0,
+    "promedio_evaluaciones": 58.0,
+    "cursos_reprobados": 2,
+    "actividades_extracurriculares": 1,
+    "reportes_disciplinarios": 0,
+}
+
+
+def post_json(url, payload=None, timeout=300):
+    data = json.dumps(payload or {}).encode("utf-8")
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        return response.status, response.read()
+
+
+def post_file(url, path, timeout=300):
+    """
+    Sube un archivo como multipart/form-data (campo 'file').
+    """
+    boundary = uuid.uuid4().hex
+    with open(path, "rb") as f:
+        content = f.read()
+
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{os.path.basename(path)}"\r\n'
+        "Content-Type: text/csv\r\n\r\n"
+    ).encode("utf-8") + content + f"\r\n--{boundary}--\r\n".encode("utf-8")
+
+    req = urllib.request.Request(
+        url, data=body,
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"}
+    )
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        return response.status, response.read()
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga con tráfico mixto")
+    parser.add_argument("--url", default="http://localhost:5000/api")
+    parser.add_argument("--csv", required=True, help="CSV para subir / limpiar / entrenar")
+    parser.add_argument("--duration", type=float, default=20.0, help="segundos de prueba")
+    parser.add_argument("--predict-workers", type=int, default=16)
+    parser.add_argument("--no-heavy", action="store_true", help="solo predicciones")
+    args = parser.parse_args()
+
+    # Preparar un modelo para que /api/predict responda desde el inicio
+    post_file(f"{args.url}/upload", args.csv)
+    post_json(f"{args.url}/clean")
+    post_json(f"{args.url}/train")
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    latencies = []
+    errors = [0]
+    heavy_durations = []
+
+    def predict_worker():
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            try:
+                post_json(f"{args.url}/predict", SAMPLE_STUDENT, timeout=60)
+                elapsed = time.perf_counter() - t0
+                with lock:
+                    latencies.append(elapsed)
+            except Exception:
+                with lock:
+                    errors[0] += 1
+
+    def heavy_worker():
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            try:
+                post_file(f"{args.url}/upload", args.csv)
+                post_json(f"{args.url}/clean")
+                post_json(f"{args.url}/train")
+                heavy_durations.append(time.perf_counter() - t0)
+            except Exception:
+                with lock:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=predict_worker, daemon=True) for _ in range(args.predict_workers)]
+    if not args.no_heavy:
+        threads.append(threading.Thread(target=heavy_worker, daemon=True))
+
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(args.duration)
+    stop.set()
+    for t in threads:
+        t.join(timeout=60)
+    total = time.perf_counter() - start
+
+    values = sorted(latencies)
+
+    print("=" * 60)
+    print(" PRUEBA DE CARGA - TRÁFICO MIXTO")
+    print("=" * 60)
+    print(f"   Duración:               {total:.1f} s")
+    print(f"   Hilos de predicción:    {args.predict_workers}")
+    print(f"   Predicciones OK:        {len(values)}")
+    print(f"   Errores:                {errors[0]}")
+    print(f"   Throughput predict:     {len(values) / total:.1f} req/s")
+    print(f"   Latencia p50:           {percentile(values, 50) * 1000:.1f} ms")
+    print(f"   Latencia p95:           {percentile(values, 95) * 1000:.1f} ms")
+    print(f"   Latencia p99:           {percentile(values, 99) * 1000:.1f} ms")
+    if heavy_durations:
+        print(f"   Ciclos subir+limpiar+entrenar: {len(heavy_durations)} "
+              f"(promedio {sum(heavy_durations) / len(heavy_durations):.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Compara iteraciones y tiempo de ajuste de LogisticRegression con y sin
+StandardScaler, para cada solver.
+
+Uso (desde la carpeta backend):
+    python -m benchmarks.solver_convergence --rows 50000
+    python -m benchmarks.solver_convergence --csv datos_limpios.csv
+
+Sin --csv se generan datos sintéticos con las mismas escalas que el
+dataset real (porcentajes 0-100, horas 0-24 y conteos pequeños).
+"""
+import argparse
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.metrics import f1_score
+from sklearn.model_selection import train_test_split
+
+from src.config import FEATURE_COLUMNS, TARGET_COLUMN
+from src.ml.training import build_pipeline
+
+SOLVERS = ['lbfgs', 'liblinear', 'newton-cg', 'sag', 'saga']
+
+
+def synthetic_dataset(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'promedio_actual': rng.uniform(30, 100, rows),
+        'asistencia_clases': rng.uniform(20, 100, rows),
+        'tareas_entregadas': rng.uniform(10, 100, rows),
+        'participacion_clase': rng.uniform(0, 100, rows),
+        'horas_estudio': rng.uniform(0, 24, rows),
+        'promedio_evaluaciones': rng.uniform(30, 100, rows),
+        'cursos_reprobados': rng.integers(0, 5, rows),
+        'actividades_extracurriculares': rng.integers(0, 4, rows),
+        'reportes_disciplinarios': rng.integers(0, 3, rows),
+    })
+    score = (
+        -0.08 * (df['promedio_actual'] - 65)
+        - 0.03 * (df['asistencia_clases'] - 60)
+        + 0.8 * df['cursos_reprobados']
+        + 0.5 * df['reportes_disciplinarios']
+        + rng.normal(0, 1, rows)
+    )
+    df[TARGET_COLUMN] = (score > 1).astype(int)
+    return df
+
+
+def fit_once(X_train, y_train, X_test, y_test, solver, scale, max_iter):
+    model = build_pipeline(max_iter=max_iter, C=0.5, solver=solver, scale=scale)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", ConvergenceWarning)
+        t0 = time.perf_counter()
+        model.fit(X_train, y_train)
+        seconds = time.perf_counter() - t0
+    n_iter = int(np.max(model.named_steps['model'].n_iter_))
+    f1 = f1_score(y_test, model.predict(X_test), zero_division=0)
+    return n_iter, seconds, f1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convergencia por solver con y sin escalado")
+    parser.add_argument("--csv", help="CSV limpio (por defecto datos sintéticos)")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--max-iter", type=int, default=1000)
+    parser.add_argument("--solvers", nargs="+", default=SOLVERS)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv) if args.csv else synthetic_dataset(args.rows)
+    X = df[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    y = df[TARGET_COLUMN].to_numpy()
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y
+    )
+
+    print("=" * 78)
+    print(f" {len(X)} filas | max_iter={args.max_iter}")
+    print(f" {'Solver':>10} {'Escalado':>9} {'Iter':>6} {'Converge':>9} {'Tiempo':>9} {'F1':>7} {'Speedup':>8}")
+    print("=" * 78)
+
+    for solver in args.solvers:
+        raw_iter, raw_s, raw_f1 = fit_once(X_train, y_train, X_test, y_test, solver, False, args.max_iter)
+        sc_iter, sc_s, sc_f1 = fit_once(X_train, y_train, X_test, y_test, solver, True, args.max_iter)
+
+        print(f" {solver:>10} {'no':>9} {raw_iter:>6} {str(raw_iter < args.max_iter):>9} "
+              f"{raw_s:>8.3f}s {raw_f1:>7.3f}")
+        print(f" {'':>10} {'sí':>9} {sc_iter:>6} {str(sc_iter < args.max_iter):>9} "
+              f"{sc_s:>8.3f}s {sc_f1:>7.3f} {raw_s / sc_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Costo de limpiar en el pool de procesos (src/app/workers.py) contra
+limpiar en el hilo de la solicitud.
+
+Ir al pool serializa el DataFrame crudo de ida y el limpio + DataCleaner
+de vuelta. Por cada tamaño se mide la limpieza en el hilo, la limpieza en
+el pool y la diferencia (transferencia), para elegir PROCESS_MIN_CELLS.
+
+Uso (desde la carpeta backend):
+    python -m benchmarks.worker_transfer --rows 1000 10000 50000 200000
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from src.app import workers
+from benchmarks.solver_convergence import synthetic_dataset
+
+
+def best_of(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Limpieza en el hilo vs en el pool de procesos")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 50_000, 200_000])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    # El primer envío paga el arranque del proceso (spawn + imports)
+    with contextlib.redirect_stdout(io.StringIO()):
+        workers.run_cpu_bound(workers.clean_in_worker, synthetic_dataset(100))
+
+    print("=" * 72)
+    print(f" {'Filas':>8} {'Celdas':>10} {'En el hilo':>12} {'En el pool':>12} {'Transferencia':>14}")
+    print("=" * 72)
+    try:
+        for rows in args.rows:
+            df = synthetic_dataset(rows)
+            inline = best_of(lambda: workers.clean_in_worker(df), args.repeats)
+            pooled = best_of(lambda: workers.run_cpu_bound(workers.clean_in_worker, df), args.repeats)
+            print(f" {rows:>8} {df.size:>10} {inline * 1000:>10.1f}ms {pooled * 1000:>10.1f}ms "
+                  f"{(pooled - inline) * 1000:>12.1f}ms")
+    finally:
+        workers.shutdown()
+
+    print(f"\n PROCESS_MIN_CELLS actual: {workers.PROCESS_MIN_CELLS} "
+          "(STUDENTGUARD_PROCESS_MIN_CELLS)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,46 +1,138 @@
-from flask import Flask, request, jsonify
-from flask_cors import CORS
 import os
-from werkzeug.utils import secure_filename
-# Asegúrate de que estas importaciones sean correctas
-from src.data.data_loader import DataLoader
-from src.data.data_cleaner import DataCleaner
-from src.ml.training import train_model
-from src.ml.prediction import predict_risk
+import sys
+import math
+import functools
+import time
+import threading
+import uuid
+import importlib.util
 
-import pandas as pd
-import numpy as np
+from flask import Blueprint, Flask, Response, current_app, request, jsonify
+from flask_cors import CORS
+from werkzeug.utils import secure_filename
 
+from src.app import memory
+from src.app.state import SnapshotStore, StaleSnapshotError
+from src.config import FEATURE_COLUMNS, REQUIRED_COLUMNS
 
-app = Flask(__name__)
+# pandas, numpy y scikit-learn se importan dentro de los endpoints que los
+# usan: así /api/health y /api/predict responden sin esperar esas librerías.
 
-CORS(app) 
+api = Blueprint('api', __name__)
 
 # CONFIGURACIÓN DE SUBIDA DE ARCHIVOS
 
 UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'csv'}
+MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # Máximo 16MB
+
+# CSV comprimidos: se descomprimen en memoria por partes (no se guardan en uploads/)
+COMPRESSED_EXTENSIONS = {'gz', 'bz2', 'xz', 'zip'}
+if importlib.util.find_spec('zstandard') is not None:
+    COMPRESSED_EXTENSIONS.add('zst')
+MAX_DECOMPRESSED_LENGTH = 256 * 1024 * 1024  # Máximo 256MB ya descomprimido
+
+# Parser de CSV: 'auto' (Arrow si está instalado), 'pyarrow' o 'c'
+CSV_PARSER = os.environ.get('STUDENTGUARD_CSV_PARSER', 'auto')
+
+# Perfilado bajo demanda (X-Profile: 1 o ?profile=1): STUDENTGUARD_PROFILING=1
+PROFILING_ENABLED = os.environ.get('STUDENTGUARD_PROFILING', '0') == '1'
 
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # Máximo 16MB
+# Precarga del modelo activo en segundo plano al arrancar: STUDENTGUARD_PREWARM=0 la apaga
+PREWARM_ENABLED = os.environ.get('STUDENTGUARD_PREWARM', '1') != '0'
 
-# VARIABLES GLOBALES PARA GUARDAR DATOS EN MEMORIA
+# DATOS EN MEMORIA
+# Snapshots inmutables (ver src/app/state.py): cada solicitud toma
+# snapshots.current() una vez y los cambios se publican con publish().
+#   current_data, current_profile (DataProfiler del último archivo cargado),
+#   cleaned_data, cleaner (DataCleaner ajustado), last_metrics_results
 
-current_data = None
-cleaned_data = None
-last_metrics_results = None
-# INICIALIZAR NUESTRAS CLASES
+snapshots = SnapshotStore()
 
-loader = DataLoader(UPLOAD_FOLDER)
-cleaner = DataCleaner()
+# Reservas de memoria de subidas, limpiezas y entrenamientos en curso
+# (ver src/app/memory.py); los datasets de los snapshots cuentan como residentes
+memory_budget = memory.MemoryBudget(lambda: memory.dataset_usage(snapshots)['total_bytes'])
+
+# Perfiles de solicitudes (solo se llenan con el perfilado encendido)
+profile_store = None
+
+# Tiempos de arranque (en segundos) que se reportan en /api/health
+startup_timings = {}
+
+# INICIALIZAR NUESTRAS CLASES (se crean la primera vez que se usan)
+
+_loader = None
+_predict_batcher = None
+_exporter = None
+_summary_cache = None
+_data_browser = None
+
+
+def get_loader():
+    """
+    Devuelve el DataLoader compartido (importa pandas la primera vez)
+    """
+    global _loader
+    if _loader is None:
+        from src.data.data_loader import DataLoader
+        _loader = DataLoader(UPLOAD_FOLDER, parser=CSV_PARSER)
+    return _loader
+
+
+def get_predict_batcher():
+    """
+    Devuelve el agrupador de predicciones (solo se usa en modo asíncrono)
+    """
+    global _predict_batcher
+    if _predict_batcher is None:
+        from src.ml.batching import PredictBatcher
+        _predict_batcher = PredictBatcher()
+    return _predict_batcher
+
+def get_exporter():
+    """
+    Devuelve el DataExporter compartido (recuerda tamaños de exportaciones)
+    """
+    global _exporter
+    if _exporter is None:
+        from src.data.data_exporter import DataExporter
+        _exporter = DataExporter()
+    return _exporter
+
+def get_summary_cache():
+    """
+    Devuelve la caché de resúmenes (histogramas y correlación) por dataset
+    """
+    global _summary_cache
+    if _summary_cache is None:
+        from src.data.data_summaries import SummaryCache
+        _summary_cache = SummaryCache()
+    return _summary_cache
+
+def get_data_browser():
+    """
+    Devuelve el DataBrowser compartido (índices de orden y consultas en caché)
+    """
+    global _data_browser
+    if _data_browser is None:
+        from src.data.data_browser import DataBrowser
+        _data_browser = DataBrowser()
+    return _data_browser
 
 # FUNCIONES AUXILIARES
 
 def allowed_file(filename):
     """
-    Verifica que el archivo tenga extensión .csv
+    Verifica que el archivo tenga extensión .csv (o sea un CSV comprimido)
     """
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS | COMPRESSED_EXTENSIONS
+
+
+def is_compressed(filename):
+    """
+    Verifica si el archivo es un CSV comprimido (.gz, .bz2, .xz, .zip, .zst)
+    """
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in COMPRESSED_EXTENSIONS
 
 def convert_to_serializable(obj):
     """
@@ -50,38 +142,220 @@ def convert_to_serializable(obj):
         return {key: convert_to_serializable(value) for key, value in obj.items()}
     elif isinstance(obj, list):
         return [convert_to_serializable(item) for item in obj]
-    elif pd.isna(obj):
+    elif obj is None or isinstance(obj, (str, bool)):
+        return obj
+    # Tipos numpy (np.int64, np.float64, ...) -> tipos nativos
+    elif hasattr(obj, 'item'):
+        obj = obj.item()
+
+    if isinstance(obj, float) and math.isnan(obj):
+        return None
+
+    # pd.NA / pd.NaT solo pueden aparecer si pandas ya está cargado
+    pd = sys.modules.get('pandas')
+    if pd is not None and pd.api.types.is_scalar(obj) and pd.isna(obj):
         return None
-    # Maneja tipos numéricos de NumPy (int, float)
-    elif isinstance(obj, (np.integer, np.floating)):
-        return obj.item()
-    elif hasattr(obj, 'item'):  # otros tipos numpy
-        return obj.item()
     return obj
 
+
+def admission(kind, estimator):
+    """
+    Reserva en memory_budget el pico estimado del endpoint antes de
+    ejecutarlo. estimator() devuelve bytes, o None si no hay nada que
+    estimar (por ejemplo, sin datos cargados: el endpoint responde 400).
+    Si no hay lugar responde 503 (no cabe) o 429 (hay que esperar).
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            estimate = estimator()
+            if estimate is None:
+                return view(*args, **kwargs)
+            try:
+                job = memory_budget.admit(
+                    kind, estimate,
+                    budget=current_app.config['MEMORY_BUDGET_BYTES'],
+                    timeout=current_app.config['MEMORY_QUEUE_TIMEOUT_S']
+                )
+                with job:
+                    return view(*args, **kwargs)
+            except memory.MemoryBudgetError as e:
+                response = jsonify({
+                    'error': 'Memoria insuficiente',
+                    'message': str(e),
+                    'memory': e.details
+                })
+                if e.status == 429:
+                    response.headers['Retry-After'] = '5'
+                return response, e.status
+        return wrapper
+    return decorator
+
+
+def _estimate_upload():
+    file = request.files.get('file')
+    if file is None or not file.filename or not request.content_length:
+        return None
+    estimate = memory.estimate_upload(
+        request.content_length, len(REQUIRED_COLUMNS),
+        compressed=is_compressed(file.filename),
+        max_decompressed=current_app.config['MAX_DECOMPRESSED_LENGTH']
+    )
+    if request.values.get('mode', 'replace').lower() == 'append':
+        # Se concatenan con los datos originales y limpios actuales
+        snapshot = snapshots.current()
+        estimate += memory.object_bytes(snapshot.current_data) + memory.object_bytes(snapshot.cleaned_data)
+    return estimate
+
+
+def _estimate_clean():
+    data = snapshots.current().current_data
+    if data is None:
+        return None
+    return memory.estimate_clean(len(data), len(data.columns))
+
+
+def _estimate_train():
+    data = snapshots.current().cleaned_data
+    if data is None:
+        return None
+    body = request.get_json(silent=True) or {}
+    if request.path.endswith('/compare'):
+        # Los motores se entrenan uno tras otro: cuenta el más pesado
+        engines = body.get('engines') or ['logistic_regression', 'random_forest']
+        params = body.get('hyperparams') or {}
+        if not isinstance(engines, list) or not isinstance(params, dict):
+            return None  # compare_engines responde 400
+        return max(
+            memory.estimate_train(len(data), len(FEATURE_COLUMNS),
+                                  dict(params.get(engine) or {}, engine=engine))
+            for engine in engines
+        )
+    if request.path.endswith('/train'):
+        body = {}
+    return memory.estimate_train(len(data), len(FEATURE_COLUMNS), body)
+
+
+def _estimate_out_of_core():
+    body = request.get_json(silent=True) or {}
+    try:
+        chunksize = int(body.get('chunksize', 50_000))
+    except (TypeError, ValueError):
+        return None
+    return memory.estimate_train(chunksize, len(REQUIRED_COLUMNS))
+
+
+def _prewarm_model():
+    """
+    Carga el modelo activo en memoria para que la primera predicción no
+    pague la lectura del archivo ni la importación de scikit-learn.
+    """
+    t0 = time.perf_counter()
+    try:
+        from src.ml.prediction import predict_risk  # noqa: F401
+        from src.ml.model_registry import registry
+        registry.load_active()
+        startup_timings['model_prewarm'] = 'ok'
+    except ValueError:
+        # Todavía no hay modelo entrenado
+        startup_timings['model_prewarm'] = 'sin_modelo'
+    except Exception as e:
+        startup_timings['model_prewarm'] = f'error: {str(e)}'
+    startup_timings['model_prewarm_s'] = round(time.perf_counter() - t0, 4)
+
+
+def create_app(prewarm=True, async_mode=False, profiling=None):
+    """
+    Crea la aplicación Flask con todos los endpoints.
+
+    Con prewarm=True el modelo activo se carga en un hilo de fondo, así el
+    servidor queda listo para /api/health de inmediato.
+
+    Con async_mode=True (ver src/app/asgi.py) la limpieza y el entrenamiento
+    corren en un pool de procesos y /api/predict se agrupa en micro-lotes.
+
+    Con profiling=True (por defecto STUDENTGUARD_PROFILING) las solicitudes
+    marcadas se perfilan (ver src/app/profiling.py).
+    """
+    global profile_store
+    t0 = time.perf_counter()
+
+    app = Flask(__name__)
+    CORS(app)
+
+    app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+    app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
+    app.config['MAX_DECOMPRESSED_LENGTH'] = MAX_DECOMPRESSED_LENGTH
+    app.config['ASYNC_MODE'] = async_mode
+    app.config['PROFILING_ENABLED'] = PROFILING_ENABLED if profiling is None else profiling
+    app.config['MEMORY_BUDGET_BYTES'] = memory.default_budget()
+    app.config['MEMORY_QUEUE_TIMEOUT_S'] = memory.DEFAULT_QUEUE_TIMEOUT_S
+    app.register_blueprint(api)
+
+    # Con el perfilado apagado no se registra ningún hook (costo cero)
+    if app.config['PROFILING_ENABLED']:
+        from src.app import profiling as request_profiling
+
+        if profile_store is None:
+            profile_store = request_profiling.ProfileStore()
+        request_profiling.install(app, profile_store)
+
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+
+    startup_timings['create_app_s'] = round(time.perf_counter() - t0, 4)
+    startup_timings['heavy_modules_at_boot'] = [
+        name for name in ('numpy', 'pandas', 'sklearn') if name in sys.modules
+    ]
+
+    if prewarm:
+        startup_timings['model_prewarm'] = 'en_progreso'
+        threading.Thread(target=_prewarm_model, name='prewarm-model', daemon=True).start()
+
+    return app
+
 # ============================================================================
 # ENDPOINTS DE LA API
 # ============================================================================
 
-@app.route('/api/health', methods=['GET'])
+@api.route('/api/health', methods=['GET'])
 def health_check():
     """
     Endpoint para verificar que el servidor esté funcionando
     """
-    return jsonify({
+    health = {
         'status': 'ok',
         'message': 'StudentGuard API está funcionando correctamente',
-        'version': '1.0.0'
-    }), 200
+        'version': '1.0.0',
+        'startup': startup_timings,
+        'snapshot': {
+            'version': snapshots.current().version,
+            'live_versions': snapshots.live_versions()
+        }
+    }
+    if current_app.config.get('ASYNC_MODE'):
+        from src.app import workers
 
+        health['workers'] = workers.transfer_stats()
+    return jsonify(health), 200
 
-@app.route('/api/upload', methods=['POST'])
+
+@api.route('/api/upload', methods=['POST'])
+@admission('upload', _estimate_upload)
 def upload_file():
     """
-    Recibe un archivo CSV desde el frontend y lo procesa
+    Recibe un archivo CSV desde el frontend y lo procesa.
+
+    Con mode=append (query string o campo del formulario) las filas del
+    archivo se limpian y se agregan a los datos limpios actuales en vez de
+    reemplazarlos; recompute_medians=true recalcula las medianas de relleno.
     """
-    global current_data
-    
+    append = request.values.get('mode', 'replace').lower() == 'append'
+    snapshot = snapshots.current()
+    if append and snapshot.cleaned_data is None:
+        return jsonify({
+            'error': 'No hay datos limpios a los que agregar. Primero sube y limpia un archivo completo'
+        }), 400
+
     # Verificar que se envió un archivo
     if 'file' not in request.files:
         return jsonify({'error': 'No se envió ningún archivo'}), 400
@@ -94,28 +368,77 @@ def upload_file():
     
     # Verificar que sea un CSV
     if not allowed_file(file.filename):
-        return jsonify({'error': 'Solo se permiten archivos CSV'}), 400
+        return jsonify({'error': 'Solo se permiten archivos CSV (o CSV comprimidos: '
+                                 + ', '.join(sorted(COMPRESSED_EXTENSIONS)) + ')'}), 400
     
     try:
-        # Guardar el archivo de forma segura
+        import pandas as pd
+        from src.data.data_loader import DecompressedSizeError
+        from src.data.data_profiler import DataProfiler
+
         filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-    
-        # Cargar y validar el CSV
-        df, error = loader.load_csv(filepath)
+        # Perfil de calidad que se arma mientras se lee el archivo
+        profiler = DataProfiler()
+
+        if is_compressed(filename):
+            # Se descomprime directo desde el stream subido, sin escribir a disco
+            try:
+                df, error = get_loader().load_compressed_csv(
+                    file.stream, filename,
+                    max_bytes=current_app.config['MAX_DECOMPRESSED_LENGTH'],
+                    profiler=profiler
+                )
+            except DecompressedSizeError as e:
+                return jsonify({
+                    'error': 'Archivo demasiado grande',
+                    'message': str(e)
+                }), 413
+
+            if error:
+                return jsonify({'error': error}), 400
+        else:
+            # Guardar el archivo de forma segura. Se escribe primero con un
+            # nombre único: dos subidas simultáneas del mismo archivo no se
+            # pisan mientras se leen
+            filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
+            partial_path = f"{filepath}.{uuid.uuid4().hex}.part"
+            file.save(partial_path)
         
-        if error:
-            # Si hubo error, eliminamos el archivo
-            if os.path.exists(filepath):
-                os.remove(filepath)
-            return jsonify({'error': error}), 400
+            # Cargar y validar el CSV
+            df, error = get_loader().load_csv(partial_path, profiler=profiler)
+            
+            if error:
+                # Si hubo error, eliminamos el archivo
+                if os.path.exists(partial_path):
+                    os.remove(partial_path)
+                return jsonify({'error': error}), 400
+
+            os.replace(partial_path, filepath)
         
-        # Guardar los datos en memoria
-        current_data = df
+        profile = convert_to_serializable(profiler.report)
+
+        if append:
+            try:
+                summary = _append_upload(snapshot, df, profiler,
+                                         request.values.get('recompute_medians', 'false').lower() == 'true')
+            except StaleSnapshotError as e:
+                return jsonify({'error': str(e)}), 409
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+
+            return jsonify({
+                'message': 'Datos agregados exitosamente',
+                'filename': filename,
+                'profile': profile,
+                'summary': convert_to_serializable(summary)
+            }), 200
+
+        # Publicar los datos nuevos (los limpios anteriores ya no corresponden)
+        snapshots.publish(current_data=df, current_profile=profiler,
+                          cleaned_data=None, cleaner=None)
         
         # Obtener información del dataset
-        info = loader.get_data_info(df)
+        info = get_loader().get_data_info(df)
         
         # Preparar preview (primeras 10 filas)
         preview_data = df.head(10).copy()
@@ -131,6 +454,7 @@ def upload_file():
             'message': 'Archivo cargado exitosamente',
             'filename': filename,
             'info': info,
+            'profile': profile,
             'preview': preview_dict
         }), 200
     
@@ -141,13 +465,48 @@ def upload_file():
         return jsonify({'error': f'Error al procesar archivo: {str(e)}'}), 500
 
 
-@app.route('/api/clean', methods=['POST'])
+def _append_upload(snapshot, df, profiler, recompute_medians):
+    """
+    Limpia solo las filas del archivo subido (con los parámetros del último
+    /api/clean) y publica los datos originales y limpios con ellas agregadas.
+    """
+    import copy
+    import pandas as pd
+
+    # Índice de las filas nuevas a continuación de los datos originales
+    raw = snapshot.current_data
+    start = int(raw.index.max()) + 1 if len(raw) else 0
+    df.index = pd.RangeIndex(start, start + len(df))
+    coerced = profiler.coerced
+    if coerced is not None:
+        coerced.index = df.index
+
+    # Copia del cleaner: el snapshot actual no se modifica
+    cleaner = copy.copy(snapshot.cleaner)
+    cleaned = cleaner.append_data(snapshot.cleaned_data, df, coerced=coerced,
+                                  recompute_medians=recompute_medians)
+
+    # El perfil guardado solo describe el archivo nuevo: no se reutiliza en /api/clean
+    snapshots.publish(base=snapshot, current_data=pd.concat([raw, df]), current_profile=None,
+                      cleaned_data=cleaned, cleaner=cleaner)
+
+    summary = cleaner.get_cleaning_summary()
+    return {
+        **summary['last_append'],
+        'total_rows': int(len(cleaned)),
+        'cleaning_report': summary
+    }
+
+
+@api.route('/api/clean', methods=['POST'])
+@admission('clean', _estimate_clean)
 def clean_data():
     """
     Limpia los datos que fueron cargados previamente
     """
-    global current_data, cleaned_data
-    
+    snapshot = snapshots.current()
+    current_data = snapshot.current_data
+
     # Verificar que haya datos cargados
     if current_data is None:
         return jsonify({
@@ -155,15 +514,37 @@ def clean_data():
         }), 400
     
     try:
+        import pandas as pd
+
         print("\n" + "=" * 60)
         print("INICIANDO PROCESO DE LIMPIEZA")
         print("=" * 60)
         
-        # Limpiar los datos
-        cleaned_data = cleaner.clean_data(current_data)
+        # Conversiones a número ya hechas al cargar el archivo
+        profile = snapshot.current_profile
+        coerced = profile.coerced if profile is not None else None
         
-        # Obtener resumen de limpieza
+        # Limpiar los datos (un DataCleaner por solicitud: su reporte no se
+        # mezcla con el de otra limpieza concurrente)
+        if current_app.config.get('ASYNC_MODE'):
+            # Limpiar en otro proceso (si el dataset es grande) para no bloquear las predicciones
+            from src.app.workers import run_for_data, clean_in_worker
+
+            cleaned_data, cleaner = run_for_data(clean_in_worker, current_data, coerced)
+        else:
+            from src.data.data_cleaner import DataCleaner
+
+            cleaner = DataCleaner()
+            cleaned_data = cleaner.clean_data(current_data, coerced=coerced)
         summary = cleaner.get_cleaning_summary()
+
+        # Publicar solo si los datos cargados siguen siendo los mismos
+        # (el cleaner queda guardado para agregar datos con mode=append)
+        snapshots.publish(base=snapshot, cleaned_data=cleaned_data, cleaner=cleaner)
+
+        # Resúmenes del dashboard calculados de una vez, en segundo plano
+        threading.Thread(target=get_summary_cache().get, args=(cleaned_data,),
+                         name='summaries', daemon=True).start()
         
         # Preparar preview de datos limpios
         preview_data = cleaned_data.head(10).copy()
@@ -195,19 +576,26 @@ def clean_data():
             }
         }), 200
     
+    except StaleSnapshotError as e:
+        return jsonify({'error': str(e)}), 409
+
     except Exception as e:
         print(f"\n ERROR EN LIMPIEZA: {str(e)}")
         import traceback
         traceback.print_exc()
         return jsonify({'error': f'Error al limpiar datos: {str(e)}'}), 500
 
-@app.route('/api/train', methods=['POST'])
+@api.route('/api/train', methods=['POST'])
+@admission('train', _estimate_train)
 def train():
     """
     Se entrena el modelo de riesgo usando los datos limpios actuales.
     Devuelve las métricas principales (accuracy, precision, recall, f1).
+    Si los datos cambian (upload o reset) mientras entrena responde 409 y
+    no se publican las métricas.
     """
-    global cleaned_data, last_metrics_results
+    snapshot = snapshots.current()
+    cleaned_data = snapshot.cleaned_data
 
     # 1) Verificar que ya haya datos limpios
     if cleaned_data is None:
@@ -221,9 +609,16 @@ def train():
         print("=" * 60)
 
         # 2) Llamar a la función de entrenamiento
-        metrics = train_model(cleaned_data)
-        # Guardar las métricas y la matriz de confusión globalmente
-        last_metrics_results = metrics
+        from src.ml.training import train_model
+
+        if current_app.config.get('ASYNC_MODE'):
+            from src.app.workers import run_for_data, train_in_worker
+
+            metrics = run_for_data(train_in_worker, cleaned_data)
+        else:
+            metrics = train_model(cleaned_data)
+        # Guardar las métricas y la matriz de confusión
+        snapshots.publish(base=snapshot, last_metrics_results=metrics)
 
         print("\n Entrenamiento completado")
         print(f"   - Accuracy:  {metrics['accuracy']:.3f}")
@@ -240,6 +635,9 @@ def train():
             "metrics": metrics
         }), 200
 
+    except StaleSnapshotError as e:
+        return jsonify({"error": str(e)}), 409
+
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -248,12 +646,18 @@ def train():
         }), 500
     
 
-@app.route('/api/train_with_params', methods=['POST'])
+@api.route('/api/train_with_params', methods=['POST'])
+@admission('train', _estimate_train)
 def train_with_params():
     """
     Entrena el modelo con hiperparámetros personalizados.
+
+    Con "cv_folds": 5 (opcional "bootstrap_resamples", "confidence") las
+    métricas incluyen validación cruzada con intervalos de confianza.
+    Igual que /api/train, responde 409 si los datos cambian mientras entrena.
     """
-    global cleaned_data, last_metrics_results
+    snapshot = snapshots.current()
+    cleaned_data = snapshot.cleaned_data
 
     # Verificar que haya datos limpios
     if cleaned_data is None:
@@ -269,24 +673,27 @@ def train_with_params():
         # Obtener hiperparámetros del body (si no se envían, usa defaults)
         data = request.get_json() or {}
         
-        hyperparams = {
-            'max_iter': data.get('max_iter', 1000),
-            'C': data.get('C', 0.5),
-            'solver': data.get('solver', 'lbfgs')
-        }
-        
+        # engine elige el motor (logistic_regression por defecto); cada motor
+        # toma sus propios hiperparámetros e ignora los demás
+        hyperparams = dict(data)
+        hyperparams.setdefault('engine', 'logistic_regression')
+
         print(f"\n Hiperparámetros recibidos:")
-        print(f"   - max_iter: {hyperparams['max_iter']}")
-        print(f"   - C: {hyperparams['C']}")
-        print(f"   - solver: {hyperparams['solver']}")
+        for key, value in hyperparams.items():
+            print(f"   - {key}: {value}")
         
         # Importar función de entrenamiento con parámetros
         from src.ml.training import train_model_with_params
         
         # Entrenar con parámetros personalizados
-        metrics = train_model_with_params(cleaned_data, hyperparams)
-        # Guardar las métricas y la matriz de confusión globalmente
-        last_metrics_results = metrics
+        if current_app.config.get('ASYNC_MODE'):
+            from src.app.workers import run_for_data, train_in_worker
+
+            metrics = run_for_data(train_in_worker, cleaned_data, hyperparams)
+        else:
+            metrics = train_model_with_params(cleaned_data, hyperparams)
+        # Guardar las métricas y la matriz de confusión
+        snapshots.publish(base=snapshot, last_metrics_results=metrics)
         metrics = convert_to_serializable(metrics)
 
         return jsonify({
@@ -294,6 +701,9 @@ def train_with_params():
             "metrics": metrics
         }), 200
 
+    except StaleSnapshotError as e:
+        return jsonify({"error": str(e)}), 409
+
     except ValueError as e:
         # Errores de validación
         return jsonify({
@@ -309,12 +719,204 @@ def train_with_params():
         }), 500
 
 
-@app.route('/api/predict', methods=['POST'])
+@api.route('/api/train/compare', methods=['POST'])
+@admission('train_compare', _estimate_train)
+def train_compare():
+    """
+    Entrena varios motores con la misma partición (sin activarlos) y
+    compara tiempo de ajuste, latencia de predicción, tamaño y F1.
+
+    Body opcional: {"engines": [...], "hyperparams": {motor: {...}}}
+    """
+    cleaned_data = snapshots.current().cleaned_data
+
+    if cleaned_data is None:
+        return jsonify({
+            "error": "No hay datos limpios. Primero Limpia los datos."
+        }), 400
+
+    try:
+        data = request.get_json(silent=True) or {}
+        engines = data.get('engines')
+        hyperparams = data.get('hyperparams') or {}
+
+        from src.ml.training import compare_engines
+
+        if current_app.config.get('ASYNC_MODE'):
+            from src.app.workers import run_for_data
+
+            report = run_for_data(compare_engines, cleaned_data, engines, hyperparams)
+        else:
+            report = compare_engines(cleaned_data, engines, hyperparams)
+
+        return jsonify({
+            "message": "Comparación de motores completada",
+            "report": convert_to_serializable(report)
+        }), 200
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    except Exception as e:
+        print(f"\n ERROR EN COMPARACIÓN DE MOTORES: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            "error": f"Error al comparar motores: {str(e)}"
+        }), 500
+
+
+@api.route('/api/train_out_of_core', methods=['POST'])
+@admission('train_out_of_core', _estimate_out_of_core)
+def train_out_of_core():
+    """
+    Entrena el modelo leyendo por partes un CSV de la carpeta de subidas,
+    para datasets que no caben en memoria. filename puede ser el archivo
+    crudo subido con /api/upload (se limpia al vuelo, ver
+    src/ml/out_of_core.py) o uno ya limpio (por defecto datos_limpios.csv,
+    el de /api/data/export?save=true).
+    """
+    data = request.get_json(silent=True) or {}
+
+    # Solo se permiten archivos dentro de la carpeta de subidas
+    filename = secure_filename(data.get('filename', 'datos_limpios.csv'))
+    csv_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
+
+    if not os.path.exists(csv_path):
+        return jsonify({
+            "error": f"No se encontró '{filename}'. Indica en 'filename' un CSV subido con /api/upload "
+                     "o exporta los datos limpios (/api/data/export?save=true)."
+        }), 400
+
+    try:
+        print("\n" + "=" * 60)
+        print("ENTRENAMIENTO OUT-OF-CORE")
+        print("=" * 60)
+
+        hyperparams = {
+            'max_iter': data.get('max_iter', 5),
+            'alpha': data.get('alpha', 0.0001),
+            'chunksize': data.get('chunksize', 50_000)
+        }
+
+        from src.ml.out_of_core import train_model_out_of_core
+
+        if current_app.config.get('ASYNC_MODE'):
+            from src.app.workers import run_cpu_bound
+
+            metrics = run_cpu_bound(train_model_out_of_core, csv_path, hyperparams)
+        else:
+            metrics = train_model_out_of_core(csv_path, hyperparams)
+        snapshots.publish(last_metrics_results=metrics)
+        metrics = convert_to_serializable(metrics)
+
+        return jsonify({
+            "message": "Modelo entrenado en modo out-of-core",
+            "metrics": metrics
+        }), 200
+
+    except ValueError as e:
+        return jsonify({
+            "error": str(e)
+        }), 400
+
+    except Exception as e:
+        print(f"\n ERROR EN ENTRENAMIENTO: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            "error": f"Error al entrenar modelo: {str(e)}"
+        }), 500
+
+
+@api.route('/api/models', methods=['GET'])
+def list_models():
+    """
+    Lista las versiones de modelos guardadas y cuál está activa.
+    """
+    from src.ml.model_registry import registry as model_registry
+
+    try:
+        versions = model_registry.list_versions()
+
+        return jsonify({
+            "active_version": model_registry.active_version(),
+            "versions": convert_to_serializable(versions)
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            "error": f"Error al listar modelos: {str(e)}"
+        }), 500
+
+
+@api.route('/api/models/<version>/activate', methods=['POST'])
+def activate_model(version):
+    """
+    Activa una versión guardada del modelo sin reentrenar.
+    """
+    from src.ml.model_registry import registry as model_registry
+
+    try:
+        metadata = model_registry.activate(version)
+
+        print(f"\n Versión activa del modelo: {version}")
+
+        return jsonify({
+            "message": f"Versión {version} activada",
+            "model": convert_to_serializable(metadata)
+        }), 200
+
+    except ValueError as e:
+        return jsonify({
+            "error": str(e)
+        }), 404
+
+    except Exception as e:
+        return jsonify({
+            "error": f"Error al activar modelo: {str(e)}"
+        }), 500
+
+
+@api.route('/api/models/rollback', methods=['POST'])
+def rollback_model():
+    """
+    Regresa a la versión del modelo que estaba activa antes de la actual.
+    """
+    from src.ml.model_registry import registry as model_registry
+
+    try:
+        metadata = model_registry.rollback()
+
+        print(f"\n Rollback a la versión: {metadata.get('version')}")
+
+        return jsonify({
+            "message": f"Rollback a la versión {metadata.get('version')}",
+            "model": convert_to_serializable(metadata)
+        }), 200
+
+    except ValueError as e:
+        return jsonify({
+            "error": str(e)
+        }), 400
+
+    except Exception as e:
+        return jsonify({
+            "error": f"Error al hacer rollback: {str(e)}"
+        }), 500
+
+
+@api.route('/api/predict', methods=['POST'])
 def predict():
     """
     Recibe los datos de UN estudiante y devuelve la predicción de riesgo.
+
+    Opcional en el JSON: "threshold" (umbral) y "explain" (true para la
+    contribución de cada feature, o un entero k para solo las k principales).
     """
     try:
+        from src.ml.prediction import predict_risk
+
         data = request.get_json()
 
         if not data:
@@ -322,7 +924,13 @@ def predict():
                 "error": "Se requiere un cuerpo JSON con los datos del estudiante."
             }), 400
 
-        result = predict_risk(data)
+        if current_app.config.get('ASYNC_MODE'):
+            # Se agrupa con otras solicitudes concurrentes en una sola llamada al modelo
+            result = get_predict_batcher().predict(
+                data, threshold=data.get('threshold'), explain=data.get('explain')
+            )
+        else:
+            result = predict_risk(data, threshold=data.get('threshold'), explain=data.get('explain'))
 
         result = convert_to_serializable(result)
 
@@ -345,12 +953,13 @@ def predict():
         }), 500
 
 
-@app.route('/api/data/info', methods=['GET'])
+@api.route('/api/data/info', methods=['GET'])
 def get_data_info():
     """
     Obtiene información detallada sobre los datos actuales
     """
-    global current_data, cleaned_data
+    snapshot = snapshots.current()
+    current_data, cleaned_data = snapshot.current_data, snapshot.cleaned_data
     
     if current_data is None:
         return jsonify({'error': 'No hay datos cargados'}), 400
@@ -359,8 +968,10 @@ def get_data_info():
     data_to_use = cleaned_data if cleaned_data is not None else current_data
     
     try:
+        import pandas as pd
+
         # Información básica
-        info = loader.get_data_info(data_to_use)
+        info = get_loader().get_data_info(data_to_use)
         
         # Estadísticas descriptivas
         stats_df = data_to_use.describe()
@@ -385,41 +996,75 @@ def get_data_info():
         return jsonify({'error': f'Error al obtener información: {str(e)}'}), 500
 
 
-@app.route('/api/data/export', methods=['GET'])
+@api.route('/api/data/export', methods=['GET'])
 def export_cleaned_data():
     """
-    Exporta los datos limpios como un nuevo archivo CSV
+    Descarga los datos limpios como CSV, generado por lotes en streaming.
+
+    Parámetros (query string):
+        columns: columnas separadas por coma (por defecto todas)
+        start, stop: rango de filas [start, stop)
+        gzip: 'true' para descargar .csv.gz
+        save: 'true' para solo guardar uploads/datos_limpios.csv en el servidor
+              (el archivo que usa /api/train_out_of_core)
     """
-    global cleaned_data
+    df = snapshots.current().cleaned_data
     
-    if cleaned_data is None:
+    if df is None:
         return jsonify({
             'error': 'No hay datos limpios disponibles. Primero limpia los datos'
         }), 400
     
-    try:
-        # Guardar CSV limpio
-        export_filename = 'datos_limpios.csv'
-        export_path = os.path.join(app.config['UPLOAD_FOLDER'], export_filename)
-        cleaned_data.to_csv(export_path, index=False)
+    args = request.args
+
+    if args.get('save', 'false').lower() == 'true':
+        try:
+            # Guardar CSV limpio
+            export_filename = 'datos_limpios.csv'
+            export_path = os.path.join(current_app.config['UPLOAD_FOLDER'], export_filename)
+            df.to_csv(export_path, index=False)
+            
+            return jsonify({
+                'message': 'Datos exportados exitosamente',
+                'filename': export_filename,
+                'path': export_path,
+                'rows': int(len(df))
+            }), 200
         
-        return jsonify({
-            'message': 'Datos exportados exitosamente',
-            'filename': export_filename,
-            'path': export_path,
-            'rows': int(len(cleaned_data))
-        }), 200
-    
-    except Exception as e:
-        return jsonify({'error': f'Error al exportar datos: {str(e)}'}), 500
+        except Exception as e:
+            return jsonify({'error': f'Error al exportar datos: {str(e)}'}), 500
+
+    try:
+        exporter = get_exporter()
+        columns = [col.strip() for col in args.get('columns', '').split(',') if col.strip()]
+        columns, start, stop = exporter.resolve(
+            df, columns or None, args.get('start'), args.get('stop')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    use_gzip = args.get('gzip', 'false').lower() == 'true'
+    filename = 'datos_limpios.csv.gz' if use_gzip else 'datos_limpios.csv'
+
+    headers = {'Content-Disposition': f'attachment; filename={filename}'}
+    size = exporter.known_size(df, columns, start, stop, use_gzip)
+    if size is not None:
+        headers['Content-Length'] = str(size)
+
+    return Response(
+        exporter.stream(df, columns, start, stop, use_gzip),
+        mimetype='application/gzip' if use_gzip else 'text/csv',
+        headers=headers
+    )
 
 
-@app.route('/api/data/compare', methods=['GET'])
+@api.route('/api/data/compare', methods=['GET'])
 def compare_data():
     """
     Compara datos originales con datos limpios
     """
-    global current_data, cleaned_data
+    snapshot = snapshots.current()
+    current_data, cleaned_data = snapshot.current_data, snapshot.cleaned_data
     
     if current_data is None:
         return jsonify({'error': 'No hay datos cargados'}), 400
@@ -449,12 +1094,111 @@ def compare_data():
         return jsonify({'error': f'Error al comparar datos: {str(e)}'}), 500
 
 
-@app.route('/api/get_metrics', methods=['GET'])
+@api.route('/api/data/rows', methods=['GET'])
+def data_rows():
+    """
+    Página de los datos limpios.
+
+    Parámetros (query string):
+        columns: columnas separadas por coma (por defecto todas)
+        min_<columna>, max_<columna>: filtro por rango (límites incluidos)
+        sort: columna para ordenar ('-columna' para descendente)
+        offset, limit: página (limit máximo 1000)
+        cursor: next_cursor de la página anterior (ignora lo demás)
+    """
+    df = snapshots.current().cleaned_data
+
+    if df is None:
+        return jsonify({
+            'error': 'No hay datos limpios disponibles. Primero limpia los datos'
+        }), 400
+
+    args = request.args
+
+    try:
+        from src.data.data_browser import DEFAULT_LIMIT, parse_filters, parse_sort
+
+        browser = get_data_browser()
+        if 'cursor' in args:
+            page = browser.query(df, cursor=args['cursor'])
+        else:
+            try:
+                offset = int(args.get('offset', 0))
+                limit = int(args.get('limit', DEFAULT_LIMIT))
+            except ValueError:
+                return jsonify({'error': 'offset y limit deben ser enteros'}), 400
+
+            columns = [col.strip() for col in args.get('columns', '').split(',') if col.strip()]
+            page = browser.query(
+                df,
+                columns=columns or None,
+                filters=parse_filters(args, df.columns),
+                sort=parse_sort(args.get('sort'), df.columns),
+                offset=offset,
+                limit=limit
+            )
+        return jsonify(convert_to_serializable(page)), 200
+
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 409
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': f'Error al consultar datos: {str(e)}'}), 500
+
+
+@api.route('/api/data/summaries', methods=['GET'])
+def data_summaries():
+    """
+    Histogramas de cada feature (bins fijos), histogramas por clase de
+    riesgo y matriz de correlación. Se calculan una vez por dataset; el
+    tamaño de la respuesta no depende del número de filas.
+
+    ?source=cleaned|original (por defecto los limpios si existen)
+    """
+    snapshot = snapshots.current()
+    source = request.args.get('source')
+    if source is None:
+        source = 'cleaned' if snapshot.cleaned_data is not None else 'original'
+
+    if source == 'cleaned':
+        df, coerced = snapshot.cleaned_data, None
+    elif source == 'original':
+        df = snapshot.current_data
+        profile = snapshot.current_profile
+        coerced = profile.coerced if profile is not None else None
+    else:
+        return jsonify({'error': "source debe ser 'cleaned' u 'original'"}), 400
+
+    if df is None:
+        return jsonify({'error': 'No hay datos cargados' if source == 'original'
+                        else 'No hay datos limpios. Primero limpia los datos'}), 400
+
+    try:
+        summary, cached = get_summary_cache().get(df, coerced)
+        return jsonify({
+            'source': source,
+            'data_version': snapshot.data_version,
+            'cached': cached,
+            **summary
+        }), 200
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': f'Error al calcular resúmenes: {str(e)}'}), 500
+
+
+@api.route('/api/get_metrics', methods=['GET'])
 def get_metrics():
     """
     Devuelve las métricas del último entrenamiento, incluyendo la matriz de confusión.
     """
-    global last_metrics_results
+    last_metrics_results = snapshots.current().last_metrics_results
     print("last_metrics_results content:", last_metrics_results) # Mantener para depuración
     
     # 1) Verificar que se haya entrenado el modelo al menos una vez
@@ -495,23 +1239,320 @@ def get_metrics():
         return jsonify({
             "error": f"Error al recuperar métricas: {str(e)}"
         }), 500
-@app.route('/api/reset', methods=['POST'])
+
+
+@api.route('/api/metrics/threshold', methods=['GET', 'POST'])
+def metrics_at_threshold():
+    """
+    GET  ?t=0.3    -> métricas y matriz de confusión del modelo activo con ese umbral
+    POST {"t": 0.3} -> además guarda el umbral para que lo use /api/predict
+    """
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        t = data.get('t')
+    else:
+        t = request.args.get('t')
+
+    from src.ml.prediction import parse_threshold
+
+    try:
+        t = parse_threshold(t)
+    except ValueError:
+        t = None
+    if t is None:
+        return jsonify({"error": "El parámetro 't' debe ser un número entre 0 y 1"}), 400
+
+    from src.ml.model_registry import registry as model_registry
+
+    version = model_registry.active_version()
+    if version is None:
+        return jsonify({
+            "error": "Modelo no entrenado. Primero entrena un modelo usando /api/train o /api/train_with_params."
+        }), 404
+
+    from src.ml.evaluation import load_threshold_sweep
+
+    sweep = load_threshold_sweep(version)
+    if sweep is None:
+        return jsonify({
+            "error": f"La versión {version} no tiene probabilidades de prueba guardadas."
+        }), 404
+
+    try:
+        metrics = sweep.metrics_at(t)
+
+        if request.method == 'POST':
+            model_registry.set_threshold(t)
+            print(f"\n Umbral de decisión de {version} actualizado a {t:.3f}")
+
+        return jsonify({
+            "model_version": version,
+            "applied": request.method == 'POST',
+            "metrics": convert_to_serializable(metrics)
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            "error": f"Error al calcular métricas por umbral: {str(e)}"
+        }), 500
+
+
+@api.route('/api/risk/build', methods=['POST'])
+def build_risk_ranking():
+    """
+    Puntúa los datos limpios con el modelo activo y guarda el ranking de
+    riesgo. Las filas ya puntuadas con la misma versión se reutilizan.
+    """
+    cleaned_data = snapshots.current().cleaned_data
+
+    if cleaned_data is None:
+        return jsonify({
+            "error": "No hay datos limpios. Primero Limpia los datos."
+        }), 400
+
+    from src.ml.risk_ranking import risk_ranking
+
+    try:
+        summary = risk_ranking.build(cleaned_data)
+
+        print(f"\n Ranking de riesgo: {summary['rows']} filas "
+              f"({summary['scored']} puntuadas, {summary['reused']} reutilizadas)")
+
+        return jsonify({
+            "message": "Ranking de riesgo generado",
+            "summary": summary
+        }), 200
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            "error": f"Error al generar el ranking: {str(e)}"
+        }), 500
+
+
+def _risk_query(query):
+    """
+    Ejecuta una consulta del ranking y arma la respuesta JSON. Si el
+    ranking es de otra versión del modelo responde 409 (no se recalcula
+    dentro de una consulta).
+    """
+    from src.ml.risk_ranking import risk_ranking, StaleRankingError
+
+    try:
+        result = query(risk_ranking)
+        return jsonify(result), 200
+
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+
+    except StaleRankingError as e:
+        return jsonify({"error": str(e), "stale": True}), 409
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            "error": f"Error al consultar el ranking: {str(e)}"
+        }), 500
+
+
+@api.route('/api/risk/top', methods=['GET'])
+def risk_top():
+    """
+    ?k=200 -> los k estudiantes con mayor probabilidad de riesgo
+    """
+    try:
+        k = int(request.args.get('k', 100))
+    except ValueError:
+        return jsonify({"error": "El parámetro 'k' debe ser un entero"}), 400
+
+    return _risk_query(lambda ranking: ranking.top(k))
+
+
+@api.route('/api/risk/range', methods=['GET'])
+def risk_range():
+    """
+    ?min=0.7&max=1&offset=0&limit=100 -> estudiantes con probabilidad en
+    [min, max], de mayor a menor
+    """
+    try:
+        min_p = float(request.args.get('min', 0.0))
+        max_p = float(request.args.get('max', 1.0))
+        offset = int(request.args.get('offset', 0))
+        limit = int(request.args.get('limit', 100))
+    except ValueError:
+        return jsonify({"error": "min / max deben ser números y offset / limit enteros"}), 400
+
+    return _risk_query(lambda ranking: ranking.in_range(min_p, max_p, offset, limit))
+
+
+@api.route('/api/risk/page', methods=['GET'])
+def risk_page():
+    """
+    ?page=1&per_page=50 -> página del ranking completo
+    """
+    try:
+        page = int(request.args.get('page', 1))
+        per_page = int(request.args.get('per_page', 50))
+    except ValueError:
+        return jsonify({"error": "page y per_page deben ser enteros"}), 400
+
+    return _risk_query(lambda ranking: ranking.page(page, per_page))
+
+
+@api.route('/api/drift', methods=['GET'])
+def drift_report():
+    """
+    Compara las entradas que predijo el modelo activo en /api/predict con
+    su distribución de entrenamiento (PSI y KS por feature). 'window' indica
+    desde cuándo se cuentan las entradas de esa versión.
+    """
+    from src.ml.model_registry import registry as model_registry
+
+    version = model_registry.active_version()
+    if version is None:
+        return jsonify({
+            "error": "Modelo no entrenado. Primero entrena un modelo usando /api/train o /api/train_with_params."
+        }), 404
+
+    from src.ml.drift import monitor
+
+    try:
+        report = monitor.report(version)
+        return jsonify(convert_to_serializable(report)), 200
+
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            "error": f"Error al calcular el drift: {str(e)}"
+        }), 500
+
+
+@api.route('/api/drift/reset', methods=['POST'])
+def drift_reset():
+    """
+    Reinicia los contadores de entradas observadas.
+    """
+    from src.ml.drift import monitor
+
+    monitor.reset()
+    return jsonify({"message": "Contadores de drift reiniciados"}), 200
+
+
+def _profiles_disabled():
+    if current_app.config.get('PROFILING_ENABLED') and profile_store is not None:
+        return None
+    return jsonify({
+        "error": "El perfilado está desactivado. Inicia el servidor con STUDENTGUARD_PROFILING=1"
+    }), 404
+
+
+@api.route('/api/debug/profiles', methods=['GET', 'DELETE'])
+def list_profiles():
+    """
+    GET    -> perfiles guardados (más reciente primero), sin el detalle
+    DELETE -> borra todos los perfiles
+    """
+    disabled = _profiles_disabled()
+    if disabled:
+        return disabled
+
+    if request.method == 'DELETE':
+        profile_store.clear()
+        return jsonify({"message": "Perfiles eliminados"}), 200
+
+    return jsonify({"profiles": profile_store.summaries()}), 200
+
+
+@api.route('/api/debug/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """
+    Funciones más costosas de un perfil.
+
+    Parámetros (query string):
+        sort: cumtime (por defecto), tottime o ncalls
+        limit: cantidad de funciones (por defecto 30)
+        match: texto a buscar en "archivo:función" (ej. data_cleaner)
+        format: 'pstats' para descargar el perfil completo (snakeviz / pstats)
+    """
+    disabled = _profiles_disabled()
+    if disabled:
+        return disabled
+
+    from src.app.profiling import DEFAULT_LIMIT, hottest_functions, raw_stats
+
+    try:
+        profile = profile_store.get(profile_id)
+
+        if request.args.get('format') == 'pstats':
+            return Response(
+                raw_stats(profile),
+                mimetype='application/octet-stream',
+                headers={'Content-Disposition': f'attachment; filename={profile_id}.prof'}
+            )
+
+        limit = int(request.args.get('limit', DEFAULT_LIMIT))
+        functions = hottest_functions(
+            profile,
+            sort=request.args.get('sort', 'cumtime'),
+            limit=limit,
+            match=request.args.get('match')
+        )
+
+        summary = {key: value for key, value in profile.items() if key != 'stats'}
+        return jsonify({**summary, "functions": functions}), 200
+
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@api.route('/api/memory', methods=['GET'])
+def memory_usage():
+    """
+    Memoria de los datasets cargados, reservas de los trabajos en curso,
+    trabajos recientes (estimado vs. variación del RSS) y el proceso.
+    """
+    budget = current_app.config['MEMORY_BUDGET_BYTES']
+    report = memory_budget.report(budget)
+    report['datasets'] = memory.dataset_usage(snapshots)
+    report['process'] = memory.process_memory()
+    report['queue_timeout_s'] = current_app.config['MEMORY_QUEUE_TIMEOUT_S']
+    return jsonify(report), 200
+
+
+@api.route('/api/reset', methods=['POST'])
 def reset_data():
     """
     Reinicia todo el sistema
     """
-    global current_data, cleaned_data, last_metrics_results
-    
-    # Limpiar variables globales
-    current_data = None
-    cleaned_data = None
-    last_metrics_results = None
+    # Publicar un estado vacío (las solicitudes en curso terminan con su snapshot)
+    snapshots.publish(current_data=None, current_profile=None, cleaned_data=None,
+                      cleaner=None, last_metrics_results=None)
     
     # Limpiar archivos temporales
     try:
-        for file in os.listdir(app.config['UPLOAD_FOLDER']):
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], file)
-            if os.path.isfile(file_path):
+        # El ranking de riesgo se armó con los datos descartados
+        from src.ml.risk_ranking import risk_ranking
+        risk_ranking.clear()
+
+        for file in os.listdir(current_app.config['UPLOAD_FOLDER']):
+            file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], file)
+            # Los .part son subidas en curso; las borra su propia solicitud
+            if os.path.isfile(file_path) and not file.endswith('.part'):
                 os.unlink(file_path)
         
         print("\n Sistema reiniciado correctamente\n")
@@ -531,7 +1572,7 @@ def reset_data():
 # MANEJO DE ERRORES
 # ============================================================================
 
-@app.errorhandler(404)
+@api.app_errorhandler(404)
 def not_found(error):
     """
     Maneja endpoints no encontrados
@@ -542,7 +1583,7 @@ def not_found(error):
     }), 404
 
 
-@app.errorhandler(500)
+@api.app_errorhandler(500)
 def internal_error(error):
     """
     Maneja errores internos del servidor
@@ -553,7 +1594,7 @@ def internal_error(error):
     }), 500
 
 
-@app.errorhandler(413)
+@api.app_errorhandler(413)
 def request_entity_too_large(error):
     """
     Maneja archivos demasiado grandes
@@ -568,26 +1609,44 @@ def request_entity_too_large(error):
 # INICIAR EL SERVIDOR
 # ============================================================================
 
+app = create_app(prewarm=PREWARM_ENABLED)
+
+
 if __name__ == '__main__':
-    if not os.path.exists(UPLOAD_FOLDER):
-        os.makedirs(UPLOAD_FOLDER)
-    
     print("\n" + "=" * 60)
     print(" StudentGuard Backend v1.0.0")
     print("=" * 60)
     print("\n Endpoints disponibles:")
     print("   GET  /api/health            - Verificar estado del servidor")
-    print("   POST /api/upload            - Cargar archivo CSV")
+    print("   POST /api/upload            - Cargar archivo CSV (también .gz, .bz2, .xz, .zip; ?mode=append agrega)")
     print("   POST /api/clean             - Limpiar datos cargados")
     print("   GET  /api/data/info         - Información de los datos")
     print("   GET  /api/data/compare      - Comparar datos originales vs limpios")
-    print("   GET  /api/data/export       - Exportar datos limpios")
+    print("   GET  /api/data/summaries    - Histogramas y correlación (?source=original)")
+    print("   GET  /api/data/rows         - Datos limpios paginados (?sort=-col&min_col=60)")
+    print("   GET  /api/data/export       - Descargar datos limpios (CSV o .csv.gz)")
     print("   POST /api/reset             - Reiniciar el sistema")
+    print("   GET  /api/memory            - Memoria de datasets y trabajos (presupuesto)")
+    print("   GET  /api/debug/profiles    - Perfiles de solicitudes (STUDENTGUARD_PROFILING=1)")
     print("   POST /api/train             - Entrenar modelo de riesgo")
     print("   POST /api/train_with_params - Entrenar modelo (hiperparámetros personalizados)")
+    print("   POST /api/train/compare     - Comparar motores (latencia, tamaño, F1)")
+    print("   POST /api/train_out_of_core - Entrenar modelo por partes desde CSV limpio")
     print("   POST /api/predict           - Predecir riesgo de un estudiante")
+    print("   GET  /api/get_metrics       - Métricas del último entrenamiento")
+    print("   GET  /api/metrics/threshold - Métricas con otro umbral (?t=0.3)")
+    print("   GET  /api/models            - Listar versiones del modelo")
+    print("   POST /api/models/<v>/activate - Activar una versión del modelo")
+    print("   POST /api/models/rollback   - Regresar a la versión anterior")
+    print("   POST /api/risk/build        - Generar ranking de riesgo")
+    print("   GET  /api/risk/top          - Estudiantes con mayor riesgo (?k=200)")
+    print("   GET  /api/risk/range        - Estudiantes por rango de probabilidad (?min=0.7)")
+    print("   GET  /api/risk/page         - Ranking paginado (?page=1&per_page=50)")
+    print("   GET  /api/drift             - Drift de entradas vs entrenamiento (PSI / KS)")
+    print("   POST /api/drift/reset       - Reiniciar contadores de drift")
 
     print("\n Servidor corriendo en: http://localhost:5000")
+    print(" Modo asíncrono: uvicorn src.app.asgi:asgi_app --port 5000")
     print("=" * 60)
     
     # Iniciar servidor
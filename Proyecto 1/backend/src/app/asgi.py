@@ -0,0 +1,56 @@
+"""
+Modo de servicio asíncrono (ASGI) con las mismas rutas que src/app/app.py.
+
+Uso (desde la carpeta backend):
+    pip install "a2wsgi>=1.10,<2" "uvicorn>=0.23"
+    uvicorn src.app.asgi:asgi_app --host 0.0.0.0 --port 5000
+
+- Cada solicitud corre en un pool de REQUEST_THREADS hilos
+  (a2wsgi.WSGIMiddleware), así una subida o un entrenamiento lento no
+  detiene a /api/predict.
+- Limpieza y entrenamiento de datasets grandes se ejecutan en un pool de
+  procesos y las predicciones concurrentes se agrupan en micro-lotes
+  (create_app(async_mode=True), ver src/app/workers.py).
+"""
+import os
+
+try:
+    from a2wsgi import WSGIMiddleware
+except ImportError as e:
+    raise ImportError(
+        "El modo asíncrono necesita a2wsgi y un servidor ASGI: pip install a2wsgi uvicorn"
+    ) from e
+
+from src.app.app import create_app
+from src.app import workers
+
+# Hilos que atienden solicitudes en paralelo
+REQUEST_THREADS = int(os.environ.get('STUDENTGUARD_REQUEST_THREADS', 32))
+
+
+class PooledWsgiToAsgi(WSGIMiddleware):
+    """
+    Adaptador WSGI -> ASGI que atiende solicitudes en un pool de hilos y
+    cierra los pools al apagar el servidor (lifespan).
+    """
+
+    def __init__(self, app, workers=REQUEST_THREADS):
+        super().__init__(app, workers=workers)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'lifespan':
+            return await super().__call__(scope, receive, send)
+
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                workers.shutdown()
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+flask_app = create_app(async_mode=True)
+asgi_app = PooledWsgiToAsgi(flask_app)
@@ -0,0 +1,340 @@
+"""
+Contabilidad de memoria y control de admisión.
+
+Los datasets en memoria (current_data, cleaned_data, las columnas ya
+convertidas del perfil y las huellas del cleaner) se miden con
+memory_usage(deep=True). Los trabajos pesados (subir, limpiar, entrenar)
+reservan antes de empezar una estimación de su pico, calculada con filas y
+columnas y calibrada con tracemalloc (bytes por celda):
+
+    subir      ~24 B/celda (DataFrame crudo + columnas convertidas)
+    limpiar    ~30 B/celda (copias de DataCleaner + huellas)
+    entrenar   ~29 B/celda (matriz float64, partición, escalado, latencia)
+               + el bosque aleatorio: ~15 B por fila de entrenamiento y árbol
+
+Si datasets + reservas + estimación supera el presupuesto:
+
+    503  el trabajo no cabe ni sin otros trabajos en curso (hay que liberar
+         datos con /api/reset o subir el presupuesto)
+    429  sí cabría, pero otros trabajos tienen reservada la memoria; espera
+         hasta queue_timeout segundos a que se libere y si no, se rechaza
+         con Retry-After
+
+Presupuesto: STUDENTGUARD_MEMORY_BUDGET_MB (por defecto el 75% de la RAM
+física). Espera en cola: STUDENTGUARD_MEMORY_QUEUE_S (por defecto 0).
+"""
+import itertools
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MB = 1024 * 1024
+
+# Bytes por celda del pico de cada trabajo (con margen sobre lo medido)
+UPLOAD_BYTES_PER_CELL = 32
+CLEAN_BYTES_PER_CELL = 40
+TRAIN_BYTES_PER_CELL = 40
+FOREST_BYTES_PER_ROW_TREE = 16
+
+# Caracteres promedio por celda en un CSV (para estimar filas de un archivo)
+CSV_BYTES_PER_CELL = 4
+# Compresión supuesta de un CSV comprimido (se acota con el máximo descomprimido)
+COMPRESSION_RATIO = 8
+
+# Trabajos terminados que se reportan en /api/memory
+RECENT_JOBS = 20
+
+
+def _physical_memory():
+    try:
+        return os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def default_budget():
+    """
+    Presupuesto en bytes: STUDENTGUARD_MEMORY_BUDGET_MB o el 75% de la RAM.
+    """
+    budget_mb = float(os.environ.get('STUDENTGUARD_MEMORY_BUDGET_MB', 0))
+    if budget_mb > 0:
+        return int(budget_mb * MB)
+    physical = _physical_memory()
+    return int(physical * 0.75) if physical else 4096 * MB
+
+
+DEFAULT_QUEUE_TIMEOUT_S = float(os.environ.get('STUDENTGUARD_MEMORY_QUEUE_S', 0))
+
+
+def process_memory():
+    """
+    RSS actual y pico del proceso (None si el sistema no lo reporta).
+    """
+    rss = peak = None
+    try:
+        with open('/proc/self/statm') as statm:
+            rss = int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux lo reporta en KB, macOS en bytes
+        peak = peak if os.uname().sysname == 'Darwin' else peak * 1024
+    return {'rss_bytes': rss, 'peak_rss_bytes': peak}
+
+
+# ----------------------------------------------------------------------------
+# Datasets
+# ----------------------------------------------------------------------------
+
+# id(objeto) -> (referencia débil, bytes). Los DataFrames de un snapshot no
+# se modifican nunca, así que se miden una sola vez.
+_sizes = {}
+_sizes_lock = threading.Lock()
+
+
+def object_bytes(obj):
+    """
+    Bytes de un DataFrame (deep=True, incluye el texto de columnas object)
+    o de un arreglo de numpy. 0 si es None.
+    """
+    if obj is None:
+        return 0
+    key = id(obj)
+    with _sizes_lock:
+        cached = _sizes.get(key)
+    if cached is not None and cached[0]() is obj:
+        return cached[1]
+
+    if hasattr(obj, 'memory_usage'):
+        size = int(obj.memory_usage(deep=True, index=True).sum())
+    else:
+        size = int(getattr(obj, 'nbytes', 0))
+
+    try:
+        ref = weakref.ref(obj, lambda _, key=key: _sizes.pop(key, None))
+    except TypeError:
+        return size
+    with _sizes_lock:
+        _sizes[key] = (ref, size)
+    return size
+
+
+def _snapshot_objects(snapshot):
+    profile = snapshot.current_profile
+    cleaner = snapshot.cleaner
+    return {
+        'current_data': snapshot.current_data,
+        'cleaned_data': snapshot.cleaned_data,
+        'profile_coerced': getattr(profile, 'coerced', None),
+        'cleaner_fingerprints': getattr(cleaner, 'row_fingerprints', None),
+    }
+
+
+def dataset_usage(store):
+    """
+    Memoria de los datasets del snapshot actual y de los que solo siguen
+    vivos porque una solicitud en curso los usa (stale_snapshots_bytes).
+    Un mismo DataFrame compartido por varios snapshots se cuenta una vez.
+    """
+    current = store.current()
+    usage = {}
+    seen = set()
+    for name, obj in _snapshot_objects(current).items():
+        usage[f'{name}_bytes'] = object_bytes(obj)
+        if obj is not None:
+            seen.add(id(obj))
+
+    stale = 0
+    for snapshot in store.live_snapshots():
+        if snapshot is current:
+            continue
+        for obj in _snapshot_objects(snapshot).values():
+            if obj is not None and id(obj) not in seen:
+                seen.add(id(obj))
+                stale += object_bytes(obj)
+    usage['stale_snapshots_bytes'] = stale
+    usage['total_bytes'] = sum(usage.values())
+    return usage
+
+
+# ----------------------------------------------------------------------------
+# Estimaciones de pico por trabajo
+# ----------------------------------------------------------------------------
+
+def estimate_upload(nbytes, columns, compressed=False, max_decompressed=None):
+    """
+    Pico de leer un CSV de nbytes (filas estimadas por el tamaño del texto).
+    """
+    text_bytes = nbytes * COMPRESSION_RATIO if compressed else nbytes
+    if compressed and max_decompressed:
+        text_bytes = min(text_bytes, max_decompressed)
+    rows = text_bytes // (CSV_BYTES_PER_CELL * columns)
+    return int(rows * columns * UPLOAD_BYTES_PER_CELL)
+
+
+def estimate_clean(rows, columns):
+    return int(rows * columns * CLEAN_BYTES_PER_CELL)
+
+
+def estimate_train(rows, columns, hyperparams=None):
+    """
+    Pico de entrenar un motor (ver src/ml/engines.py) con rows filas.
+    """
+    hyperparams = hyperparams or {}
+    peak = rows * columns * TRAIN_BYTES_PER_CELL
+    if hyperparams.get('engine') == 'random_forest':
+        try:
+            trees = int(hyperparams.get('n_estimators') or 100)
+            leaf = max(int(hyperparams.get('min_samples_leaf') or 1), 1)
+        except (TypeError, ValueError):
+            # El entrenamiento rechaza los valores inválidos con un 400
+            trees, leaf = 100, 1
+        # Árboles sobre el 80% de entrenamiento, más chicos con hojas grandes
+        peak += int(0.8 * rows) * trees * FOREST_BYTES_PER_ROW_TREE // leaf
+    folds = hyperparams.get('cv_folds')
+    if isinstance(folds, int) and folds > 1:
+        # Validación cruzada: un entrenamiento por fold en paralelo (un proceso cada uno)
+        peak += peak * min(folds, os.cpu_count() or 1)
+    return int(peak)
+
+
+# ----------------------------------------------------------------------------
+# Presupuesto
+# ----------------------------------------------------------------------------
+
+class MemoryBudgetError(RuntimeError):
+    """
+    Un trabajo no entra en el presupuesto de memoria.
+    status: 503 si no cabe ni sin otros trabajos, 429 si hay que esperar.
+    """
+
+    def __init__(self, message, status, details):
+        super().__init__(message)
+        self.status = status
+        self.details = details
+
+
+class MemoryBudget:
+    """
+    Reservas de memoria de los trabajos en curso.
+
+    resident: función que devuelve los bytes de los datasets en memoria
+    (por ejemplo lambda: dataset_usage(snapshots)['total_bytes']).
+    """
+
+    def __init__(self, resident):
+        self.resident = resident
+        self._cond = threading.Condition()
+        self._ids = itertools.count(1)
+        self._jobs = {}
+        self._recent = deque(maxlen=RECENT_JOBS)
+        self._rejections = {429: 0, 503: 0}
+
+    def reserved(self):
+        with self._cond:
+            return sum(job['estimated_bytes'] for job in self._jobs.values())
+
+    def _reject(self, status, message, details):
+        self._rejections[status] += 1
+        raise MemoryBudgetError(message, status, details)
+
+    def _admit(self, kind, estimate, budget, timeout):
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                datasets = self.resident()
+                reserved = sum(job['estimated_bytes'] for job in self._jobs.values())
+                details = {
+                    'job': kind,
+                    'estimated_bytes': estimate,
+                    'datasets_bytes': datasets,
+                    'reserved_bytes': reserved,
+                    'budget_bytes': budget,
+                }
+                if datasets + estimate > budget:
+                    self._reject(503, (
+                        f"'{kind}' necesita ~{estimate / MB:.0f} MB y con los datos en memoria "
+                        f"({datasets / MB:.0f} MB) supera el presupuesto de {budget / MB:.0f} MB. "
+                        "Libera datos con /api/reset o aumenta STUDENTGUARD_MEMORY_BUDGET_MB."
+                    ), details)
+                if datasets + reserved + estimate <= budget:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._reject(429, (
+                        f"'{kind}' necesita ~{estimate / MB:.0f} MB pero otros trabajos tienen "
+                        f"reservados {reserved / MB:.0f} MB. Vuelve a intentarlo en unos segundos."
+                    ), details)
+                # Se despierta cuando termina otro trabajo
+                self._cond.wait(remaining)
+
+            job_id = next(self._ids)
+            job = {
+                'id': job_id,
+                'kind': kind,
+                'estimated_bytes': estimate,
+                'started': time.monotonic(),
+                'rss_before': process_memory()['rss_bytes'],
+            }
+            self._jobs[job_id] = job
+            return job
+
+    @contextmanager
+    def admit(self, kind, estimate, budget, timeout=0):
+        """
+        Reserva estimate bytes mientras dura el bloque. Lanza
+        MemoryBudgetError (antes de entrar) si no hay lugar.
+        """
+        job = self._admit(kind, int(estimate), int(budget), timeout)
+        try:
+            yield job
+        finally:
+            rss_after = process_memory()['rss_bytes']
+            with self._cond:
+                del self._jobs[job['id']]
+                self._recent.appendleft({
+                    'kind': job['kind'],
+                    'estimated_bytes': job['estimated_bytes'],
+                    'duration_s': round(time.monotonic() - job['started'], 4),
+                    'rss_delta_bytes': (None if rss_after is None or job['rss_before'] is None
+                                        else rss_after - job['rss_before']),
+                })
+                self._cond.notify_all()
+
+    def report(self, budget):
+        """
+        Uso actual: datasets, trabajos en curso y terminados, proceso.
+        """
+        datasets = self.resident()
+        now = time.monotonic()
+        with self._cond:
+            jobs = [
+                {
+                    'id': job['id'],
+                    'kind': job['kind'],
+                    'estimated_bytes': job['estimated_bytes'],
+                    'running_s': round(now - job['started'], 4),
+                }
+                for job in self._jobs.values()
+            ]
+            recent = list(self._recent)
+            rejections = {str(status): count for status, count in self._rejections.items()}
+        reserved = sum(job['estimated_bytes'] for job in jobs)
+        return {
+            'budget_bytes': budget,
+            'datasets_bytes': datasets,
+            'reserved_bytes': reserved,
+            'available_bytes': max(budget - datasets - reserved, 0),
+            'jobs': jobs,
+            'recent_jobs': recent,
+            'rejections': rejections,
+        }
@@ -0,0 +1,196 @@
+"""
+Perfilado bajo demanda de solicitudes (cProfile).
+
+Se activa con STUDENTGUARD_PROFILING=1 (app.config['PROFILING_ENABLED']).
+Con el interruptor apagado no se registra ningún hook: las solicitudes no
+pagan nada.
+
+Con el interruptor encendido, una solicitud se perfila solo si lo pide:
+
+    curl -X POST -H 'X-Profile: 1' http://localhost:5000/api/clean
+    curl -X POST 'http://localhost:5000/api/train?profile=1'
+
+El perfil se guarda en memoria (los últimos MAX_PROFILES) con el id de la
+solicitud (X-Request-ID si se envía y es [A-Za-z0-9_-]{1,64}, si no uno
+nuevo), que se devuelve en el header X-Profile-Id. /api/debug/profiles lista los perfiles y
+/api/debug/profiles/<id> muestra las funciones más costosas.
+
+En modo asíncrono la limpieza y el entrenamiento corren en otro proceso:
+el perfil solo muestra la espera del handler.
+
+cProfile mide todo el intérprete, así que se perfila una solicitud a la
+vez: si llega otra marcada mientras hay un perfil en curso, se atiende
+sin perfilar (la respuesta no trae X-Profile-Id).
+"""
+import cProfile
+import io
+import marshal
+import pstats
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+from flask import g, request
+
+# Perfiles que se conservan (los más viejos se descartan)
+MAX_PROFILES = 50
+
+# Funciones por defecto en el detalle de un perfil
+DEFAULT_LIMIT = 30
+
+# Ids aceptados desde X-Request-ID (se guardan y se devuelven en un header)
+REQUEST_ID_PATTERN = re.compile(r'[A-Za-z0-9_-]{1,64}')
+
+# Un solo perfil a la vez en todo el proceso
+_profiling_lock = threading.Lock()
+
+SORT_KEYS = {
+    'cumtime': 3,   # tiempo acumulado (incluye lo que llama)
+    'tottime': 2,   # tiempo propio
+    'ncalls': 1,
+}
+
+
+def _wants_profile():
+    if request.headers.get('X-Profile', '').lower() in ('1', 'true'):
+        return True
+    return request.args.get('profile', '').lower() in ('1', 'true')
+
+
+def _profile_id():
+    request_id = request.headers.get('X-Request-ID', '')
+    if REQUEST_ID_PATTERN.fullmatch(request_id):
+        return request_id
+    return uuid.uuid4().hex
+
+
+class ProfileStore:
+    """
+    Perfiles guardados por id de solicitud, en orden de llegada.
+    """
+
+    def __init__(self, max_profiles=MAX_PROFILES):
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+        self._profiles = OrderedDict()
+
+    def add(self, profile):
+        with self._lock:
+            self._profiles[profile['id']] = profile
+            self._profiles.move_to_end(profile['id'])
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id):
+        with self._lock:
+            profile = self._profiles.get(profile_id)
+        if profile is None:
+            raise LookupError(f"No existe el perfil '{profile_id}'")
+        return profile
+
+    def summaries(self):
+        with self._lock:
+            profiles = list(self._profiles.values())
+        return [
+            {key: value for key, value in profile.items() if key != 'stats'}
+            for profile in reversed(profiles)
+        ]
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+
+
+def hottest_functions(profile, sort='cumtime', limit=DEFAULT_LIMIT, match=None):
+    """
+    Funciones del perfil ordenadas por sort (cumtime, tottime o ncalls).
+    match filtra por texto en "archivo:función" (por ejemplo 'data_cleaner'
+    o 'train_model_with_params').
+    """
+    if sort not in SORT_KEYS:
+        raise ValueError(f"sort debe ser uno de: {', '.join(SORT_KEYS)}")
+    if limit < 1:
+        raise ValueError("limit debe ser mayor que 0")
+
+    rows = []
+    for (filename, line, function), (cc, nc, tt, ct, _) in profile['stats'].items():
+        name = f"{filename}:{line}({function})"
+        if match and match not in name:
+            continue
+        rows.append((name, nc, tt, ct))
+
+    position = SORT_KEYS[sort]
+    rows.sort(key=lambda row: row[position], reverse=True)
+    return [
+        {
+            'function': name,
+            'ncalls': ncalls,
+            'tottime_s': round(tottime, 6),
+            'cumtime_s': round(cumtime, 6),
+        }
+        for name, ncalls, tottime, cumtime in rows[:limit]
+    ]
+
+
+def raw_stats(profile):
+    """
+    Perfil en el formato de pstats (para abrir con snakeviz o pstats.Stats).
+    """
+    return marshal.dumps(profile['stats'])
+
+
+def install(app, store):
+    """
+    Registra los hooks que perfilan las solicitudes marcadas. Solo se llama
+    si app.config['PROFILING_ENABLED'] está encendido.
+    """
+
+    @app.before_request
+    def _start_profile():
+        if not _wants_profile():
+            return
+        # Ya hay un perfil en curso: esta solicitud se atiende sin perfilar
+        if not _profiling_lock.acquire(blocking=False):
+            return
+        try:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        except Exception:
+            # Otra herramienta de perfilado activa (Python 3.12+)
+            _profiling_lock.release()
+            return
+        g.profile_id = _profile_id()
+        g.profile_started = time.perf_counter()
+        g.profiler = profiler
+
+    @app.after_request
+    def _tag_response(response):
+        if 'profiler' in g:
+            response.headers['X-Profile-Id'] = g.profile_id
+            g.profile_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def _finish_profile(exc):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return
+        try:
+            profiler.disable()
+        finally:
+            _profiling_lock.release()
+
+        stats = pstats.Stats(profiler, stream=io.StringIO())
+        store.add({
+            'id': g.profile_id,
+            'method': request.method,
+            'path': request.path,
+            'status': g.get('profile_status', 500),
+            'duration_s': round(time.perf_counter() - g.profile_started, 6),
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'total_calls': stats.total_calls,
+            'stats': stats.stats,
+        })
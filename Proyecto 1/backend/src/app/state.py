@@ -0,0 +1,97 @@
+"""
+Estado de la API (datos cargados, datos limpios, métricas) como snapshots
+inmutables y versionados.
+
+Cada solicitud toma el snapshot actual con una sola lectura (sin lock) y
+trabaja solo con él, aunque otra solicitud publique uno nuevo mientras
+tanto. Los escritores arman un snapshot nuevo con los campos cambiados y
+lo publican de forma atómica bajo un lock que solo compiten entre ellos.
+
+Los DataFrames de un snapshot no se modifican nunca (los handlers trabajan
+sobre copias); un snapshot viejo se libera solo cuando ninguna solicitud
+lo sigue referenciando.
+"""
+import itertools
+import threading
+import weakref
+from dataclasses import dataclass, replace
+from typing import Any, Optional
+
+
+class StaleSnapshotError(RuntimeError):
+    """
+    Los datos cargados cambiaron (nuevo upload o reset) mientras se
+    calculaba un resultado derivado de ellos.
+    """
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    version: aumenta en cada publicación.
+    data_version: aumenta solo cuando cambia current_data (upload / reset);
+    sirve para saber si un resultado derivado sigue correspondiendo.
+    """
+    version: int = 0
+    data_version: int = 0
+    current_data: Any = None
+    current_profile: Any = None
+    cleaned_data: Any = None
+    cleaner: Any = None  # DataCleaner ajustado (medianas, huellas, reporte)
+    last_metrics_results: Optional[dict] = None
+
+
+class SnapshotStore:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = itertools.count(1)
+        self._current = Snapshot()
+        # Snapshots que alguna solicitud todavía referencia (diagnóstico)
+        self._live = weakref.WeakValueDictionary()
+
+    def current(self):
+        """
+        Snapshot vigente. Es una lectura de una referencia: no bloquea.
+        """
+        return self._current
+
+    def publish(self, base=None, **changes):
+        """
+        Publica un snapshot nuevo = actual + changes.
+
+        base: snapshot del que se derivaron los cambios. Si current_data
+        cambió desde entonces se lanza StaleSnapshotError y no se publica
+        nada (por ejemplo, una limpieza de un archivo que ya fue reemplazado).
+        """
+        with self._lock:
+            current = self._current
+            if base is not None and base.data_version != current.data_version:
+                raise StaleSnapshotError(
+                    "Los datos cambiaron mientras se procesaba la solicitud. Vuelve a intentarlo."
+                )
+
+            data_version = current.data_version
+            if 'current_data' in changes:
+                data_version += 1
+
+            snapshot = replace(current, version=next(self._versions),
+                               data_version=data_version, **changes)
+            self._live[snapshot.version] = snapshot
+            self._current = snapshot
+            return snapshot
+
+    def live_versions(self):
+        """
+        Versiones que siguen en memoria (la actual + las que alguna
+        solicitud en curso todavía usa).
+        """
+        with self._lock:
+            return sorted(self._live.keys())
+
+    def live_snapshots(self):
+        """
+        Snapshots que siguen en memoria (para contar su uso de memoria).
+        """
+        with self._lock:
+            return list(self._live.values())
@@ -0,0 +1,120 @@
+"""
+Ejecución de tareas pesadas (limpieza y entrenamiento) fuera del proceso
+del servidor, para que no compitan por el GIL con /api/predict.
+
+Mandar un DataFrame a otro proceso no es gratis: se serializa con pickle
+de ida y el resultado (datos limpios + DataCleaner) de vuelta. Con datasets
+chicos eso cuesta más que la tarea, así que run_for_data solo usa el pool
+desde PROCESS_MIN_CELLS celdas (filas x columnas) y si no corre la tarea en
+el hilo de la solicitud. benchmarks/worker_transfer.py mide el costo.
+"""
+import os
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Procesos dedicados a limpieza / entrenamiento
+CPU_WORKERS = int(os.environ.get('STUDENTGUARD_CPU_WORKERS', 2))
+
+# Desde cuántas celdas conviene mandar la tarea al pool de procesos
+PROCESS_MIN_CELLS = int(os.environ.get('STUDENTGUARD_PROCESS_MIN_CELLS', 200_000))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Tareas corridas en el hilo vs en el pool, y el costo de ir al pool
+# (tiempo total - tiempo de la tarea dentro del proceso)
+_stats_lock = threading.Lock()
+_stats = {'inline': 0, 'offloaded': 0, 'transfer_s_total': 0.0, 'last_transfer_s': None}
+
+
+def get_process_pool():
+    """
+    Pool de procesos compartido. Se usa 'spawn' porque el servidor ya tiene
+    hilos corriendo y hacer fork en ese estado no es seguro.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=CPU_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+    return _pool
+
+
+def run_cpu_bound(fn, *args, **kwargs):
+    """
+    Ejecuta fn en el pool de procesos y espera el resultado. Solo bloquea
+    el hilo de esta solicitud; las demás siguen atendiéndose.
+    """
+    return get_process_pool().submit(fn, *args, **kwargs).result()
+
+
+def _timed(fn, *args, **kwargs):
+    # Corre dentro del proceso del pool: devuelve el resultado y cuánto tardó fn
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - t0
+
+
+def run_for_data(fn, df, *args, **kwargs):
+    """
+    Ejecuta fn(df, *args) en el pool de procesos si df tiene al menos
+    PROCESS_MIN_CELLS celdas, si no en el hilo actual.
+    """
+    if df is None or df.size < PROCESS_MIN_CELLS:
+        with _stats_lock:
+            _stats['inline'] += 1
+        return fn(df, *args, **kwargs)
+
+    t0 = time.perf_counter()
+    result, task_time = run_cpu_bound(_timed, fn, df, *args, **kwargs)
+    transfer = max(time.perf_counter() - t0 - task_time, 0.0)
+    with _stats_lock:
+        _stats['offloaded'] += 1
+        _stats['transfer_s_total'] += transfer
+        _stats['last_transfer_s'] = round(transfer, 4)
+    return result
+
+
+def transfer_stats():
+    """
+    Contadores de run_for_data (para /api/health en modo asíncrono).
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['transfer_s_total'] = round(stats['transfer_s_total'], 4)
+    stats['process_min_cells'] = PROCESS_MIN_CELLS
+    return stats
+
+
+def clean_in_worker(df, coerced=None):
+    """
+    Limpia el DataFrame en un proceso del pool.
+    Devuelve (datos_limpios, DataCleaner ajustado).
+    """
+    from src.data.data_cleaner import DataCleaner
+
+    cleaner = DataCleaner()
+    cleaned = cleaner.clean_data(df, coerced=coerced)
+    return cleaned, cleaner
+
+
+def train_in_worker(df, hyperparams=None):
+    """
+    Entrena en un proceso del pool. El modelo queda guardado en el registro
+    y el servidor lo toma al detectar el cambio del puntero activo.
+    """
+    from src.ml.training import train_model_with_params
+
+    return train_model_with_params(df, hyperparams)
+
+
+def shutdown():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
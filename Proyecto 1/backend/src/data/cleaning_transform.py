@@ -0,0 +1,145 @@
+"""
+Transformación de limpieza ajustada al entrenar y aplicada al predecir.
+
+DataCleaner trabaja con DataFrames completos y vuelve a calcular las
+medianas en cada dataset. Para /api/predict eso no sirve: una sola fila no
+tiene mediana y armar un DataFrame por solicitud cuesta más que el modelo.
+
+CleaningTransform guarda lo aprendido con los datos de entrenamiento
+(mediana por feature y rangos de VALUE_RANGES) como arreglos de numpy que
+se guardan con el modelo. Al predecir:
+
+- parse_row convierte los valores crudos de una fila a float con las mismas
+  reglas que coerce_column ("3" -> 3, "['a', 'b']" -> 2, texto -> NaN)
+- apply rellena los NaN con las medianas y recorta a los rangos, en una sola
+  operación vectorizada para todo el lote
+"""
+import math
+import warnings
+
+import numpy as np
+
+from src.config import FEATURE_COLUMNS
+from src.data.data_cleaner import DataCleaner
+
+# Columnas que pueden venir como lista de actividades
+LIST_COLUMNS = ('actividades_extracurriculares',)
+_ACCEPTS_LIST = [col in LIST_COLUMNS for col in FEATURE_COLUMNS]
+
+_NAN = float('nan')
+
+
+def _bounds():
+    lows, highs = [], []
+    for col in FEATURE_COLUMNS:
+        min_val, max_val = DataCleaner.VALUE_RANGES.get(col, (None, None))
+        lows.append(-np.inf if min_val is None else float(min_val))
+        highs.append(np.inf if max_val is None else float(max_val))
+    return np.array(lows), np.array(highs)
+
+
+def _parse_value(value, accepts_list):
+    """
+    Un valor crudo -> float (NaN si no se puede convertir).
+    """
+    if value is None or isinstance(value, bool):
+        return _NAN
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        text = value.strip()
+        try:
+            return float(text)
+        except ValueError:
+            pass
+        if accepts_list and (text == "" or ("[" in text and "]" in text)):
+            # "['deportes', 'club']" -> 2, "[]" o "" -> 0
+            return float(len([item for item in text.strip("[]").split(",") if item.strip()]))
+        return _NAN
+    if isinstance(value, (list, tuple)) and accepts_list:
+        # Lista JSON de actividades
+        return float(len(value))
+    try:
+        # Escalares de numpy
+        return float(value)
+    except (TypeError, ValueError):
+        return _NAN
+
+
+def parse_row(values):
+    """
+    Valores crudos de una fila (en el orden de FEATURE_COLUMNS) -> lista de
+    float, con NaN donde falta el dato o no se puede convertir.
+    """
+    row = []
+    for value, accepts_list in zip(values, _ACCEPTS_LIST):
+        # Camino común: el valor ya es un número
+        if type(value) is float or type(value) is int:
+            row.append(float(value))
+        else:
+            row.append(_parse_value(value, accepts_list))
+    return row
+
+
+def has_missing(row):
+    """
+    True si la fila (ya pasada por parse_row) tiene algún NaN.
+    """
+    return any(math.isnan(value) for value in row)
+
+
+class CleaningTransform:
+    """
+    Relleno con medianas + recorte a rangos, ajustado una vez al entrenar.
+    """
+
+    def __init__(self, medians, lows=None, highs=None):
+        self.medians = np.asarray(medians, dtype=np.float64)
+        if lows is None or highs is None:
+            lows, highs = _bounds()
+        self.lows = np.asarray(lows, dtype=np.float64)
+        self.highs = np.asarray(highs, dtype=np.float64)
+
+    @classmethod
+    def fit(cls, X):
+        """
+        Medianas por columna de una matriz ordenada según FEATURE_COLUMNS
+        (los NaN no cuentan; una columna sin datos queda en el mínimo del rango).
+        """
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(FEATURE_COLUMNS))
+        lows, highs = _bounds()
+        with warnings.catch_warnings():
+            # Columna sin ningún dato: nanmedian devuelve NaN con un aviso
+            warnings.simplefilter("ignore", RuntimeWarning)
+            medians = np.nanmedian(X, axis=0) if len(X) else np.full(len(FEATURE_COLUMNS), np.nan)
+        medians = np.where(np.isnan(medians), np.where(np.isinf(lows), 0.0, lows), medians)
+        return cls(medians, lows, highs)
+
+    def to_arrays(self):
+        """
+        Arreglos que se guardan con el modelo (extras de save_model).
+        """
+        return {"medians": self.medians, "lows": self.lows, "highs": self.highs}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(arrays["medians"], arrays["lows"], arrays["highs"])
+
+    def apply(self, X):
+        """
+        Rellena NaN con las medianas y recorta a los rangos.
+        Devuelve (matriz nueva, máscara de valores rellenados o None si no hubo).
+        """
+        X = np.asarray(X, dtype=np.float64)
+        missing = np.isnan(X)
+        if missing.any():
+            X = np.where(missing, self.medians, X)
+        else:
+            missing = None
+        return np.clip(X, self.lows, self.highs), missing
+
+    def transform(self, rows):
+        """
+        Filas crudas -> matriz lista para el modelo. Devuelve (matriz, máscara).
+        """
+        return self.apply([parse_row(row) for row in rows])
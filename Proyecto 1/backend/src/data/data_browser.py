@@ -0,0 +1,256 @@
+"""
+Navegación paginada de los datos limpios: proyección de columnas, filtros
+por rango, orden y paginación por offset o cursor.
+
+Los DataFrames de un snapshot no se modifican nunca, así que todo lo que se
+deriva de uno se guarda mientras siga en memoria:
+
+- las columnas como arreglos de numpy (acceso columnar, sin .iloc por fila)
+- un índice de orden por columna (argsort estable, ascendente y descendente)
+- el resultado de cada consulta (filtros + orden): las posiciones de las
+  filas que pasan, en orden
+
+La primera consulta cuesta O(n) (máscara booleana + un argsort si la
+columna no estaba ordenada); las páginas siguientes de la misma consulta
+son un slice de posiciones y cuestan O(tamaño de página). Nunca se
+serializa el DataFrame completo.
+"""
+import base64
+import binascii
+import itertools
+import json
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 1000
+
+# Consultas recordadas (filtros + orden) por todos los datasets
+MAX_QUERIES = 32
+
+
+def parse_filters(args, columns):
+    """
+    Filtros por rango desde el query string: min_<columna> y max_<columna>
+    (límites incluidos). Devuelve una tupla ordenada de (columna, min, max).
+    """
+    bounds = {}
+    for key, value in args.items():
+        prefix, _, col = key.partition('_')
+        if prefix not in ('min', 'max') or not col:
+            continue
+        if col not in columns:
+            raise ValueError(f"No se puede filtrar por '{col}': columna desconocida")
+        try:
+            number = float(value)
+        except ValueError:
+            raise ValueError(f"{key} debe ser un número")
+        low, high = bounds.get(col, (None, None))
+        bounds[col] = (number, high) if prefix == 'min' else (low, number)
+
+    for col, (low, high) in bounds.items():
+        if low is not None and high is not None and low > high:
+            raise ValueError(f"min_{col} debe ser menor o igual que max_{col}")
+    return tuple(sorted((col, low, high) for col, (low, high) in bounds.items()))
+
+
+def parse_sort(sort, columns):
+    """
+    'columna' (ascendente) o '-columna' (descendente) -> (columna, descendente).
+    None si no se pide orden (orden original de las filas).
+    """
+    if not sort:
+        return None
+    descending = sort.startswith('-')
+    col = sort.lstrip('-+')
+    if col not in columns:
+        raise ValueError(f"No se puede ordenar por '{col}': columna desconocida")
+    return col, descending
+
+
+def encode_cursor(state):
+    raw = json.dumps(state, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        int(state['frame']), int(state['offset']), int(state['limit'])
+        return state
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise ValueError("Cursor inválido")
+
+
+class _Frame:
+    """
+    Datos derivados de un DataFrame: columnas, índices de orden y un id
+    para los cursores.
+    """
+
+    def __init__(self, df, frame_id):
+        self.id = frame_id
+        self.columns = list(df.columns)
+        self.total = len(df)
+        self.row_index = df.index.to_numpy()
+        self.arrays = {col: df[col].to_numpy() for col in self.columns}
+        # Solo se filtra por rango y se ordena por columnas numéricas: las de
+        # texto (u otras que no se convirtieron) quedan como object
+        self.numeric = {col for col, values in self.arrays.items() if values.dtype.kind in 'biuf'}
+        self.orders = {}
+
+
+class DataBrowser:
+    """
+    Consultas paginadas sobre DataFrames inmutables (los de los snapshots).
+    """
+
+    def __init__(self, max_queries=MAX_QUERIES):
+        self.max_queries = max_queries
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        # id(df) -> (referencia débil, _Frame)
+        self._frames = {}
+        # (id del frame, filtros, orden) -> posiciones de las filas
+        self._queries = OrderedDict()
+
+    def _frame(self, df):
+        key = id(df)
+        with self._lock:
+            cached = self._frames.get(key)
+            if cached is not None and cached[0]() is df:
+                return cached[1]
+
+            frame = _Frame(df, next(self._ids))
+
+            def _forget(_, key=key, frame_id=frame.id):
+                self._frames.pop(key, None)
+                for query in [q for q in list(self._queries) if q[0] == frame_id]:
+                    self._queries.pop(query, None)
+
+            self._frames[key] = (weakref.ref(df, _forget), frame)
+            return frame
+
+    def _order(self, frame, col, descending):
+        """
+        Posiciones de las filas ordenadas por col (se calcula una vez por
+        columna y sentido). Los empates conservan el orden original.
+        """
+        key = (col, descending)
+        order = frame.orders.get(key)
+        if order is None:
+            values = frame.arrays[col]
+            if descending:
+                values = -values.astype(np.float64)
+            order = np.argsort(values, kind='stable')
+            frame.orders[key] = order
+        return order
+
+    def _positions(self, frame, filters, sort):
+        """
+        Posiciones (en orden) de las filas que pasan los filtros.
+        """
+        key = (frame.id, filters, sort)
+        with self._lock:
+            positions = self._queries.get(key)
+            if positions is not None:
+                self._queries.move_to_end(key)
+                return positions
+
+        mask = None
+        for col, low, high in filters:
+            values = frame.arrays[col]
+            col_mask = np.ones(frame.total, dtype=bool)
+            if low is not None:
+                col_mask &= values >= low
+            if high is not None:
+                col_mask &= values <= high
+            mask = col_mask if mask is None else mask & col_mask
+
+        if sort is not None:
+            order = self._order(frame, *sort)
+            positions = order if mask is None else order[mask[order]]
+        else:
+            positions = np.arange(frame.total) if mask is None else np.flatnonzero(mask)
+
+        with self._lock:
+            self._queries[key] = positions
+            while len(self._queries) > self.max_queries:
+                self._queries.popitem(last=False)
+        return positions
+
+    def query(self, df, columns=None, filters=(), sort=None, offset=0, limit=DEFAULT_LIMIT,
+              cursor=None):
+        """
+        Una página de filas. Con cursor (el next_cursor de una página
+        anterior) se ignoran los demás parámetros y se sigue la misma
+        consulta. Lanza ValueError si algo no es válido (incluido filtrar u
+        ordenar por una columna no numérica) y LookupError si el cursor es
+        de un dataset que ya no está.
+        """
+        frame = self._frame(df)
+
+        if cursor is not None:
+            state = decode_cursor(cursor)
+            if state['frame'] != frame.id:
+                raise LookupError("Los datos cambiaron desde que se generó el cursor. Vuelve a la primera página")
+            columns = state.get('columns')
+            filters = tuple(tuple(item) for item in state.get('filters', []))
+            sort = tuple(state['sort']) if state.get('sort') else None
+            offset, limit = int(state['offset']), int(state['limit'])
+
+        if columns:
+            unknown = [col for col in columns if col not in frame.arrays]
+            if unknown:
+                raise ValueError(f"Columnas desconocidas: {', '.join(unknown)}")
+        else:
+            columns = frame.columns
+        not_numeric = sorted({col for col, _, _ in filters} - frame.numeric)
+        if not_numeric:
+            raise ValueError(f"Solo se puede filtrar por columnas numéricas: {', '.join(not_numeric)}")
+        if sort is not None and sort[0] not in frame.numeric:
+            raise ValueError(f"Solo se puede ordenar por columnas numéricas: {sort[0]}")
+        if offset < 0:
+            raise ValueError("offset debe ser mayor o igual que 0")
+        if not 1 <= limit <= MAX_LIMIT:
+            raise ValueError(f"limit debe estar entre 1 y {MAX_LIMIT}")
+
+        positions = self._positions(frame, filters, sort)
+        total = len(positions)
+        page = positions[min(offset, total):min(offset + limit, total)]
+
+        # Solo las filas de la página: un take por columna
+        values = {col: frame.arrays[col][page].tolist() for col in columns}
+        row_index = frame.row_index[page].tolist()
+        rows = [
+            {'row_index': row_index[i], **{col: values[col][i] for col in columns}}
+            for i in range(len(page))
+        ]
+
+        next_offset = offset + len(page)
+        next_cursor = None
+        if next_offset < total:
+            next_cursor = encode_cursor({
+                'frame': frame.id,
+                'offset': next_offset,
+                'limit': limit,
+                'columns': None if columns is frame.columns else list(columns),
+                'filters': [list(item) for item in filters],
+                'sort': list(sort) if sort else None,
+            })
+
+        return {
+            'total_rows': frame.total,
+            'matched': int(total),
+            'offset': offset,
+            'limit': limit,
+            'columns': list(columns),
+            'filters': {col: {'min': low, 'max': high} for col, low, high in filters},
+            'sort': None if sort is None else ('-' if sort[1] else '') + sort[0],
+            'next_cursor': next_cursor,
+            'rows': rows,
+        }
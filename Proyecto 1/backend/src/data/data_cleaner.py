@@ -1,14 +1,130 @@
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import StandardScaler
+
+
+def count_activities(value):
+    """Convierte listas de actividades a cantidad numérica"""
+    if pd.isna(value):
+        return None
+    
+    if isinstance(value, (int, float)):
+        return value
+    
+    # Si es string, intentar parsearlo
+    if isinstance(value, str):
+        value_clean = value.strip()
+        
+        if value_clean == "[]" or value_clean == "":
+            return 0
+        
+       
+        if "[" in value_clean and "]" in value_clean:
+            content = value_clean.strip("[]")
+            if content.strip() == "":
+                return 0
+            count = len([x for x in content.split(",") if x.strip()])
+            return count
+        
+        # Números escritos como texto ("3")
+        try:
+            return float(value_clean)
+        except ValueError:
+            return None
+    
+    return None
+
+
+# Cuenta los elementos no vacíos de una lista escrita como texto: "['a', 'b']" -> 2
+_LIST_ITEM_PATTERN = r'(?:^|,)\s*[^,\s]'
+
+
+def coerce_column(col, values):
+    """
+    Convierte una columna cruda a numérica con las mismas reglas que
+    DataCleaner.standardize_data_types, de forma vectorizada.
+
+    Devuelve (valores, máscara_listas, máscara_etiquetas), donde las
+    máscaras marcan las filas que venían como lista de actividades o como
+    etiqueta de texto de 'riesgo'.
+    """
+    no_match = pd.Series(False, index=values.index)
+
+    if values.dtype != object:
+        return values, no_match, no_match
+
+    numeric = pd.to_numeric(values, errors='coerce')
+    pending = numeric.isna() & values.notna()
+    list_mask = no_match
+    label_mask = no_match
+
+    if pending.any():
+        text = values[pending].astype(str).str.strip()
+
+        if col == 'actividades_extracurriculares':
+            # "['deportes', 'club']" -> 2, "[]" o "" -> 0
+            is_list = (text == "") | (text.str.contains("[", regex=False) & text.str.contains("]", regex=False))
+            counts = text[is_list].str.strip("[]").str.count(_LIST_ITEM_PATTERN)
+            numeric.loc[counts.index] = counts
+            list_mask = no_match.copy()
+            list_mask.loc[counts.index] = True
+
+        elif col == 'riesgo':
+            # "riesgo" -> 1, "no riesgo" -> 0
+            labels = text.str.lower().map({'riesgo': 1, 'no riesgo': 0}).dropna()
+            numeric.loc[labels.index] = labels
+            label_mask = no_match.copy()
+            label_mask.loc[labels.index] = True
+
+    return numeric, list_mask, label_mask
+
+
+def row_fingerprints(df):
+    """
+    Hash (uint64) por fila de los valores ya convertidos a número, sin el
+    índice: dos filas con los mismos datos tienen la misma huella aunque
+    vengan de archivos distintos ("80" y 80 cuentan igual).
+    """
+    hashed = pd.DataFrame({
+        col: df[col].astype('float64') if col in DataCleaner.VALUE_RANGES else df[col]
+        for col in df.columns
+    }, index=df.index)
+    return pd.util.hash_pandas_object(hashed, index=False).to_numpy(dtype=np.uint64)
+
 
 class DataCleaner:
     
+    # Rangos lógicos (mínimo, máximo) de cada variable; None = sin límite
+    VALUE_RANGES = {
+        'promedio_actual': (0, 100),
+        'asistencia_clases': (0, 100),  
+        'tareas_entregadas': (0, 100),
+        'participacion_clase': (0, 100),  
+        'horas_estudio': (0, 24),
+        'promedio_evaluaciones': (0, 100),
+        'cursos_reprobados': (0, None),
+        'actividades_extracurriculares': (0, None),
+        'reportes_disciplinarios': (0, None),
+        'riesgo': (0, 1)
+    }
+    
     def __init__(self):
-        self.scaler = StandardScaler()
+        # El StandardScaler se crea al normalizar (evita importar sklearn al limpiar)
+        self.scaler = None
         self.cleaning_report = {}
+        # Parámetros aprendidos en clean_data, reutilizados por append_data
+        self.medians = {}
+        self.modes = {}
+        # Huellas (ordenadas) de las filas que ya están en el dataset limpio
+        self.row_fingerprints = np.empty(0, dtype=np.uint64)
+        # Por columna, índices de las filas del dataset limpio cuyo valor se
+        # imputó: la mediana recalculada en append_data solo usa valores reales
+        self.imputed_rows = {}
     
-    def clean_data(self, df):
+    def clean_data(self, df, coerced=None):
+        """
+        coerced: columnas ya convertidas a float por DataProfiler durante la
+        carga (mismo índice que df). Si se envían no se vuelven a convertir.
+        """
         
         print(" Iniciando limpieza de datos...")
         #agregar limpiaza
@@ -19,7 +135,11 @@ class DataCleaner:
         df_clean = self.remove_duplicates(df_clean)
         
         #  Estandarizar tipos (convertir texto a números) 
-        df_clean = self.standardize_data_types(df_clean)
+        df_clean = self.standardize_data_types(df_clean, coerced)
+        
+        # Huellas antes de imputar: con ellas append_data descarta filas repetidas
+        self.row_fingerprints = np.unique(row_fingerprints(df_clean))
+        self.imputed_rows = self._missing_rows(df_clean)
         
         #  Rellenar valores faltantes 
         df_clean = self.handle_missing_values(df_clean)
@@ -30,6 +150,26 @@ class DataCleaner:
         print(" Limpieza completada")
         return df_clean
     
+    @staticmethod
+    def _missing_rows(df):
+        """
+        {columna numérica: índices de las filas con NaN} (antes de imputar).
+        """
+        missing = df.select_dtypes(include=[np.number]).isna()
+        return {
+            col: df.index.to_numpy()[missing[col].to_numpy()]
+            for col in missing.columns if missing[col].any()
+        }
+    
+    def _observed(self, cleaned, col):
+        """
+        Valores de col en el dataset limpio que no fueron imputados.
+        """
+        imputed = self.imputed_rows.get(col)
+        if imputed is None or not len(imputed):
+            return cleaned[col]
+        return cleaned[col][~cleaned.index.isin(imputed)]
+    
     def remove_duplicates(self, df):
         """
         Elimina estudiantes que aparecen más de una vez.
@@ -47,44 +187,16 @@ class DataCleaner:
         
         return df_clean
     
-    def standardize_data_types(self, df):
+    def standardize_data_types(self, df, coerced=None):
         
         df_clean = df.copy()
         
+        # Solo se reutilizan las conversiones si corresponden a estas filas
+        if coerced is not None and not df_clean.index.isin(coerced.index).all():
+            coerced = None
+        
         if 'actividades_extracurriculares' in df_clean.columns:
             print("   Procesando actividades_extracurriculares (convirtiendo listas a cantidad)...")
-            
-            def count_activities(value):
-                """Convierte listas de actividades a cantidad numérica"""
-                if pd.isna(value):
-                    return None
-                
-                if isinstance(value, (int, float)):
-                    return value
-                
-                # Si es string, intentar parsearlo
-                if isinstance(value, str):
-                    value_clean = value.strip()
-                    
-                    if value_clean == "[]" or value_clean == "":
-                        return 0
-                    
-                   
-                    if "[" in value_clean and "]" in value_clean:
-                        content = value_clean.strip("[]")
-                        if content.strip() == "":
-                            return 0
-                        count = len([x for x in content.split(",") if x.strip()])
-                        return count
-                
-                return None
-            
-            #   conversión
-            original_values = df_clean['actividades_extracurriculares'].copy()
-            df_clean['actividades_extracurriculares'] = df_clean['actividades_extracurriculares'].apply(count_activities)
-            
-            converted = (original_values != df_clean['actividades_extracurriculares']).sum()
-            print(f"     {converted} listas convertidas a cantidades numéricas")
         
         print("   Convirtiendo valores de texto a numéricos...")
         
@@ -107,15 +219,14 @@ class DataCleaner:
             if col in df_clean.columns:
                 nulls_before = df_clean[col].isnull().sum()
                 
-                if col == 'riesgo':
-                    # Convertir texto a números: "riesgo" -> 1, "no riesgo" -> 0
-                    df_clean[col] = df_clean[col].apply(
-                        lambda x: 1 if str(x).lower().strip() == 'riesgo' 
-                        else 0 if str(x).lower().strip() == 'no riesgo' 
-                        else x
-                    )
-                
-                df_clean[col] = pd.to_numeric(df_clean[col], errors='coerce')
+                if coerced is not None and col in coerced.columns:
+                    # Conversión ya hecha por el perfilador al cargar
+                    df_clean[col] = coerced[col].loc[df_clean.index]
+                else:
+                    # Listas de actividades -> cantidad, "riesgo"/"no riesgo" -> 1/0, texto -> NaN
+                    df_clean[col], list_mask, _ = coerce_column(col, df_clean[col])
+                    if list_mask.any():
+                        print(f"     {int(list_mask.sum())} listas convertidas a cantidades numéricas")
                 
                 nulls_after = df_clean[col].isnull().sum()
                 text_converted = nulls_after - nulls_before
@@ -140,34 +251,48 @@ class DataCleaner:
         
         return df_clean
     
-    def handle_missing_values(self, df):
+    def handle_missing_values(self, df, medians=None, modes=None):
+        """
+        medians / modes: valores de relleno ya aprendidos (append_data). Sin
+        ellos se calculan con df y se guardan en self.medians / self.modes.
+        """
         
         df_clean = df.copy()
         missing_before = df_clean.isnull().sum().sum()
         
+        numeric_cols = df_clean.select_dtypes(include=[np.number]).columns
+        categorical_cols = df_clean.select_dtypes(include=['object']).columns
+        
+        if medians is None:
+            medians = {col: float(df_clean[col].median()) for col in numeric_cols}
+            modes = {
+                col: df_clean[col].mode()[0] if not df_clean[col].mode().empty else "DESCONOCIDO"
+                for col in categorical_cols
+            }
+            self.medians, self.modes = medians, modes
+        modes = modes or {}
+        
         if missing_before == 0:
             print("   No hay valores faltantes que rellenar")
             self.cleaning_report['missing_values_handled'] = 0
             return df_clean
         
-        numeric_cols = df_clean.select_dtypes(include=[np.number]).columns
-        
         filled_count = 0
         for col in numeric_cols:
             if df_clean[col].isnull().any():
                 missing_count = df_clean[col].isnull().sum()
-                median_val = df_clean[col].median()
-                df_clean[col].fillna(median_val, inplace=True)
+                median_val = medians.get(col, np.nan)
+                if pd.isna(median_val):
+                    median_val = df_clean[col].median()
+                df_clean[col] = df_clean[col].fillna(median_val)
                 filled_count += missing_count
                 print(f"   {col}: {missing_count} valores rellenados con mediana ({median_val:.2f})")
         
-        categorical_cols = df_clean.select_dtypes(include=['object']).columns
-        
         for col in categorical_cols:
             if df_clean[col].isnull().any():
                 missing_count = df_clean[col].isnull().sum()
-                mode_val = df_clean[col].mode()[0] if not df_clean[col].mode().empty else "DESCONOCIDO"
-                df_clean[col].fillna(mode_val, inplace=True)
+                mode_val = modes.get(col, "DESCONOCIDO")
+                df_clean[col] = df_clean[col].fillna(mode_val)
                 filled_count += missing_count
                 print(f"   {col}: {missing_count} valores rellenados con moda ({mode_val})")
         
@@ -179,20 +304,7 @@ class DataCleaner:
         
         df_clean = df.copy()
         
-        #   rangos lógicos para cada variable
-        
-        ranges = {
-            'promedio_actual': (0, 100),
-            'asistencia_clases': (0, 100),  
-            'tareas_entregadas': (0, 100),
-            'participacion_clase': (0, 100),  
-            'horas_estudio': (0, 24),
-            'promedio_evaluaciones': (0, 100),
-            'cursos_reprobados': (0, None),
-            'actividades_extracurriculares': (0, None),
-            'reportes_disciplinarios': (0, None),
-            'riesgo': (0, 1)
-        }
+        ranges = self.VALUE_RANGES
         
         total_adjusted = 0
         
@@ -221,6 +333,118 @@ class DataCleaner:
         
         return df_clean
     
+    def append_data(self, cleaned, new_df, coerced=None, recompute_medians=False):
+        """
+        Agrega las filas de new_df (crudas) al dataset ya limpio, limpiando
+        solo las nuevas con las medianas y rangos aprendidos en clean_data.
+
+        - descarta las filas repetidas dentro del archivo y las que ya están
+          en el dataset (por huella de sus valores)
+        - recompute_medians=True recalcula las medianas con todo el dataset
+          antes de rellenar (por defecto se usan las guardadas); solo cuentan
+          los valores reales, no los que se rellenaron con la mediana anterior
+        - las filas nuevas continúan el índice de cleaned
+        - cleaning_report acumula los totales y describe el último append
+
+        Devuelve el DataFrame limpio completo. No modifica cleaned.
+        """
+        if not self.medians:
+            raise ValueError("No hay parámetros de limpieza. Primero limpia un dataset completo.")
+        
+        missing_cols = [col for col in cleaned.columns if col not in new_df.columns]
+        if missing_cols:
+            raise ValueError(f"Faltan las siguientes columnas: {', '.join(missing_cols)}")
+        
+        print(" Agregando datos nuevos al dataset limpio...")
+        report = self.cleaning_report
+        self.cleaning_report = {}
+        rows_received = len(new_df)
+        
+        df_new = self.remove_duplicates(new_df[list(cleaned.columns)])
+        df_new = self.standardize_data_types(df_new, coerced)
+        
+        # Filas que ya están en el dataset o repetidas tras convertir a número
+        fingerprints = row_fingerprints(df_new)
+        seen = np.isin(fingerprints, self.row_fingerprints) | pd.Series(fingerprints).duplicated().to_numpy()
+        df_new = df_new[~seen]
+        fingerprints = fingerprints[~seen]
+        duplicates = self.cleaning_report['duplicates_removed'] + int(seen.sum())
+        print(f"   {int(seen.sum())} filas ya estaban en el dataset")
+        
+        # NaN por celda antes de rellenar (las filas ya no cambian de posición)
+        missing = df_new.select_dtypes(include=[np.number]).isna()
+        medians = self.medians
+        if recompute_medians:
+            numeric_cols = df_new.select_dtypes(include=[np.number]).columns
+            medians = {
+                col: float(pd.concat([self._observed(cleaned, col), df_new[col]]).median())
+                for col in numeric_cols if col in cleaned.columns
+            }
+            print("   Medianas recalculadas con el dataset completo")
+        
+        df_new = self.handle_missing_values(df_new, medians=medians, modes=self.modes)
+        df_new = self.fix_out_of_range_values(df_new)
+        
+        # Continuar el índice del dataset limpio
+        start = int(cleaned.index.max()) + 1 if len(cleaned) else 0
+        df_new.index = pd.RangeIndex(start, start + len(df_new))
+        df_new = df_new.astype(cleaned.dtypes.to_dict(), errors='ignore')
+        merged = pd.concat([cleaned, df_new])
+        
+        self.medians = medians
+        self.row_fingerprints = np.union1d(self.row_fingerprints, fingerprints)
+        # Dict nuevo: una copia superficial del cleaner no comparte los cambios
+        imputed_rows = dict(self.imputed_rows)
+        for col in missing.columns[missing.any().to_numpy()]:
+            new_rows = df_new.index.to_numpy()[missing[col].to_numpy()]
+            imputed_rows[col] = np.concatenate([imputed_rows.get(col, new_rows[:0]), new_rows])
+        self.imputed_rows = imputed_rows
+        
+        last = {
+            'rows_received': rows_received,
+            'rows_appended': int(len(df_new)),
+            'duplicates_removed': duplicates,
+            'missing_values_handled': self.cleaning_report.get('missing_values_handled', 0),
+            'values_adjusted': self.cleaning_report.get('values_adjusted', 0),
+            'text_converted_to_numeric': self.cleaning_report.get('text_converted_to_numeric', {}),
+            'medians_recomputed': bool(recompute_medians),
+        }
+        
+        text_converted = dict(report.get('text_converted_to_numeric', {}))
+        for col, count in last['text_converted_to_numeric'].items():
+            text_converted[col] = text_converted.get(col, 0) + count
+        
+        self.cleaning_report = {
+            **report,
+            'duplicates_removed': report.get('duplicates_removed', 0) + duplicates,
+            'missing_values_handled': report.get('missing_values_handled', 0) + last['missing_values_handled'],
+            'values_adjusted': report.get('values_adjusted', 0) + last['values_adjusted'],
+            'text_converted_to_numeric': text_converted,
+            'appends': report.get('appends', 0) + 1,
+            'last_append': last,
+        }
+        
+        print(f" {last['rows_appended']} filas agregadas ({len(merged)} en total)")
+        return merged
+    
+    def coerce_features(self, df, feature_columns):
+        """
+        Aplica a las columnas de entrada las mismas conversiones que
+        clean_data (listas de actividades -> cantidad, texto -> NaN) y los
+        rangos de VALUE_RANGES, sin tocar la variable objetivo ni eliminar
+        filas. Devuelve un DataFrame float solo con feature_columns.
+        """
+        coerced = pd.DataFrame(index=df.index)
+        
+        for col in feature_columns:
+            values, _, _ = coerce_column(col, df[col])
+            values = values.astype(float)
+            
+            min_val, max_val = self.VALUE_RANGES.get(col, (None, None))
+            coerced[col] = values.clip(lower=min_val, upper=max_val)
+        
+        return coerced
+    
     def normalize_features(self, df, exclude_columns=['riesgo']):
        
         df_normalized = df.copy()
@@ -230,6 +454,9 @@ class DataCleaner:
         cols_to_normalize = [col for col in numeric_cols if col not in exclude_columns]
         
         if len(cols_to_normalize) > 0:
+            if self.scaler is None:
+                from sklearn.preprocessing import StandardScaler
+                self.scaler = StandardScaler()
             df_normalized[cols_to_normalize] = self.scaler.fit_transform(df_normalized[cols_to_normalize])
             print(f"   Normalizadas {len(cols_to_normalize)} columnas")
         
@@ -0,0 +1,100 @@
+import zlib
+import weakref
+
+
+class DataExporter:
+    """
+    Genera un DataFrame como CSV por lotes de filas, opcionalmente
+    comprimido con gzip, para enviarlo en streaming sin armar el archivo
+    completo en memoria.
+    """
+
+    # Filas que se serializan por lote
+    BATCH_ROWS = 10_000
+
+    # Máximo de tamaños recordados para Content-Length
+    MAX_KNOWN_SIZES = 64
+
+    def __init__(self, batch_rows=None, gzip_level=6):
+        self.batch_rows = batch_rows or self.BATCH_ROWS
+        self.gzip_level = gzip_level
+        # Tamaños ya medidos: (id del df, columnas, inicio, fin, gzip) -> (weakref, bytes)
+        self._known_sizes = {}
+
+    def resolve(self, df, columns=None, start=None, stop=None):
+        """
+        Valida columnas y rango de filas. Devuelve (columnas, inicio, fin).
+        Lanza ValueError si algo no es válido.
+        """
+        if columns:
+            unknown = [col for col in columns if col not in df.columns]
+            if unknown:
+                raise ValueError(f"Columnas desconocidas: {', '.join(unknown)}")
+        else:
+            columns = list(df.columns)
+
+        total = len(df)
+        try:
+            start = 0 if start is None else int(start)
+            stop = total if stop is None else int(stop)
+        except (TypeError, ValueError):
+            raise ValueError("start y stop deben ser enteros")
+        if start < 0 or stop < start:
+            raise ValueError("Rango de filas inválido: se requiere 0 <= start <= stop")
+
+        return list(columns), min(start, total), min(stop, total)
+
+    def iter_csv(self, df, columns, start, stop):
+        """
+        Produce el CSV (bytes) por lotes; el encabezado va en el primer lote.
+        """
+        yield (",".join(columns) + "\n").encode("utf-8")
+
+        for offset in range(start, stop, self.batch_rows):
+            batch = df.iloc[offset:min(offset + self.batch_rows, stop)][columns]
+            yield batch.to_csv(index=False, header=False).encode("utf-8")
+
+    def iter_gzip(self, chunks):
+        """
+        Comprime con gzip un generador de bytes sin juntarlo completo.
+        """
+        # wbits=31 -> formato gzip (encabezado y CRC incluidos)
+        compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+
+    def stream(self, df, columns, start, stop, gzip=False):
+        """
+        Generador final para la respuesta HTTP. Al terminar registra el
+        tamaño total para que exportaciones idénticas informen Content-Length.
+        """
+        key = (id(df), tuple(columns), start, stop, bool(gzip))
+        chunks = self.iter_csv(df, columns, start, stop)
+        if gzip:
+            chunks = self.iter_gzip(chunks)
+
+        size = 0
+        for chunk in chunks:
+            size += len(chunk)
+            yield chunk
+
+        # Se descartan los tamaños de DataFrames que ya no existen
+        self._known_sizes = {
+            k: v for k, v in self._known_sizes.items() if v[0]() is not None
+        }
+        if len(self._known_sizes) >= self.MAX_KNOWN_SIZES:
+            self._known_sizes.pop(next(iter(self._known_sizes)))
+        self._known_sizes[key] = (weakref.ref(df), size)
+
+    def known_size(self, df, columns, start, stop, gzip=False):
+        """
+        Tamaño en bytes de una exportación ya hecha sobre el mismo DataFrame,
+        o None si todavía no se conoce.
+        """
+        entry = self._known_sizes.get((id(df), tuple(columns), start, stop, bool(gzip)))
+        if entry is None or entry[0]() is not df:
+            return None
+        return entry[1]
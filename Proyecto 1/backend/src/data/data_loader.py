@@ -1,5 +1,172 @@
 import pandas as pd
 import os
+import io
+import bz2
+import gzip
+import lzma
+import zipfile
+import importlib.util
+
+from src.config import REQUIRED_COLUMNS
+
+# pyarrow es opcional: si no está instalado se usa el parser de pandas
+PYARROW_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+# zstandard también es opcional: sin él no se aceptan archivos .zst
+ZSTD_AVAILABLE = importlib.util.find_spec('zstandard') is not None
+
+# Extensión del archivo -> formato de compresión
+COMPRESSION_EXTENSIONS = {
+    'gz': 'gzip',
+    'bz2': 'bz2',
+    'xz': 'xz',
+    'zip': 'zip',
+}
+if ZSTD_AVAILABLE:
+    COMPRESSION_EXTENSIONS['zst'] = 'zstd'
+
+# Filas por chunk al leer un CSV comprimido (o al perfilar mientras se lee)
+COMPRESSED_CHUNKSIZE = 50_000
+
+# Columnas que el parser de Arrow lee como texto y convierte una por una
+# (las del modelo + la variable objetivo, ver src/config.py)
+ARROW_TEXT_COLUMNS = REQUIRED_COLUMNS
+
+
+def read_csv_c(file_path):
+    """
+    Parser por defecto de pandas (un hilo, infiere el tipo de cada columna).
+    """
+    return pd.read_csv(file_path)
+
+
+def _cast_arrow_column(column):
+    """
+    Convierte una columna de texto de Arrow como la inferiría el parser de
+    pandas: int64 si todos los valores son enteros, si no float64 y, si hay
+    texto ('Sí', 'noventa', listas), la columna queda como texto para que
+    la limpie coerce_column. Los espacios alrededor del número se ignoran.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    def cast(values):
+        for candidate in (pa.int64(), pa.float64()):
+            try:
+                return values.cast(candidate)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                continue
+        return None
+
+    # Recortar espacios copia la columna: solo si no convierte tal cual
+    converted = cast(column)
+    if converted is None:
+        converted = cast(pc.utf8_trim_whitespace(column))
+    return column if converted is None else converted
+
+
+def read_csv_arrow(file_path):
+    """
+    Parser multihilo de Arrow. Las columnas de ARROW_TEXT_COLUMNS se leen
+    como texto (las vacías como nulos) y se convierten una por una, así
+    una columna sucia no obliga a leer todo el archivo con el parser de
+    pandas.
+    """
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    table = pa_csv.read_csv(
+        file_path,
+        read_options=pa_csv.ReadOptions(use_threads=True),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={col: pa.string() for col in ARROW_TEXT_COLUMNS},
+            strings_can_be_null=True
+        )
+    )
+    for i, name in enumerate(table.column_names):
+        if name in ARROW_TEXT_COLUMNS:
+            table = table.set_column(i, name, _cast_arrow_column(table.column(i)))
+    return table.to_pandas()
+
+
+# Parsers disponibles para DataLoader(parser=...)
+CSV_PARSERS = {
+    'c': read_csv_c,
+    'pyarrow': read_csv_arrow,
+}
+
+
+class DecompressedSizeError(ValueError):
+    """
+    El archivo descomprimido supera el tamaño permitido.
+    """
+
+
+class _LimitedReader(io.RawIOBase):
+    """
+    Envuelve un stream descomprimido y cuenta los bytes leídos; falla en
+    cuanto se pasa de max_bytes (protege contra bombas de descompresión).
+    """
+
+    def __init__(self, stream, max_bytes):
+        self.stream = stream
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.stream.read(len(buffer))
+        n = len(data)
+        self.bytes_read += n
+        if self.max_bytes is not None and self.bytes_read > self.max_bytes:
+            raise DecompressedSizeError(
+                f"El archivo descomprimido supera el máximo de {self.max_bytes // (1024 * 1024)}MB"
+            )
+        buffer[:n] = data
+        return n
+
+    def close(self):
+        try:
+            self.stream.close()
+        finally:
+            super().close()
+
+
+def compression_from_filename(filename):
+    """
+    Devuelve el formato de compresión según la extensión, o None si es
+    un CSV sin comprimir.
+    """
+    if '.' not in filename:
+        return None
+    return COMPRESSION_EXTENSIONS.get(filename.rsplit('.', 1)[1].lower())
+
+
+def open_decompressed(fileobj, compression):
+    """
+    Abre un stream binario que va descomprimiendo fileobj a medida que se lee
+    (nada se escribe a disco).
+    """
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=fileobj, mode='rb')
+    if compression == 'bz2':
+        return bz2.BZ2File(fileobj, mode='rb')
+    if compression == 'xz':
+        return lzma.LZMAFile(fileobj, mode='rb')
+    if compression == 'zip':
+        archive = zipfile.ZipFile(fileobj)
+        members = [m for m in archive.infolist()
+                   if not m.is_dir() and m.filename.lower().endswith('.csv')]
+        if len(members) != 1:
+            raise ValueError("El archivo .zip debe contener exactamente un archivo .csv")
+        return archive.open(members[0])
+    if compression == 'zstd':
+        import zstandard
+        return zstandard.ZstdDecompressor().stream_reader(fileobj)
+    raise ValueError(f"Compresión no soportada: {compression}")
+
 
 class DataLoader:
     
@@ -30,18 +197,84 @@ class DataLoader:
         'reportes_disciplinarios'
     ]
     
-    def __init__(self, upload_folder='uploads'):
+    def __init__(self, upload_folder='uploads', parser='auto'):
        
         self.upload_folder = upload_folder
         
+        # 'auto' usa Arrow si está instalado; 'c' fuerza el parser de pandas
+        if parser == 'auto':
+            parser = 'pyarrow' if PYARROW_AVAILABLE else 'c'
+        if parser not in CSV_PARSERS:
+            raise ValueError(f"Parser desconocido '{parser}'. Opciones: {', '.join(CSV_PARSERS)}")
+        if parser == 'pyarrow' and not PYARROW_AVAILABLE:
+            raise ValueError("El parser 'pyarrow' requiere instalar pyarrow")
+        
+        self.parser = parser
+        self.last_parser_used = None
+        
         if not os.path.exists(upload_folder):
             os.makedirs(upload_folder)
             print(f" Carpeta '{upload_folder}' creada")
     
-    def load_csv(self, file_path):
+    def read_csv(self, file_path):
+        """
+        Lee el CSV con el parser configurado. Si el parser rápido falla
+        (filas mal formadas, encoding, etc.) se vuelve a leer con el parser
+        de pandas. El texto en columnas numéricas no cuenta como falla: esa
+        columna queda como texto.
+        """
+        if self.parser != 'c':
+            try:
+                df = CSV_PARSERS[self.parser](file_path)
+                self.last_parser_used = self.parser
+                return df
+            except FileNotFoundError:
+                raise
+            except Exception as e:
+                print(f" Parser '{self.parser}' no pudo leer el archivo ({type(e).__name__}), usando parser de pandas")
+        
+        df = read_csv_c(file_path)
+        self.last_parser_used = 'c'
+        return df
+    
+    def _read_chunks(self, source, profiler=None):
+        """
+        Lee source por chunks con el parser de pandas y perfila cada chunk
+        apenas se lee (una sola pasada). Valida las columnas con el primer
+        chunk. Devuelve (df, columnas_faltantes).
+        """
+        chunks = []
+        for chunk in pd.read_csv(source, chunksize=COMPRESSED_CHUNKSIZE):
+            if not chunks:
+                missing_columns = self.validate_columns(chunk)
+                if missing_columns:
+                    return None, missing_columns
+            if profiler is not None:
+                profiler.update(chunk)
+            chunks.append(chunk)
+
+        self.last_parser_used = 'c'
+        return (pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()), []
+    
+    def load_csv(self, file_path, profiler=None):
+        """
+        profiler: DataProfiler opcional que se alimenta con los datos leídos
+        (perfil de calidad + columnas ya convertidas para DataCleaner).
+
+        Con el parser de pandas el perfil se arma chunk por chunk durante
+        la lectura. Arrow lee el archivo completo (multihilo) y el perfil se
+        calcula después sobre el DataFrame: leer Arrow por lotes para
+        perfilar cada uno resultó más lento que las dos etapas juntas.
+        """
         
         try:
-            df = pd.read_csv(file_path)
+            profiled_while_reading = profiler is not None and self.parser == 'c'
+            if profiled_while_reading:
+                df, missing_columns = self._read_chunks(file_path, profiler)
+                if missing_columns:
+                    return None, f"Faltan las siguientes columnas: {', '.join(missing_columns)}"
+            else:
+                df = self.read_csv(file_path)
             
             if df.empty:
                 return None, "El archivo CSV está vacío"
@@ -50,7 +283,12 @@ class DataLoader:
             if missing_columns:
                 return None, f"Faltan las siguientes columnas: {', '.join(missing_columns)}"
             
-            print(f" CSV cargado exitosamente: {df.shape[0]} filas, {df.shape[1]} columnas")
+            if profiler is not None:
+                if not profiled_while_reading:
+                    profiler.update(df)
+                profiler.finalize()
+            
+            print(f" CSV cargado exitosamente: {df.shape[0]} filas, {df.shape[1]} columnas (parser: {self.last_parser_used})")
             return df, None
             
         except FileNotFoundError:
@@ -60,6 +298,45 @@ class DataLoader:
         except Exception as e:
             return None, f"Error al cargar CSV: {str(e)}"
     
+    def load_compressed_csv(self, fileobj, filename, max_bytes=None, profiler=None):
+        """
+        Carga un CSV comprimido (gzip, bz2, xz, zip o zstd) directamente desde
+        el stream subido, descomprimiendo por partes hacia el parser de pandas.
+
+        max_bytes limita el tamaño DESCOMPRIMIDO; si se supera se lanza
+        DecompressedSizeError. Si se envía profiler, se perfila cada chunk
+        apenas se lee.
+        """
+        compression = compression_from_filename(filename)
+        if compression is None:
+            return None, "El archivo no está comprimido"
+
+        try:
+            with io.BufferedReader(_LimitedReader(open_decompressed(fileobj, compression), max_bytes)) as stream:
+                df, missing_columns = self._read_chunks(stream, profiler)
+                if missing_columns:
+                    return None, f"Faltan las siguientes columnas: {', '.join(missing_columns)}"
+                bytes_read = stream.raw.bytes_read
+
+            if df.empty:
+                return None, "El archivo CSV está vacío"
+
+            if profiler is not None:
+                profiler.finalize()
+
+            print(f" CSV comprimido ({compression}) cargado: {df.shape[0]} filas, "
+                  f"{df.shape[1]} columnas, {bytes_read / (1024 * 1024):.1f}MB descomprimidos")
+            return df, None
+
+        except DecompressedSizeError:
+            raise
+        except pd.errors.EmptyDataError:
+            return None, "El archivo está vacío"
+        except (OSError, EOFError, zipfile.BadZipFile, lzma.LZMAError) as e:
+            return None, f"No se pudo descomprimir el archivo ({compression}): {str(e)}"
+        except Exception as e:
+            return None, f"Error al cargar CSV: {str(e)}"
+
     def validate_columns(self, df):
         
         df_columns = set(df.columns)              
@@ -78,33 +355,6 @@ class DataLoader:
             'missing_values': df.isnull().sum().to_dict(),  # Valores faltantes por columna
             'data_types': df.dtypes.astype(str).to_dict()   # Tipo de dato de cada columna
         }
-    
-    def validate_numeric_columns(self, df):
-       
-        errors = []
-        
-        for col in self.NUMERIC_COLUMNS:
-            if col in df.columns:
-                try:
-                    numeric_values = pd.to_numeric(df[col], errors='coerce')
-                    
-                    original_nulls = df[col].isnull().sum()
-                    new_nulls = numeric_values.isnull().sum()
-                    non_numeric_count = new_nulls - original_nulls
-                    
-                    if non_numeric_count > 0:
-                        problematic_values = df[col][~df[col].isnull() & numeric_values.isnull()].unique()[:3]
-                        errors.append(
-                            f"'{col}' tiene {non_numeric_count} valores no numéricos. "
-                            f"Ejemplos: {list(problematic_values)}"
-                        )
-                except Exception as e:
-                    errors.append(f"'{col}': Error al validar - {str(e)}")
-        
-        if errors:
-            return "; ".join(errors)
-        return None
-
 
 if __name__ == "__main__":
     loader = DataLoader()
@@ -0,0 +1,121 @@
+import pandas as pd
+
+from src.config import REQUIRED_COLUMNS
+from src.data.data_cleaner import DataCleaner, coerce_column
+
+
+class DataProfiler:
+    """
+    Perfil de calidad de datos que se arma mientras se carga el CSV.
+
+    Por cada columna de REQUIRED_COLUMNS reporta nulos, valores no numéricos
+    (con ejemplos), listas de actividades, valores fuera de VALUE_RANGES y
+    cardinalidad. Las columnas ya convertidas a números quedan en
+    self.coerced para que DataCleaner no repita la conversión.
+
+    La cardinalidad se cuenta hasta MAX_DISTINCT valores distintos; pasado
+    ese límite se deja de guardar la columna y se reporta ">MAX_DISTINCT"
+    (una columna de texto libre no queda entera en memoria).
+    """
+
+    MAX_EXAMPLES = 3
+    MAX_DISTINCT = 10_000
+
+    def __init__(self, columns=None):
+        self.columns = columns or REQUIRED_COLUMNS
+        self.rows = 0
+        self._stats = {
+            col: {
+                'nulls': 0,
+                'non_numeric': 0,
+                'non_numeric_examples': [],
+                'list_encoded': 0,
+                'text_labels': 0,
+                'below_min': 0,
+                'above_max': 0,
+            }
+            for col in self.columns
+        }
+        self._distinct = {col: set() for col in self.columns}
+        self._coerced_chunks = []
+        self.coerced = None
+        self.report = None
+
+    def update(self, chunk):
+        """
+        Agrega un chunk recién leído al perfil (una pasada por columna).
+        """
+        self.rows += len(chunk)
+        coerced = pd.DataFrame(index=chunk.index)
+
+        for col in self.columns:
+            if col not in chunk.columns:
+                continue
+            raw = chunk[col]
+            stats = self._stats[col]
+
+            values, list_mask, label_mask = coerce_column(col, raw)
+            coerced[col] = values
+
+            raw_nulls = raw.isna()
+            failed = values.isna() & ~raw_nulls
+
+            stats['nulls'] += int(raw_nulls.sum())
+            stats['non_numeric'] += int(failed.sum())
+            stats['list_encoded'] += int(list_mask.sum())
+            stats['text_labels'] += int(label_mask.sum())
+
+            examples = stats['non_numeric_examples']
+            if failed.any() and len(examples) < self.MAX_EXAMPLES:
+                for value in raw[failed].unique()[:self.MAX_EXAMPLES]:
+                    if value not in examples and len(examples) < self.MAX_EXAMPLES:
+                        examples.append(value)
+
+            min_val, max_val = DataCleaner.VALUE_RANGES.get(col, (None, None))
+            if min_val is not None:
+                stats['below_min'] += int((values < min_val).sum())
+            if max_val is not None:
+                stats['above_max'] += int((values > max_val).sum())
+
+            self._count_distinct(col, raw)
+
+        self._coerced_chunks.append(coerced)
+
+    def _count_distinct(self, col, raw):
+        distinct = self._distinct[col]
+        if distinct is None:
+            return
+        uniques = raw.dropna().unique()
+        # Si el chunk ya trae más de MAX_DISTINCT valores no hace falta el set
+        if len(uniques) > self.MAX_DISTINCT:
+            self._distinct[col] = None
+            return
+        distinct.update(uniques)
+        if len(distinct) > self.MAX_DISTINCT:
+            self._distinct[col] = None
+
+    def finalize(self):
+        """
+        Cierra el perfil: junta las columnas convertidas y arma el reporte.
+        """
+        if self._coerced_chunks:
+            self.coerced = pd.concat(self._coerced_chunks)
+        self._coerced_chunks = []
+
+        columns = {}
+        for col in self.columns:
+            stats = dict(self._stats[col])
+            stats['out_of_range'] = stats['below_min'] + stats['above_max']
+            distinct = self._distinct[col]
+            stats['cardinality'] = len(distinct) if distinct is not None else f">{self.MAX_DISTINCT}"
+            columns[col] = stats
+
+        self.report = {
+            'rows': self.rows,
+            'columns': columns,
+            'total_nulls': sum(c['nulls'] for c in columns.values()),
+            'total_non_numeric': sum(c['non_numeric'] for c in columns.values()),
+            'total_out_of_range': sum(c['out_of_range'] for c in columns.values()),
+        }
+        self._distinct = {col: set() for col in self.columns}
+        return self.report
@@ -0,0 +1,160 @@
+"""
+Resúmenes de distribución para el dashboard: histogramas por feature,
+histogramas por clase de 'riesgo' y matriz de correlación.
+
+Se usan los mismos bins fijos que el monitoreo de drift (src/ml/drift.py),
+así la respuesta tiene siempre el mismo tamaño (n_features x bins) sin
+importar cuántas filas tenga el dataset, y los histogramas se pueden
+comparar directamente con los de entrenamiento.
+
+Los DataFrames de un snapshot no se modifican nunca: el resumen se calcula
+una vez por DataFrame y queda en SummaryCache mientras ese DataFrame siga
+en memoria.
+"""
+import threading
+import time
+import weakref
+
+import numpy as np
+
+from src.config import FEATURE_COLUMNS, TARGET_COLUMN
+from src.data.data_cleaner import coerce_column
+from src.ml.drift import BIN_COUNTS, BIN_LOWS, BIN_WIDTHS, MAX_BINS, histogram
+
+CLASSES = (0, 1)
+
+
+def numeric_matrix(df, coerced=None):
+    """
+    Matriz float64 (filas x FEATURE_COLUMNS + riesgo). Usa las columnas ya
+    convertidas del perfil si las hay; si no, las convierte con las mismas
+    reglas que DataCleaner. Las columnas que falten quedan en NaN.
+    """
+    columns = FEATURE_COLUMNS + [TARGET_COLUMN]
+    matrix = np.full((len(df), len(columns)), np.nan)
+    for i, col in enumerate(columns):
+        if coerced is not None and col in coerced.columns:
+            values = coerced[col]
+        elif col in df.columns:
+            values = df[col]
+            if values.dtype == object:
+                values = coerce_column(col, values)[0]
+        else:
+            continue
+        matrix[:, i] = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    return matrix
+
+
+def class_histograms(X, y):
+    """
+    Histogramas por clase (len(CLASSES) x n_features x MAX_BINS). Las filas
+    sin clase válida no cuentan.
+    """
+    n_features = len(FEATURE_COLUMNS)
+    counts = np.zeros((len(CLASSES), n_features, MAX_BINS), dtype=np.int64)
+    for k, cls in enumerate(CLASSES):
+        counts[k] = histogram(X[y == cls])
+    return counts
+
+
+def correlation_matrix(Z):
+    """
+    Correlación de Pearson entre columnas con pares completos (cada par
+    usa las filas donde ambas columnas tienen dato). NaN si una columna es
+    constante o no tiene datos.
+    """
+    valid = ~np.isnan(Z)
+    if valid.all():
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.corrcoef(Z, rowvar=False)
+
+    # Centrar primero mejora la precisión de las sumas
+    with np.errstate(invalid='ignore'):
+        means = np.nanmean(Z, axis=0) if len(Z) else np.zeros(Z.shape[1])
+    Z0 = np.where(valid, Z - np.nan_to_num(means), 0.0)
+    V = valid.astype(np.float64)
+
+    n = V.T @ V                  # filas con ambos datos
+    sx = Z0.T @ V                # sx[i, j] = suma de i donde j también tiene dato
+    sxx = (Z0 * Z0).T @ V
+    sxy = Z0.T @ Z0
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = sxy - sx * sx.T / n
+        var_x = sxx - sx * sx / n
+        corr = cov / np.sqrt(var_x * var_x.T)
+    return np.clip(corr, -1.0, 1.0)
+
+
+def summarize(df, coerced=None):
+    """
+    Resumen compacto de un dataset. Los bins de cada feature se reconstruyen
+    con lows[i] + k * widths[i], k = 0..n_bins[i]; el último bin de las
+    columnas de conteo es "n_bins - 1 o más".
+    """
+    t0 = time.perf_counter()
+    Z = numeric_matrix(df, coerced)
+    X, y = Z[:, :-1], Z[:, -1]
+
+    missing = np.isnan(X)
+    n_bins = BIN_COUNTS.tolist()
+    # Los NaN no se cuentan en los histogramas (drift.histogram los pone en el primer bin)
+    counts = histogram(X)
+    counts[:, 0] -= missing.sum(axis=0)
+    by_class = class_histograms(X, y)
+    for k, cls in enumerate(CLASSES):
+        by_class[k, :, 0] -= missing[y == cls].sum(axis=0)
+
+    corr = correlation_matrix(Z)
+
+    return {
+        'rows': int(len(df)),
+        'features': list(FEATURE_COLUMNS),
+        'histograms': {
+            'lows': BIN_LOWS.tolist(),
+            'widths': BIN_WIDTHS.tolist(),
+            'n_bins': n_bins,
+            'counts': [counts[i, :n].tolist() for i, n in enumerate(n_bins)],
+            'missing': missing.sum(axis=0).tolist(),
+        },
+        'by_class': {
+            'class_counts': {str(cls): int(np.sum(y == cls)) for cls in CLASSES},
+            'counts': {
+                str(cls): [by_class[k, i, :n].tolist() for i, n in enumerate(n_bins)]
+                for k, cls in enumerate(CLASSES)
+            },
+        },
+        'correlation': {
+            'columns': FEATURE_COLUMNS + [TARGET_COLUMN],
+            'matrix': [[None if np.isnan(v) else round(float(v), 6) for v in row] for row in corr],
+        },
+        'computed_in_s': round(time.perf_counter() - t0, 6),
+    }
+
+
+class SummaryCache:
+    """
+    Resúmenes ya calculados por DataFrame (se descartan cuando el DataFrame
+    sale de memoria). Varias solicitudes para el mismo dataset esperan al
+    primer cálculo en vez de repetirlo.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # id(df) -> (referencia débil, resumen)
+        self._summaries = {}
+
+    def get(self, df, coerced=None):
+        """
+        Devuelve (resumen, True si ya estaba calculado).
+        """
+        key = id(df)
+        with self._lock:
+            cached = self._summaries.get(key)
+            if cached is not None and cached[0]() is df:
+                return cached[1], True
+
+            summary = summarize(df, coerced)
+            ref = weakref.ref(df, lambda _, key=key: self._summaries.pop(key, None))
+            self._summaries[key] = (ref, summary)
+            return summary, False
@@ -0,0 +1,174 @@
+"""
+Puntuación por lotes de un CSV completo con el modelo activo.
+
+Uso (desde la carpeta backend):
+    python -m src.ml.batch_scoring estudiantes.csv predicciones.csv --workers 4
+
+Lee el CSV por partes; cada parte se convierte (mismas reglas que
+DataCleaner sobre FEATURE_COLUMNS) y se puntúa en un pool de procesos, y se va
+escribiendo el resultado con las columnas 'prediction' y
+'probability_riesgo' agregadas al final. Con --explain se agrega además
+una columna 'contrib_<feature>' por feature (contribución al log-odds).
+"""
+import os
+import sys
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.config import FEATURE_COLUMNS
+from src.data.cleaning_transform import CleaningTransform
+from src.data.data_cleaner import DataCleaner
+from src.ml.model_registry import registry
+from src.ml.prediction import score_matrix, score_matrix_explained
+
+DEFAULT_CHUNKSIZE = 100_000
+
+# Modelo, limpiador y transformación cargados una vez por proceso del pool
+_worker_model = None
+_worker_cleaner = None
+_worker_transform = None
+
+
+def _init_worker(model_path, transform_arrays=None):
+    global _worker_model, _worker_cleaner, _worker_transform
+    _worker_model = joblib.load(model_path)
+    _worker_cleaner = DataCleaner()
+    if transform_arrays is not None:
+        _worker_transform = CleaningTransform.from_arrays(transform_arrays)
+
+
+def _score_chunk(raw_features, threshold, explain=False):
+    """
+    Corre en el proceso del pool: convierte y puntúa un chunk.
+    Devuelve (predicciones, probabilidades, contribuciones o None).
+    """
+    X = prepare_chunk(raw_features, _worker_cleaner, _worker_transform)
+    if explain:
+        predictions, probabilities, contributions, _ = score_matrix_explained(_worker_model, X, threshold)
+        return predictions, probabilities, contributions
+    predictions, probabilities = score_matrix(_worker_model, X, threshold)
+    return predictions, probabilities, None
+
+
+def prepare_chunk(chunk: pd.DataFrame, cleaner: DataCleaner, transform: CleaningTransform = None):
+    """
+    Convierte un chunk crudo en la matriz de entrada del modelo.
+
+    Los valores que no se pueden convertir se rellenan con las medianas de
+    entrenamiento guardadas con el modelo (transform). Con modelos que no
+    la tienen se usa la mediana del chunk.
+    """
+    features = cleaner.coerce_features(chunk, FEATURE_COLUMNS)
+    if transform is not None:
+        X, _ = transform.apply(features.to_numpy(dtype=np.float64))
+        return X
+    features = features.fillna(features.median()).fillna(0.0)
+    return features.to_numpy(dtype=np.float64)
+
+
+def score_csv(input_path, output_path, chunksize=DEFAULT_CHUNKSIZE, workers=None, explain=False):
+    """
+    Puntúa input_path por partes y escribe output_path en streaming.
+    Devuelve un resumen con filas procesadas y filas por segundo.
+    """
+    # Solo para validar que haya modelo; cada proceso del pool lo carga
+    _, model_path, metadata = registry.load_active()
+    threshold = metadata.get("threshold")
+    workers = workers or os.cpu_count() or 1
+
+    header = pd.read_csv(input_path, nrows=0)
+    missing_cols = [col for col in FEATURE_COLUMNS if col not in header.columns]
+    if missing_cols:
+        raise ValueError(f"Faltan las siguientes columnas: {', '.join(missing_cols)}")
+
+    print(f" Modelo: {model_path} (versión {metadata.get('version')})")
+    print(f" Procesos: {workers} | chunksize: {chunksize}")
+
+    total_rows = 0
+    start = time.perf_counter()
+    first_chunk = True
+
+    # Todos los workers usan el mismo archivo aunque cambie la versión activa
+    # Medianas de entrenamiento para rellenar faltantes (si el modelo las tiene)
+    version = metadata.get("version")
+    transform_arrays = registry.load_extra(version, "cleaning_transform") if version else None
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(model_path, transform_arrays)) as pool:
+        # Se mantienen a lo sumo 2 * workers chunks en vuelo (memoria constante)
+        pending = deque()
+
+        def write_next():
+            nonlocal first_chunk, total_rows
+            chunk, future = pending.popleft()
+            predictions, probabilities, contributions = future.result()
+
+            chunk['prediction'] = predictions.astype(int)
+            chunk['probability_riesgo'] = probabilities if probabilities is not None else np.nan
+            if contributions is not None:
+                for j, col in enumerate(FEATURE_COLUMNS):
+                    chunk[f'contrib_{col}'] = contributions[:, j]
+            chunk.to_csv(output_path, mode='w' if first_chunk else 'a',
+                         header=first_chunk, index=False)
+            first_chunk = False
+            total_rows += len(chunk)
+
+            elapsed = time.perf_counter() - start
+            print(f"   {total_rows} filas puntuadas ({total_rows / elapsed:,.0f} filas/s)")
+
+        for chunk in pd.read_csv(input_path, chunksize=chunksize):
+            # Solo viajan al pool las columnas que usa el modelo
+            future = pool.submit(_score_chunk, chunk[FEATURE_COLUMNS], threshold, explain)
+            pending.append((chunk, future))
+
+            if len(pending) >= 2 * workers:
+                write_next()
+
+        while pending:
+            write_next()
+
+    elapsed = time.perf_counter() - start
+
+    return {
+        "rows": total_rows,
+        "seconds": elapsed,
+        "rows_per_second": total_rows / elapsed if elapsed > 0 else 0.0,
+        "model_version": metadata.get("version"),
+        "output": output_path,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Puntúa un CSV completo con el modelo activo")
+    parser.add_argument("input", help="CSV de entrada")
+    parser.add_argument("output", help="CSV de salida con prediction y probability_riesgo")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--workers", type=int, default=None, help="procesos (por defecto: núcleos)")
+    parser.add_argument("--explain", action="store_true", help="agregar contribución por feature")
+    args = parser.parse_args(argv)
+
+    print("=" * 60)
+    print(" PUNTUACIÓN POR LOTES")
+    print("=" * 60)
+
+    try:
+        summary = score_csv(args.input, args.output, args.chunksize, args.workers, args.explain)
+    except ValueError as e:
+        print(f" Error: {e}")
+        return 1
+
+    print("\n" + "=" * 60)
+    print(f" {summary['rows']} filas en {summary['seconds']:.2f} s "
+          f"({summary['rows_per_second']:,.0f} filas/s)")
+    print(f" Resultado guardado en: {summary['output']}")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+from src.ml.prediction import build_feature_vector, parse_explain, parse_threshold, predict_batch
+
+# Máximo de predicciones que se agrupan en una sola llamada al modelo
+DEFAULT_MAX_BATCH_SIZE = 64
+
+# Tiempo máximo (ms) que se espera a que lleguen más solicitudes
+DEFAULT_MAX_WAIT_MS = 2.0
+
+
+class PredictBatcher:
+    """
+    Agrupa predicciones concurrentes en micro-lotes.
+
+    Cada hilo de solicitud encola su vector y espera un Future; un único
+    hilo de fondo junta lo que haya en la cola (hasta max_batch_size o
+    max_wait_ms) y hace una sola llamada vectorizada a predict_batch.
+    Con poco tráfico el lote es de una fila y no se agrega espera extra
+    más allá de max_wait_ms.
+    """
+
+    def __init__(self, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.stats = {"batches": 0, "rows": 0, "max_batch": 0}
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="predict-batcher", daemon=True)
+                self._thread.start()
+
+    def submit(self, input_data, threshold=None, explain=None):
+        """
+        Encola una predicción y devuelve un Future con el resultado.
+        Los errores de validación se lanzan aquí, en el hilo que llama.
+        """
+        values = build_feature_vector(input_data)
+        threshold = parse_threshold(threshold)
+        parse_explain(explain)
+        future = Future()
+        self._ensure_started()
+        self._queue.put((values, threshold, explain, future))
+        return future
+
+    def predict(self, input_data, threshold=None, explain=None, timeout=30):
+        """
+        Igual que predict_risk pero pasando por el micro-lote.
+        """
+        return self.submit(input_data, threshold, explain).result(timeout=timeout)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+
+        # Primero todo lo que ya está en cola, sin esperar
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        # Luego una espera corta por si llegan más
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            rows = [item[0] for item in batch]
+            thresholds = [item[1] for item in batch]
+            explain = [item[2] for item in batch]
+
+            try:
+                results = predict_batch(rows, thresholds, explain)
+            except Exception:
+                # Se repite fila por fila: solo falla la solicitud que tiene el problema
+                self._run_rows(batch)
+            else:
+                for item, result in zip(batch, results):
+                    item[-1].set_result(result)
+
+            self.stats["batches"] += 1
+            self.stats["rows"] += len(batch)
+            self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+
+    @staticmethod
+    def _run_rows(batch):
+        for values, threshold, explain, future in batch:
+            try:
+                future.set_result(predict_batch([values], [threshold], [explain])[0])
+            except Exception as e:
+                future.set_exception(e)
@@ -0,0 +1,279 @@
+"""
+Monitoreo de drift: compara las entradas de /api/predict con la
+distribución de los datos de entrenamiento.
+
+Cada feature usa bins fijos derivados de DataCleaner.VALUE_RANGES
+(20 bins de ancho fijo para las columnas acotadas, un bin por entero
+0..9 y uno de "10 o más" para los conteos). Con bins fijos:
+
+- el histograma de entrenamiento se guarda con el modelo (unos pocos KB)
+- cada predicción solo suma 1 en un contador por feature: O(1) por fila
+  y memoria constante (una matriz n_features x MAX_BINS por versión del
+  modelo, hasta MAX_WINDOWS versiones), sin importar cuántas predicciones
+  lleguen
+"""
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+
+from src.config import FEATURE_COLUMNS
+from src.data.data_cleaner import DataCleaner
+
+# Bins para columnas con mínimo y máximo conocidos
+RANGE_BINS = 20
+
+# Conteos (sin máximo): bins 0, 1, ..., COUNT_BINS - 2 y uno final "o más"
+COUNT_BINS = 11
+
+MAX_BINS = max(RANGE_BINS, COUNT_BINS)
+
+# Se puede apagar el monitoreo: STUDENTGUARD_DRIFT_MONITOR=0
+MONITOR_ENABLED = os.environ.get('STUDENTGUARD_DRIFT_MONITOR', '1') != '0'
+
+# Umbrales usuales de PSI
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+# Debajo de esto los puntajes no son confiables
+MIN_OBSERVATIONS = 100
+
+# Versiones del modelo con contadores en memoria (las más recientes)
+MAX_WINDOWS = 4
+
+
+def _bin_layout():
+    """
+    (inicio, ancho, cantidad de bins) de cada feature, en el orden de FEATURE_COLUMNS.
+    """
+    lows, widths, n_bins = [], [], []
+    for col in FEATURE_COLUMNS:
+        min_val, max_val = DataCleaner.VALUE_RANGES.get(col, (0, None))
+        low = 0.0 if min_val is None else float(min_val)
+        if max_val is None:
+            lows.append(low)
+            widths.append(1.0)
+            n_bins.append(COUNT_BINS)
+        else:
+            lows.append(low)
+            widths.append((float(max_val) - low) / RANGE_BINS)
+            n_bins.append(RANGE_BINS)
+    return np.array(lows), np.array(widths), np.array(n_bins, dtype=np.int64)
+
+
+BIN_LOWS, BIN_WIDTHS, BIN_COUNTS = _bin_layout()
+
+# Mismos valores como listas de Python para el camino de una sola fila
+_ROW_LAYOUT = list(zip(BIN_LOWS.tolist(), BIN_WIDTHS.tolist(), (BIN_COUNTS - 1).tolist()))
+
+# Desplazamiento de cada feature dentro de la matriz aplanada
+_ROW_OFFSETS = np.arange(len(FEATURE_COLUMNS), dtype=np.int64) * MAX_BINS
+
+
+def histogram(X):
+    """
+    Histograma (n_features x MAX_BINS) de una matriz ordenada según
+    FEATURE_COLUMNS. Los valores fuera de rango caen en el primer o último
+    bin y los NaN en el primero.
+    """
+    X = np.asarray(X, dtype=np.float64).reshape(-1, len(FEATURE_COLUMNS))
+    bins = np.floor((np.nan_to_num(X, nan=-np.inf) - BIN_LOWS) / BIN_WIDTHS)
+    bins = np.clip(bins, 0, BIN_COUNTS - 1).astype(np.int64)
+    flat = np.bincount((bins + _ROW_OFFSETS).ravel(), minlength=len(FEATURE_COLUMNS) * MAX_BINS)
+    return flat.reshape(len(FEATURE_COLUMNS), MAX_BINS)
+
+
+def reference_arrays(counts):
+    """
+    Arreglos que se guardan con el modelo (extras de save_model) a partir
+    del histograma de entrenamiento.
+    """
+    return {
+        "counts": counts,
+        "lows": BIN_LOWS,
+        "widths": BIN_WIDTHS,
+        "n_bins": BIN_COUNTS,
+    }
+
+
+def approximate_medians(counts):
+    """
+    Mediana aproximada de cada feature a partir del histograma: el centro
+    del bin que cruza la mitad (el entero, en las columnas de conteos).
+    """
+    medians = np.empty(len(FEATURE_COLUMNS))
+    for i in range(len(FEATURE_COLUMNS)):
+        n = BIN_COUNTS[i]
+        cdf = np.cumsum(counts[i, :n])
+        b = min(int(np.searchsorted(cdf, cdf[-1] / 2.0)), n - 1) if cdf[-1] else 0
+        offset = 0.0 if n == COUNT_BINS else 0.5
+        medians[i] = BIN_LOWS[i] + (b + offset) * BIN_WIDTHS[i]
+    return medians
+
+
+def psi(expected, actual, eps=1e-4):
+    """
+    Population Stability Index entre dos histogramas (conteos).
+    """
+    p = np.maximum(expected / max(expected.sum(), 1), eps)
+    q = np.maximum(actual / max(actual.sum(), 1), eps)
+    return float(np.sum((q - p) * np.log(q / p)))
+
+
+def ks_statistic(expected, actual):
+    """
+    Estadístico KS sobre los bins: máxima diferencia entre las CDF.
+    """
+    p = np.cumsum(expected) / max(expected.sum(), 1)
+    q = np.cumsum(actual) / max(actual.sum(), 1)
+    return float(np.max(np.abs(p - q)))
+
+
+def _status(value):
+    if value >= PSI_SIGNIFICANT:
+        return "significativo"
+    if value >= PSI_MODERATE:
+        return "moderado"
+    return "estable"
+
+
+@lru_cache(maxsize=8)
+def load_reference(version: str):
+    """
+    Histograma de entrenamiento guardado con una versión del modelo (None
+    si la versión es anterior al monitoreo o usa otros bins).
+    """
+    from src.ml.model_registry import registry
+
+    arrays = registry.load_extra(version, "feature_histograms")
+    if arrays is None or not np.array_equal(arrays["n_bins"], BIN_COUNTS):
+        return None
+    return arrays["counts"]
+
+
+class _Window:
+    """
+    Contadores de una versión del modelo desde started_at.
+    """
+
+    def __init__(self):
+        self.counts = np.zeros((len(FEATURE_COLUMNS), MAX_BINS), dtype=np.int64)
+        self.rows = 0
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+
+
+class DriftMonitor:
+    """
+    Contadores de las entradas recibidas en producción, una ventana por
+    versión del modelo que hizo la predicción: después de reentrenar,
+    activar o hacer rollback, report(version) solo compara lo que predijo
+    esa versión con su propio histograma de entrenamiento.
+
+    observe() agrega un lote (una fila en /api/predict, varias con el
+    micro-lote): cálculo de bin + bincount, sin guardar filas.
+    """
+
+    def __init__(self, enabled=MONITOR_ENABLED, max_windows=MAX_WINDOWS):
+        self.enabled = enabled
+        self.max_windows = max_windows
+        self._lock = threading.Lock()
+        # versión -> _Window (la más reciente al final)
+        self._windows = OrderedDict()
+
+    def _window(self, version):
+        # Se llama con el lock tomado
+        window = self._windows.get(version)
+        if window is None:
+            window = self._windows[version] = _Window()
+            while len(self._windows) > self.max_windows:
+                self._windows.popitem(last=False)
+        else:
+            self._windows.move_to_end(version)
+        return window
+
+    def observe(self, X, version):
+        if not self.enabled:
+            return
+
+        if len(X) == 1:
+            # Una fila (/api/predict sin micro-lote): 9 operaciones escalares,
+            # más barato que armar arreglos de numpy
+            bins = []
+            for value, (low, width, last) in zip(np.asarray(X[0], dtype=np.float64).tolist(), _ROW_LAYOUT):
+                b = (value - low) / width
+                # NaN y valores bajo el mínimo -> primer bin; sobre el máximo -> último
+                bins.append(0 if not b > 0 else (last if b >= last else int(b)))
+            with self._lock:
+                window = self._window(version)
+                for i, b in enumerate(bins):
+                    window.counts[i, b] += 1
+                window.rows += 1
+            return
+
+        counts = histogram(X)
+        with self._lock:
+            window = self._window(version)
+            window.counts += counts
+            window.rows += int(counts[0].sum())
+
+    def reset(self):
+        with self._lock:
+            self._windows.clear()
+
+    def snapshot(self, version):
+        """
+        (contadores, filas, inicio de la ventana) de una versión; inicio
+        None si esa versión no predijo nada todavía.
+        """
+        with self._lock:
+            window = self._windows.get(version)
+            if window is None:
+                return np.zeros((len(FEATURE_COLUMNS), MAX_BINS), dtype=np.int64), 0, None
+            return window.counts.copy(), window.rows, window.started_at
+
+    def report(self, version):
+        """
+        PSI y KS por feature de lo observado contra el histograma de
+        entrenamiento de la versión indicada.
+        """
+        reference = load_reference(version)
+        if reference is None:
+            raise LookupError(
+                f"La versión {version} no tiene histogramas de entrenamiento. Vuelve a entrenar el modelo."
+            )
+
+        counts, rows, started_at = self.snapshot(version)
+        features = {}
+        for i, col in enumerate(FEATURE_COLUMNS):
+            n = BIN_COUNTS[i]
+            expected, actual = reference[i, :n], counts[i, :n]
+            value = psi(expected, actual) if rows else 0.0
+            features[col] = {
+                "psi": value,
+                "ks": ks_statistic(expected, actual) if rows else 0.0,
+                "status": _status(value) if rows else "sin_datos",
+                "bins": int(n),
+                "bin_low": float(BIN_LOWS[i]),
+                "bin_width": float(BIN_WIDTHS[i]),
+                "reference": expected.tolist(),
+                "observed": actual.tolist(),
+            }
+
+        max_psi = max(f["psi"] for f in features.values())
+        return {
+            "model_version": version,
+            "window": {"model_version": version, "started_at": started_at},
+            "observed_rows": rows,
+            "reference_rows": int(reference[0].sum()),
+            "enough_data": rows >= MIN_OBSERVATIONS,
+            "max_psi": max_psi,
+            "status": _status(max_psi) if rows else "sin_datos",
+            "features": features,
+        }
+
+
+# Instancia compartida por predict_batch y la API
+monitor = DriftMonitor()
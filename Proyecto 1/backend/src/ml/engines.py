@@ -0,0 +1,162 @@
+"""
+Motores de modelo disponibles para el entrenamiento.
+
+Cada motor arma un Pipeline de scikit-learn cuyo último paso se llama
+'model', así el resto del camino (entrenar, evaluar, guardar en el
+registro, predict_batch, explain, drift) es el mismo para todos.
+
+    logistic_regression     escalado + LogisticRegression (el de siempre)
+    hist_gradient_boosting  HistGradientBoostingClassifier (hilos OpenMP)
+    random_forest           RandomForestClassifier (n_jobs procesos de árboles)
+"""
+import io
+import os
+import time
+
+import joblib
+import numpy as np
+
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+DEFAULT_ENGINE = 'logistic_regression'
+
+# Hilos por defecto para los motores paralelos: STUDENTGUARD_MODEL_JOBS
+# (-1 = todos los núcleos)
+DEFAULT_N_JOBS = int(os.environ.get('STUDENTGUARD_MODEL_JOBS', -1))
+
+# Filas del lote para medir la latencia de predicción por lotes
+LATENCY_BATCH_ROWS = 10_000
+
+
+def build_logistic_regression(max_iter=1000, C=0.5, solver='lbfgs', scale=True, **_):
+    """
+    Escalado + regresión logística en un solo Pipeline. Se guarda como un
+    único artefacto, así predict_risk aplica el mismo escalado que se usó
+    al entrenar.
+
+    Sin escalar, las columnas de 0-100 dominan a los conteos pequeños y
+    lbfgs / saga necesitan muchas más iteraciones para converger.
+    """
+    steps = []
+    if scale:
+        steps.append(('scaler', StandardScaler()))
+    steps.append(('model', LogisticRegression(
+        max_iter=max_iter,
+        C=C,
+        solver=solver,
+        random_state=42
+    )))
+    hyperparams = {"max_iter": max_iter, "C": C, "solver": solver, "scale": scale}
+    return Pipeline(steps), hyperparams
+
+
+def build_hist_gradient_boosting(max_iter=200, learning_rate=0.1, max_leaf_nodes=31,
+                                 early_stopping='auto', **_):
+    """
+    Gradient boosting sobre histogramas. No necesita escalado (los árboles
+    solo comparan umbrales) y paraleliza con hilos OpenMP; n_jobs no aplica.
+    """
+    model = HistGradientBoostingClassifier(
+        max_iter=max_iter,
+        learning_rate=learning_rate,
+        max_leaf_nodes=max_leaf_nodes,
+        early_stopping=early_stopping,
+        random_state=42
+    )
+    hyperparams = {
+        "max_iter": max_iter,
+        "learning_rate": learning_rate,
+        "max_leaf_nodes": max_leaf_nodes,
+        "early_stopping": early_stopping,
+    }
+    return Pipeline([('model', model)]), hyperparams
+
+
+def build_random_forest(n_estimators=100, max_depth=None, min_samples_leaf=1,
+                        n_jobs=DEFAULT_N_JOBS, **_):
+    """
+    Bosque aleatorio: los árboles se entrenan y se evalúan en paralelo
+    con n_jobs.
+    """
+    model = RandomForestClassifier(
+        n_estimators=n_estimators,
+        max_depth=max_depth,
+        min_samples_leaf=min_samples_leaf,
+        n_jobs=n_jobs,
+        random_state=42
+    )
+    hyperparams = {
+        "n_estimators": n_estimators,
+        "max_depth": max_depth,
+        "min_samples_leaf": min_samples_leaf,
+        "n_jobs": n_jobs,
+    }
+    return Pipeline([('model', model)]), hyperparams
+
+
+MODEL_ENGINES = {
+    'logistic_regression': build_logistic_regression,
+    'hist_gradient_boosting': build_hist_gradient_boosting,
+    'random_forest': build_random_forest,
+}
+
+
+def build_model(engine=DEFAULT_ENGINE, **hyperparams):
+    """
+    Pipeline sin entrenar del motor pedido. Devuelve (pipeline, hiperparámetros
+    usados); los hiperparámetros que el motor no conoce se ignoran.
+    """
+    builder = MODEL_ENGINES.get(engine)
+    if builder is None:
+        raise ValueError(
+            f"Motor '{engine}' no soportado. Opciones: {', '.join(MODEL_ENGINES)}"
+        )
+    model, used = builder(**hyperparams)
+    return model, {"engine": engine, **used}
+
+
+def fit_iterations(model):
+    """
+    Iteraciones del optimizador (None si el motor no itera, como el bosque).
+    """
+    n_iter = getattr(model.named_steps['model'], 'n_iter_', None)
+    return None if n_iter is None else int(np.max(n_iter))
+
+
+def artifact_size(model):
+    """
+    Bytes del artefacto serializado con joblib (sin escribir a disco).
+    """
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    return buffer.getbuffer().nbytes
+
+
+def _median_time(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times))
+
+
+def predict_latency(model, X, single_repeats=50, batch_repeats=3):
+    """
+    Mediana de predict_proba para una fila y para un lote de
+    LATENCY_BATCH_ROWS filas (tomadas de X, repetidas si hacen falta).
+    """
+    X = np.asarray(X, dtype=np.float64)
+    row = X[:1]
+    batch = X[np.arange(LATENCY_BATCH_ROWS) % len(X)]
+
+    # Calentar (el primer llamado arma buffers / hilos)
+    model.predict_proba(row)
+
+    return {
+        "single_row_ms": round(1000 * _median_time(lambda: model.predict_proba(row), single_repeats), 4),
+        "batch_10k_ms": round(1000 * _median_time(lambda: model.predict_proba(batch), batch_repeats), 4),
+    }
@@ -0,0 +1,209 @@
+import numpy as np
+
+from functools import lru_cache
+
+# Máximo de puntos que se devuelven por curva (ROC / PR) al frontend
+MAX_CURVE_POINTS = 200
+
+
+def metrics_from_counts(tp: int, fp: int, fn: int, tn: int):
+    """
+    Calcula accuracy, precision, recall y F1 a partir de la matriz de confusión.
+    """
+    total = tp + fp + fn + tn
+    precision = tp / (tp + fp) if (tp + fp) else 0.0
+    recall = tp / (tp + fn) if (tp + fn) else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if (precision + recall) else 0.0
+
+    return {
+        "accuracy": float((tp + tn) / total) if total else 0.0,
+        "precision": float(precision),
+        "recall": float(recall),
+        "f1_score": float(f1),
+    }
+
+
+def confusion_matrix_dict(y_true, y_pred):
+    """
+    Matriz de confusión binaria con las llaves que espera /api/get_metrics.
+    """
+    y_true = np.asarray(y_true)
+    y_pred = np.asarray(y_pred)
+
+    return {
+        "true_positives": int(np.sum((y_pred == 1) & (y_true == 1))),
+        "false_positives": int(np.sum((y_pred == 1) & (y_true == 0))),
+        "false_negatives": int(np.sum((y_pred == 0) & (y_true == 1))),
+        "true_negatives": int(np.sum((y_pred == 0) & (y_true == 0))),
+    }
+
+
+def _downsample(n, max_points=MAX_CURVE_POINTS):
+    """
+    Índices equiespaciados (incluyendo extremos) para recortar una curva.
+    """
+    if n <= max_points:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n - 1, max_points).round().astype(int))
+
+
+class ThresholdSweep:
+    """
+    Conteos acumulados de TP/FP sobre las probabilidades de prueba ordenadas.
+
+    Se construye con un solo ordenamiento; a partir de ahí la matriz de
+    confusión para cualquier umbral se obtiene con una búsqueda binaria
+    (O(log n)) y las curvas ROC/PR salen de los mismos acumulados.
+    Regla de decisión: riesgo si probabilidad >= umbral.
+    """
+
+    def __init__(self, y_true, scores):
+        y_true = np.asarray(y_true).astype(np.int64)
+        scores = np.asarray(scores, dtype=np.float64)
+
+        # Orden descendente por probabilidad (estable para empates)
+        order = np.argsort(-scores, kind="mergesort")
+        sorted_scores = scores[order]
+        sorted_y = y_true[order]
+
+        tps = np.cumsum(sorted_y)
+        fps = np.cumsum(1 - sorted_y)
+
+        # Quedarse con el último índice de cada probabilidad distinta
+        distinct = np.r_[np.nonzero(np.diff(sorted_scores))[0], len(sorted_scores) - 1]
+
+        # Ascendente para searchsorted: -probabilidad
+        self.neg_thresholds = -sorted_scores[distinct]
+        self.tps = tps[distinct]
+        self.fps = fps[distinct]
+        self.n_pos = int(tps[-1]) if len(tps) else 0
+        self.n_neg = int(fps[-1]) if len(fps) else 0
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """
+        Reconstruye el barrido desde los arreglos guardados con to_arrays().
+        """
+        sweep = cls.__new__(cls)
+        sweep.neg_thresholds = arrays["neg_thresholds"]
+        sweep.tps = arrays["tps"]
+        sweep.fps = arrays["fps"]
+        sweep.n_pos = int(arrays["n_pos"])
+        sweep.n_neg = int(arrays["n_neg"])
+        return sweep
+
+    @classmethod
+    def from_counts(cls, scores, positives, negatives):
+        """
+        Barrido desde conteos por probabilidad (por ejemplo un histograma
+        de probabilidades por clase, sin guardar una fila por muestra).
+        scores[i] es la probabilidad del bin i; positives / negatives las
+        filas de cada clase en ese bin.
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        positives = np.asarray(positives, dtype=np.int64)
+        negatives = np.asarray(negatives, dtype=np.int64)
+
+        keep = (positives + negatives) > 0
+        order = np.argsort(-scores[keep], kind="mergesort")
+
+        sweep = cls.__new__(cls)
+        sweep.neg_thresholds = -scores[keep][order]
+        sweep.tps = np.cumsum(positives[keep][order])
+        sweep.fps = np.cumsum(negatives[keep][order])
+        sweep.n_pos = int(positives.sum())
+        sweep.n_neg = int(negatives.sum())
+        return sweep
+
+    def to_arrays(self):
+        return {
+            "neg_thresholds": self.neg_thresholds,
+            "tps": self.tps,
+            "fps": self.fps,
+            "n_pos": np.array(self.n_pos),
+            "n_neg": np.array(self.n_neg),
+        }
+
+    def counts_at(self, threshold: float):
+        """
+        Matriz de confusión con el umbral dado, en O(log n).
+        """
+        # Cantidad de probabilidades distintas >= umbral
+        k = int(np.searchsorted(self.neg_thresholds, -threshold, side="right"))
+
+        tp = int(self.tps[k - 1]) if k else 0
+        fp = int(self.fps[k - 1]) if k else 0
+
+        return {
+            "true_positives": tp,
+            "false_positives": fp,
+            "false_negatives": self.n_pos - tp,
+            "true_negatives": self.n_neg - fp,
+        }
+
+    def metrics_at(self, threshold: float):
+        """
+        Métricas y matriz de confusión con el umbral dado.
+        """
+        counts = self.counts_at(threshold)
+        metrics = metrics_from_counts(
+            counts["true_positives"],
+            counts["false_positives"],
+            counts["false_negatives"],
+            counts["true_negatives"],
+        )
+        metrics["threshold"] = float(threshold)
+        metrics["confusion_matrix"] = counts
+        return metrics
+
+    def roc_curve(self):
+        """
+        Curva ROC (fpr, tpr) recortada a MAX_CURVE_POINTS y su AUC.
+        """
+        fpr = np.r_[0.0, self.fps / self.n_neg] if self.n_neg else np.zeros(len(self.fps) + 1)
+        tpr = np.r_[0.0, self.tps / self.n_pos] if self.n_pos else np.zeros(len(self.tps) + 1)
+        thresholds = np.r_[1.0, -self.neg_thresholds]
+
+        auc = float(np.trapz(tpr, fpr))
+        idx = _downsample(len(fpr))
+
+        return {
+            "fpr": fpr[idx].tolist(),
+            "tpr": tpr[idx].tolist(),
+            "thresholds": thresholds[idx].tolist(),
+            "auc": auc,
+        }
+
+    def pr_curve(self):
+        """
+        Curva precision-recall recortada a MAX_CURVE_POINTS y su average precision.
+        """
+        precision = self.tps / (self.tps + self.fps)
+        recall = self.tps / self.n_pos if self.n_pos else np.zeros(len(self.tps))
+        thresholds = -self.neg_thresholds
+
+        # Average precision: suma de precision * incremento de recall
+        average_precision = float(np.sum(np.diff(np.r_[0.0, recall]) * precision))
+        idx = _downsample(len(precision))
+
+        return {
+            "precision": precision[idx].tolist(),
+            "recall": recall[idx].tolist(),
+            "thresholds": thresholds[idx].tolist(),
+            "average_precision": average_precision,
+        }
+
+
+@lru_cache(maxsize=8)
+def load_threshold_sweep(version: str):
+    """
+    Carga (y deja en caché) el barrido de umbrales guardado con una versión
+    del modelo. Los archivos de cada versión no cambian, así que la caché
+    por versión es segura.
+    """
+    from src.ml.model_registry import registry
+
+    arrays = registry.load_extra(version, "threshold_sweep")
+    if arrays is None:
+        return None
+    return ThresholdSweep.from_arrays(arrays)
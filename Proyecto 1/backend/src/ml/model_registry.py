@@ -0,0 +1,329 @@
+import os
+import re
+import json
+import hashlib
+import tempfile
+import threading
+from datetime import datetime
+
+import joblib
+import numpy as np
+
+from src.config import FEATURE_COLUMNS, TARGET_COLUMN
+
+# Carpeta donde se guardan los modelos
+SAVED_MODELS_DIR = "saved_models"
+MODEL_FILENAME = "studentguard_model.pkl"
+
+# Archivo que indica cuál versión está activa
+ACTIVE_POINTER_FILENAME = "active_model.json"
+
+VERSION_PATTERN = re.compile(r"^studentguard_model_(v\d{4})\.pkl$")
+
+
+def dataset_fingerprint(df):
+    """
+    Huella del contenido del dataset (independiente del índice).
+    """
+    import pandas as pd
+
+    hashes = pd.util.hash_pandas_object(df, index=False).values
+    return hashlib.sha256(hashes.tobytes()).hexdigest()[:16]
+
+
+def atomic_write(path, write_fn):
+    """
+    Escribe primero en un archivo temporal de la misma carpeta y luego lo
+    renombra, así ningún lector ve un archivo a medio escribir.
+    """
+    folder = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=".tmp_")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write_fn(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _write_json(path, data):
+    atomic_write(path, lambda f: f.write(json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")))
+
+
+class ModelRegistry:
+    """
+    Registro de modelos versionados con un puntero a la versión activa.
+
+    Cada entrenamiento produce studentguard_model_vNNNN.pkl y su .json de
+    metadatos. Activar o revertir una versión solo reescribe el puntero,
+    sin reentrenar ni detener el servidor.
+    """
+
+    def __init__(self, models_dir=SAVED_MODELS_DIR):
+        self.models_dir = models_dir
+        self._lock = threading.Lock()
+        # (version, clave del puntero, modelo, ruta, metadatos)
+        self._cache = None
+
+    # ------------------------------------------------------------------
+    # Rutas
+    # ------------------------------------------------------------------
+
+    def model_path(self, version):
+        return os.path.join(self.models_dir, f"studentguard_model_{version}.pkl")
+
+    def metadata_path(self, version):
+        return os.path.join(self.models_dir, f"studentguard_model_{version}.json")
+
+    def extra_path(self, version, name):
+        return os.path.join(self.models_dir, f"studentguard_model_{version}_{name}.npz")
+
+    def _pointer_path(self):
+        return os.path.join(self.models_dir, ACTIVE_POINTER_FILENAME)
+
+    # ------------------------------------------------------------------
+    # Puntero a la versión activa
+    # ------------------------------------------------------------------
+
+    def _read_pointer(self):
+        try:
+            with open(self._pointer_path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"active": None, "history": []}
+
+    def active_version(self):
+        return self._read_pointer().get("active")
+
+    def _set_active(self, version, push_history=True):
+        pointer = self._read_pointer()
+        previous = pointer.get("active")
+        history = pointer.get("history", [])
+
+        if push_history and previous and previous != version:
+            history.append(previous)
+
+        _write_json(self._pointer_path(), {"active": version, "history": history})
+
+    # ------------------------------------------------------------------
+    # Versiones
+    # ------------------------------------------------------------------
+
+    def list_versions(self):
+        """
+        Lista las versiones guardadas (más reciente primero) con sus metadatos.
+        """
+        if not os.path.isdir(self.models_dir):
+            return []
+
+        active = self.active_version()
+        versions = []
+        for name in os.listdir(self.models_dir):
+            match = VERSION_PATTERN.match(name)
+            if not match:
+                continue
+            version = match.group(1)
+            if not os.path.exists(self.metadata_path(version)):
+                # Versión reservada que todavía se está guardando
+                continue
+            metadata = self.get_metadata(version)
+            metadata["is_active"] = version == active
+            versions.append(metadata)
+
+        versions.sort(key=lambda m: m["version"], reverse=True)
+        return versions
+
+    def is_complete(self, version):
+        """
+        True si la versión terminó de guardarse. El .json se escribe al
+        final: un .pkl sin él es una versión reservada (vacía) o a medias.
+        """
+        return (re.fullmatch(r"v\d{4}", str(version)) is not None
+                and os.path.exists(self.metadata_path(version))
+                and os.path.exists(self.model_path(version)))
+
+    def get_metadata(self, version):
+        try:
+            with open(self.metadata_path(version), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"version": version}
+
+    def _next_version(self):
+        numbers = [0]
+        if os.path.isdir(self.models_dir):
+            for name in os.listdir(self.models_dir):
+                match = VERSION_PATTERN.match(name)
+                if match:
+                    numbers.append(int(match.group(1)[1:]))
+        return f"v{max(numbers) + 1:04d}"
+
+    def _reserve_version(self):
+        """
+        Reserva el siguiente número de versión creando el .pkl vacío con
+        O_EXCL, así dos procesos que entrenan a la vez no chocan.
+        """
+        while True:
+            version = self._next_version()
+            try:
+                fd = os.open(self.model_path(version), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.close(fd)
+                return version
+            except FileExistsError:
+                continue
+
+    def save_model(self, model, metrics=None, hyperparams=None, fingerprint=None,
+                   extras=None, activate=True):
+        """
+        Guarda el modelo como una nueva versión y (por defecto) la activa.
+
+        extras es un diccionario {nombre: {arreglo: np.ndarray}} que se guarda
+        junto al modelo como studentguard_model_vNNNN_<nombre>.npz.
+
+        Devuelve (version, ruta_del_modelo).
+        """
+        os.makedirs(self.models_dir, exist_ok=True)
+
+        with self._lock:
+            version = self._reserve_version()
+            model_path = self.model_path(version)
+
+            metadata = {
+                "version": version,
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "model_type": type(model).__name__,
+                "feature_columns": list(FEATURE_COLUMNS),
+                "target_column": TARGET_COLUMN,
+                "hyperparams": hyperparams or {},
+                "metrics": metrics or {},
+                "dataset_fingerprint": fingerprint,
+                "threshold": 0.5,
+                "extras": sorted((extras or {}).keys()),
+            }
+
+            # Primero el modelo y los metadatos; el puntero se mueve al final
+            try:
+                atomic_write(model_path, lambda f: joblib.dump(model, f))
+                for name, arrays in (extras or {}).items():
+                    atomic_write(self.extra_path(version, name), lambda f, a=arrays: np.savez(f, **a))
+                _write_json(self.metadata_path(version), metadata)
+            except BaseException:
+                # Liberar la versión reservada
+                if not os.path.exists(self.metadata_path(version)) and os.path.exists(model_path):
+                    os.remove(model_path)
+                raise
+
+            if activate:
+                self._set_active(version)
+
+        print(f" Modelo registrado como versión {version}")
+        return version, model_path
+
+    def activate(self, version):
+        """
+        Cambia la versión activa sin reentrenar.
+        """
+        if not self.is_complete(version):
+            raise ValueError(f"La versión '{version}' no existe")
+
+        with self._lock:
+            self._set_active(version)
+
+        return self.get_metadata(version)
+
+    def set_threshold(self, threshold):
+        """
+        Cambia el umbral de decisión de la versión activa.
+        """
+        with self._lock:
+            version = self.active_version()
+            if version is None:
+                raise ValueError("No hay un modelo activo en el registro")
+
+            metadata = self.get_metadata(version)
+            metadata["threshold"] = float(threshold)
+            _write_json(self.metadata_path(version), metadata)
+
+            # Reescribir el puntero invalida la caché de todos los procesos
+            self._set_active(version, push_history=False)
+
+        return metadata
+
+    def load_extra(self, version, name):
+        """
+        Carga los arreglos guardados con save_model(extras=...) o None si no existen.
+        """
+        path = self.extra_path(version, name)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            return {key: data[key] for key in data.files}
+
+    def rollback(self):
+        """
+        Regresa a la versión que estaba activa antes de la actual.
+        """
+        with self._lock:
+            pointer = self._read_pointer()
+            history = pointer.get("history", [])
+
+            # Saltar versiones que ya no existen en disco
+            while history and not self.is_complete(history[-1]):
+                history.pop()
+
+            if not history:
+                raise ValueError("No hay una versión anterior a la cual regresar")
+
+            version = history.pop()
+            _write_json(self._pointer_path(), {"active": version, "history": history})
+
+        return self.get_metadata(version)
+
+    # ------------------------------------------------------------------
+    # Carga
+    # ------------------------------------------------------------------
+
+    def load_active(self):
+        """
+        Devuelve (modelo, ruta, metadatos) de la versión activa.
+
+        El modelo queda en caché y solo se vuelve a leer cuando cambia el
+        puntero, así que cambiar de versión no interrumpe las predicciones.
+        """
+        pointer_path = self._pointer_path()
+        try:
+            stat = os.stat(pointer_path)
+            # os.replace crea un inodo nuevo en cada cambio de puntero
+            pointer_key = (stat.st_ino, stat.st_mtime_ns)
+        except FileNotFoundError:
+            pointer_key = None
+
+        cache = self._cache
+        if cache is not None and cache[1] == pointer_key:
+            return cache[2], cache[3], cache[4]
+
+        version = self.active_version() if pointer_key is not None else None
+
+        if version is None:
+            # Compatibilidad con modelos guardados antes del registro
+            model_path = os.path.join(self.models_dir, MODEL_FILENAME)
+            metadata = {"version": None}
+        else:
+            model_path = self.model_path(version)
+            metadata = self.get_metadata(version)
+
+        if not os.path.exists(model_path):
+            raise ValueError(
+                f"No se encontró el modelo entrenado en '{model_path}'. "
+                "Primero debes entrenar tu modelo."
+            )
+
+        model = joblib.load(model_path)
+        self._cache = (version, pointer_key, model, model_path, metadata)
+        return model, model_path, metadata
+
+
+# Instancia compartida por entrenamiento, predicción y la API
+registry = ModelRegistry()
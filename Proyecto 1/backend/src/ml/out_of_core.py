@@ -0,0 +1,264 @@
+"""
+Entrenamiento out-of-core: lee un CSV de la carpeta de subidas por partes
+(chunksize filas), sin cargar el dataset completo en memoria.
+
+El archivo puede ser el CSV crudo subido o uno ya limpio (por ejemplo el
+de /api/data/export?save=true). Cada chunk se limpia al vuelo con las
+mismas reglas que DataCleaner:
+
+- coerce_column convierte texto, listas de actividades y etiquetas de
+  'riesgo' a números
+- se descartan las filas sin 'riesgo' válido
+- los faltantes se rellenan con CleaningTransform (medianas aproximadas
+  con el histograma de la primera pasada) y se recortan a VALUE_RANGES
+
+A diferencia de DataCleaner no se eliminan duplicados (haría falta
+recordar todas las filas); la partición por hash deja las copias de una
+fila del mismo lado, así que no contaminan la prueba.
+"""
+import os
+import hashlib
+import time
+
+import numpy as np
+import pandas as pd
+
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.config import FEATURE_COLUMNS, TARGET_COLUMN
+from src.ml.model_registry import registry
+from src.ml.evaluation import ThresholdSweep, metrics_from_counts
+from src.ml.engines import artifact_size
+from src.ml import drift
+from src.data.cleaning_transform import CleaningTransform
+from src.data.data_cleaner import DataCleaner, coerce_column
+
+# Filas por mini-batch leídas del CSV
+DEFAULT_CHUNKSIZE = 50_000
+
+# Porcentaje de filas (0-100) que van al conjunto de prueba
+DEFAULT_TEST_PERCENT = 20
+
+# Bins del histograma de probabilidades de prueba (barrido de umbrales con
+# memoria fija: exacto para umbrales múltiplos de 1 / SCORE_BINS)
+SCORE_BINS = 10_000
+
+
+def row_hashes(chunk: pd.DataFrame):
+    """
+    Hash de 64 bits del contenido de cada fila (features + objetivo).
+    """
+    return pd.util.hash_pandas_object(chunk[FEATURE_COLUMNS + [TARGET_COLUMN]], index=False).values
+
+
+def split_mask(hashes, test_percent: int = DEFAULT_TEST_PERCENT):
+    """
+    Devuelve una máscara booleana (True = prueba) a partir del hash de cada
+    fila. No depende del orden ni del tamaño de los chunks, así que la
+    partición es la misma en cada pasada.
+    """
+    return (hashes % 100) < test_percent
+
+
+def coerce_chunk(chunk: pd.DataFrame):
+    """
+    Convierte un chunk crudo a features float64 (NaN donde falta el dato,
+    ya recortadas a VALUE_RANGES) y objetivo 0/1. Descarta las filas sin
+    'riesgo' válido.
+    """
+    coerced = pd.DataFrame(index=chunk.index)
+    for col in FEATURE_COLUMNS + [TARGET_COLUMN]:
+        values = pd.to_numeric(coerce_column(col, chunk[col])[0], errors='coerce').astype(np.float64)
+        min_val, max_val = DataCleaner.VALUE_RANGES.get(col, (None, None))
+        coerced[col] = values.clip(lower=min_val, upper=max_val)
+
+    coerced = coerced.dropna(subset=[TARGET_COLUMN])
+    coerced[TARGET_COLUMN] = coerced[TARGET_COLUMN].round().astype(np.int64)
+    return coerced
+
+
+def iter_chunks(csv_path: str, chunksize: int, fingerprint=None):
+    """
+    Lee el CSV por partes y devuelve (X, y, mascara_prueba) por chunk, con
+    NaN en X donde falta el dato. Si se pasa un objeto hashlib, se
+    actualiza con el contenido de cada chunk.
+    """
+    reader = pd.read_csv(
+        csv_path,
+        usecols=FEATURE_COLUMNS + [TARGET_COLUMN],
+        chunksize=chunksize
+    )
+
+    for chunk in reader:
+        chunk = coerce_chunk(chunk)
+        if chunk.empty:
+            continue
+
+        hashes = row_hashes(chunk)
+        is_test = split_mask(hashes)
+        if fingerprint is not None:
+            fingerprint.update(hashes.tobytes())
+        X = chunk[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+        y = chunk[TARGET_COLUMN].to_numpy(dtype=np.int64)
+        yield X, y, is_test
+
+
+def train_model_out_of_core(csv_path: str, hyperparams: dict = None):
+    """
+    Entrena un modelo lineal leyendo el CSV (crudo o limpio) por
+    mini-batches, sin cargar el dataset completo en memoria.
+
+    Devuelve el mismo diccionario de métricas que train_model_with_params,
+    incluyendo la matriz de confusión y las curvas ROC / PR, y guarda el
+    barrido de umbrales para /api/metrics/threshold.
+    """
+    if hyperparams is None:
+        hyperparams = {}
+
+    # En modo out-of-core max_iter es el número de pasadas sobre el archivo
+    max_iter = int(hyperparams.get('max_iter', 5))
+    alpha = float(hyperparams.get('alpha', 0.0001))
+    chunksize = int(hyperparams.get('chunksize', DEFAULT_CHUNKSIZE))
+
+    if max_iter < 1:
+        raise ValueError("max_iter debe ser mayor o igual a 1")
+    if chunksize < 1:
+        raise ValueError("chunksize debe ser mayor o igual a 1")
+    if not os.path.exists(csv_path):
+        raise ValueError(f"No se encontró el archivo de datos en '{csv_path}'")
+
+    header = pd.read_csv(csv_path, nrows=0)
+    missing_cols = [col for col in FEATURE_COLUMNS + [TARGET_COLUMN] if col not in header.columns]
+    if missing_cols:
+        raise ValueError(f"Faltan las siguientes columnas: {', '.join(missing_cols)}")
+
+    print(f"\n Entrenamiento out-of-core desde: {csv_path}")
+    print(f"   - chunksize: {chunksize}")
+    print(f"   - pasadas (max_iter): {max_iter}")
+    print(f"   - alpha (regularización): {alpha}")
+
+    # 1) Primera pasada: escalador e histograma solo con filas de entrenamiento.
+    #    StandardScaler ignora los NaN; el histograma no los cuenta.
+    scaler = StandardScaler()
+    fingerprint = hashlib.sha256()
+    # Histograma de entrenamiento (bins fijos) para /api/drift y las medianas
+    train_histogram = np.zeros((len(FEATURE_COLUMNS), drift.MAX_BINS), dtype=np.int64)
+    n_train = 0
+    n_test = 0
+    n_imputed = 0
+    for X, y, is_test in iter_chunks(csv_path, chunksize, fingerprint):
+        train_rows = ~is_test
+        if train_rows.any():
+            X_train = X[train_rows]
+            missing = np.isnan(X_train)
+            scaler.partial_fit(X_train)
+            train_histogram += drift.histogram(X_train)
+            # drift.histogram pone los NaN en el primer bin
+            train_histogram[:, 0] -= missing.sum(axis=0)
+        n_train += int(train_rows.sum())
+        n_test += int(is_test.sum())
+        n_imputed += int(np.isnan(X).sum())
+
+    if n_train == 0 or n_test == 0:
+        raise ValueError("No hay suficientes filas para separar entrenamiento y prueba")
+
+    # Sin todas las filas en memoria, las medianas salen del histograma
+    transform = CleaningTransform(drift.approximate_medians(train_histogram))
+
+    print(f"\n Total de muestras: {n_train + n_test}")
+    print(f"   - Entrenamiento: {n_train}")
+    print(f"   - Prueba: {n_test}")
+    print(f"   - Valores faltantes rellenados: {n_imputed}")
+
+    # 2) Pasadas de entrenamiento con partial_fit
+    model = SGDClassifier(loss='log_loss', alpha=alpha, random_state=42)
+    classes = np.array([0, 1])
+
+    print("\n Entrenando modelo...")
+    fit_start = time.perf_counter()
+    for epoch in range(max_iter):
+        for X, y, is_test in iter_chunks(csv_path, chunksize):
+            train_rows = ~is_test
+            if train_rows.any():
+                X_train, _ = transform.apply(X[train_rows])
+                model.partial_fit(scaler.transform(X_train), y[train_rows], classes=classes)
+        print(f"    Pasada {epoch + 1}/{max_iter} completada")
+    fit_time = time.perf_counter() - fit_start
+
+    # 3) Evaluación incremental sobre las filas de prueba: matriz de confusión
+    #    y un histograma de probabilidades por clase para el barrido de umbrales
+    tp = fp = fn = tn = 0
+    score_counts = np.zeros((2, SCORE_BINS + 1), dtype=np.int64)
+    for X, y, is_test in iter_chunks(csv_path, chunksize):
+        if not is_test.any():
+            continue
+        X_test, _ = transform.apply(X[is_test])
+        X_test = scaler.transform(X_test)
+        y_true = y[is_test]
+        y_pred = model.predict(X_test)
+        y_proba = model.predict_proba(X_test)[:, 1]
+        tp += int(np.sum((y_pred == 1) & (y_true == 1)))
+        fp += int(np.sum((y_pred == 1) & (y_true == 0)))
+        fn += int(np.sum((y_pred == 0) & (y_true == 1)))
+        tn += int(np.sum((y_pred == 0) & (y_true == 0)))
+        score_bins = np.floor(y_proba * SCORE_BINS).astype(np.int64)
+        np.add.at(score_counts, (y_true, score_bins), 1)
+
+    sweep = ThresholdSweep.from_counts(
+        np.arange(SCORE_BINS + 1) / SCORE_BINS, score_counts[1], score_counts[0]
+    )
+
+    metrics = metrics_from_counts(tp, fp, fn, tn)
+    metrics.update({
+        "n_train": n_train,
+        "n_test": n_test,
+        "hyperparams_used": {
+            "max_iter": max_iter,
+            "alpha": alpha,
+            "chunksize": chunksize,
+            "solver": "sgd_out_of_core"
+        },
+        # Las pasadas son fijas: no hay criterio de convergencia
+        "n_iter": max_iter,
+        "converged": None,
+        "fit_time_s": round(fit_time, 4),
+        "missing_values_handled": n_imputed,
+        "confusion_matrix": {
+            "true_positives": tp,
+            "false_positives": fp,
+            "false_negatives": fn,
+            "true_negatives": tn,
+        },
+        "roc_curve": sweep.roc_curve(),
+        "pr_curve": sweep.pr_curve()
+    })
+
+    # El escalador viaja junto al modelo para que predict_risk reciba datos crudos
+    pipeline = Pipeline([('scaler', scaler), ('model', model)])
+    metrics["artifact_size_bytes"] = artifact_size(pipeline)
+
+    version, model_path = registry.save_model(
+        pipeline,
+        metrics=dict(metrics),
+        hyperparams=metrics["hyperparams_used"],
+        fingerprint=fingerprint.hexdigest()[:16],
+        extras={
+            "threshold_sweep": sweep.to_arrays(),
+            "feature_histograms": drift.reference_arrays(train_histogram),
+            "cleaning_transform": transform.to_arrays()
+        }
+    )
+
+    metrics["model_path"] = model_path
+    metrics["model_version"] = version
+
+    print(f"\n Modelo guardado en: {model_path}")
+    print(f"\n Métricas del modelo:")
+    print(f"   • Accuracy:  {metrics['accuracy']:.3f}")
+    print(f"   • Precision: {metrics['precision']:.3f}")
+    print(f"   • Recall:    {metrics['recall']:.3f}")
+    print(f"   • F1-Score:  {metrics['f1_score']:.3f}")
+
+    return metrics
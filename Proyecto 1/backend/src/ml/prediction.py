@@ -1,33 +1,45 @@
-import os
-import joblib
 import numpy as np
 
+from functools import lru_cache
 from typing import Dict
-from src.ml.training import SAVED_MODELS_DIR, MODEL_FILENAME
+from src.ml.model_registry import registry
+from src.ml.drift import monitor as drift_monitor
+from src.data.cleaning_transform import CleaningTransform, has_missing, parse_row
 from src.config import FEATURE_COLUMNS
 
 
 def load_trained_model():
     """
-    Carga el modelo entrenado  .
+    Carga el modelo de la versión activa del registro (queda en caché
+    hasta que se active otra versión).
     """
-    model_path = os.path.join(SAVED_MODELS_DIR, MODEL_FILENAME)
+    model, model_path, _ = registry.load_active()
+    return model, model_path
 
-    if not os.path.exists(model_path):
-        raise ValueError(
-            f"No se encontró el modelo entrenado en '{model_path}'. "
-            "Primero debes entrenar tu modelo."
-        )
 
-    model = joblib.load(model_path)
-    return model, model_path
+@lru_cache(maxsize=8)
+def load_transform(version):
+    """
+    CleaningTransform guardado con una versión del modelo (None si la
+    versión es anterior a la transformación).
+    """
+    if version is None:
+        return None
+    arrays = registry.load_extra(version, "cleaning_transform")
+    return None if arrays is None else CleaningTransform.from_arrays(arrays)
 
 
-def predict_risk(input_data: Dict):
+def predict_risk(input_data: Dict, threshold: float = None, explain=None):
     """
     Recibe un diccionario con los datos de UN estudiante y
     devuelve la predicción de riesgo.
 
+    threshold: umbral de probabilidad para clasificar como riesgo. Si no se
+    envía se usa el umbral guardado en la versión activa del modelo.
+
+    explain: True agrega la contribución de cada feature al log-odds; un
+    entero k deja solo las k de mayor magnitud.
+
      llaves numéricas necesarias en el diccionario de entrada:
         - promedio_actual
         - asistencia_clases
@@ -40,9 +52,24 @@ def predict_risk(input_data: Dict):
         - reportes_disciplinarios
     """
 
-    #  Verificar que el modelo exista y cargarlo
-    model, model_path = load_trained_model()
+    #  Cargar el modelo activo una vez: validar y predecir usan la misma versión
+    active = registry.load_active()
+
+    #  Construir el vector de entrada y predecir como un lote de una fila
+    values = build_feature_vector(input_data, active)
+    return predict_batch([values], [parse_threshold(threshold)], [explain], active=active)[0]
 
+
+def build_feature_vector(input_data: Dict, active=None):
+    """
+    Valida el diccionario de entrada y devuelve los valores en el orden
+    de FEATURE_COLUMNS, convertidos a float con las reglas de limpieza
+    (listas de actividades -> cantidad, texto numérico -> número). Los
+    nulos o textos no numéricos quedan como NaN y predict_batch los
+    rellena con las medianas de entrenamiento.
+
+    active: (modelo, ruta, metadata) de registry.load_active() si ya se cargó.
+    """
     #  Verificar que vengan todas las columnas necesarias
     missing = [col for col in FEATURE_COLUMNS if col not in input_data]
     if missing:
@@ -50,30 +77,231 @@ def predict_risk(input_data: Dict):
             f"Faltan los siguientes campos en el JSON de entrada: {', '.join(missing)}"
         )
 
-    #  Construir el vector de entrada 
-    try:
-        values = [float(input_data[col]) for col in FEATURE_COLUMNS]
-    except (TypeError, ValueError) as e:
-        raise ValueError(
-            f"Todos los campos deben ser numéricos. Detalle: {str(e)}"
-        )
+    row = parse_row([input_data[col] for col in FEATURE_COLUMNS])
 
-    X = np.array([values])  
+    # Solo los modelos entrenados con CleaningTransform saben rellenar faltantes
+    if has_missing(row):
+        _, _, metadata = active or registry.load_active()
+        if load_transform(metadata.get("version")) is None:
+            invalid = [col for col, value in zip(FEATURE_COLUMNS, row) if value != value]
+            raise ValueError(
+                f"Todos los campos deben ser numéricos. Campos inválidos: {', '.join(invalid)} "
+                "(el modelo activo no rellena faltantes; vuelve a entrenarlo)"
+            )
+    return row
 
-    #  Hacer la predicción
-    pred = model.predict(X)[0]
 
+def linear_contributions(model, X):
+    """
+    Contribución de cada feature al log-odds de riesgo, para modelos
+    lineales (LogisticRegression, sola o después de un StandardScaler).
+
+    Devuelve (contribuciones, base): contribuciones es una matriz
+    n_filas x n_features y base es el intercepto, de modo que
+    log_odds = base + contribuciones.sum(axis=1). Con escalado la base
+    corresponde a un estudiante con los valores promedio del entrenamiento.
+    Devuelve None si el modelo no es lineal.
+    """
+    estimator = model
+    Z = X
+    if hasattr(model, "steps"):
+        # Pipeline: transformar con todos los pasos menos el último
+        for _, step in model.steps[:-1]:
+            Z = step.transform(Z)
+        estimator = model.steps[-1][1]
+
+    if not hasattr(estimator, "coef_") or estimator.coef_.shape[0] != 1:
+        return None
+
+    contributions = np.asarray(Z, dtype=np.float64) * estimator.coef_[0]
+    return contributions, float(estimator.intercept_[0])
+
+
+def apply_thresholds(model, X, probabilities, thresholds):
+    """
+    Convierte probabilidades en predicciones con un umbral para todas las
+    filas o una lista con uno por fila (None = regla propia del modelo).
+    """
+    if not isinstance(thresholds, (list, tuple)):
+        if thresholds is None:
+            return np.asarray(model.predict(X))
+        return (probabilities >= float(thresholds)).astype(int)
+
+    if None not in thresholds:
+        return (probabilities >= np.asarray(thresholds, dtype=np.float64)).astype(int)
+
+    # Filas sin umbral: regla propia del modelo
+    predictions = np.asarray(model.predict(X))
+    for i, t in enumerate(thresholds):
+        if t is not None:
+            predictions[i] = int(probabilities[i] >= t)
+    return predictions
+
+
+def score_matrix(model, X, thresholds):
+    """
+    Predicción vectorizada sobre una matriz ya ordenada según FEATURE_COLUMNS.
+
+    thresholds: un umbral para todas las filas o una lista con uno por fila
+    (None = regla propia del modelo). Devuelve (predicciones, probabilidades);
+    probabilidades es None si el modelo no tiene predict_proba.
+    """
     # Probabilidad de clase "1" (riesgo), si el modelo lo soporta
-    prob_risk = None
-    if hasattr(model, "predict_proba"):
-        prob_risk = float(model.predict_proba(X)[0][1])
+    if not hasattr(model, "predict_proba"):
+        return np.asarray(model.predict(X)), None
+
+    probabilities = model.predict_proba(X)[:, 1]
+    return apply_thresholds(model, X, probabilities, thresholds), probabilities
+
+
+def score_matrix_explained(model, X, thresholds):
+    """
+    Igual que score_matrix pero también devuelve (contribuciones, base) de
+    linear_contributions. Para modelos lineales la probabilidad sale de las
+    mismas contribuciones (una sola pasada por el escalado y el modelo).
+    """
+    explained = linear_contributions(model, X)
+    if explained is None:
+        predictions, probabilities = score_matrix(model, X, thresholds)
+        return predictions, probabilities, None, None
+
+    contributions, base = explained
+    log_odds = base + contributions.sum(axis=1)
+    probabilities = 1.0 / (1.0 + np.exp(-log_odds))
+    predictions = apply_thresholds(model, X, probabilities, thresholds)
+    return predictions, probabilities, contributions, base
+
+
+def rank_contributions(contributions, top_k=None):
+    """
+    Índices de features ordenados por |contribución| (mayor primero) para
+    cada fila; con top_k solo las k primeras.
+    """
+    # Con 9 features un argsort completo por fila es más rápido que argpartition
+    order = np.argsort(-np.abs(contributions), axis=1, kind="stable")
+    return order if top_k is None else order[:, :top_k]
+
+
+def parse_threshold(threshold):
+    """
+    Valida el umbral de una solicitud: None = umbral de la versión activa,
+    si no un número entre 0 y 1.
+    """
+    if threshold is None:
+        return None
+    if isinstance(threshold, bool):
+        raise ValueError("threshold debe ser un número entre 0 y 1")
+    try:
+        t = float(threshold)
+    except (TypeError, ValueError):
+        raise ValueError("threshold debe ser un número entre 0 y 1")
+    if not 0.0 <= t <= 1.0:
+        raise ValueError("threshold debe ser un número entre 0 y 1")
+    return t
+
+
+def parse_explain(explain):
+    """
+    Normaliza el parámetro explain: None/False = no, True = todas, k = top-k.
+    """
+    if explain is None or explain is False:
+        return None
+    if explain is True:
+        return len(FEATURE_COLUMNS)
+    try:
+        k = int(explain)
+    except (TypeError, ValueError):
+        raise ValueError("explain debe ser true/false o un entero (top-k)")
+    if k < 1:
+        raise ValueError("explain (top-k) debe ser mayor que 0")
+    return min(k, len(FEATURE_COLUMNS))
+
+
+def predict_batch(rows, thresholds=None, explain=None, active=None):
+    """
+    Predice varias filas (ya ordenadas según FEATURE_COLUMNS) con una sola
+    llamada vectorizada al modelo.
+
+    thresholds: lista con un umbral por fila (None = umbral de la versión activa).
+    explain: como en predict_risk; un valor para todas las filas o una lista
+    con uno por fila.
+    active: (modelo, ruta, metadata) ya cargado; si no se envía se carga.
+    """
+    model, model_path, metadata = active or registry.load_active()
+
+    X = np.asarray(rows, dtype=np.float64).reshape(-1, len(FEATURE_COLUMNS))
+
+    # Misma limpieza que en el entrenamiento: medianas + rangos, vectorizado
+    imputed = None
+    transform = load_transform(metadata.get("version"))
+    if transform is not None:
+        X, imputed = transform.apply(X)
+    elif np.isnan(X).any():
+        raise ValueError("Todos los campos deben ser numéricos (el modelo activo no rellena faltantes)")
+
+    imputed_rows = imputed.any(axis=1).tolist() if imputed is not None else None
+
+    # Contadores de drift de la versión que predice: un bincount por lote, memoria fija
+    drift_monitor.observe(X, metadata.get("version"))
+
+    default_threshold = metadata.get("threshold")
+    if thresholds is None:
+        thresholds = [None] * len(X)
+    thresholds = [default_threshold if t is None else parse_threshold(t) for t in thresholds]
+
+    if isinstance(explain, (list, tuple)):
+        top_ks = [parse_explain(e) for e in explain]
+    else:
+        top_ks = [parse_explain(explain)] * len(X)
+
+    contributions = None
+    if any(k is not None for k in top_ks):
+        predictions, probabilities, contributions, base = score_matrix_explained(model, X, thresholds)
+    else:
+        predictions, probabilities = score_matrix(model, X, thresholds)
+
+    if contributions is not None:
+        # Un solo ordenamiento vectorizado con el k más grande pedido en el lote;
+        # tolist() convierte todo de una vez en lugar de fila por fila
+        ranked = rank_contributions(contributions, max(k for k in top_ks if k is not None))
+        ranked_features = ranked.tolist()
+        ranked_values = np.take_along_axis(X, ranked, axis=1).tolist()
+        ranked_contributions = np.take_along_axis(contributions, ranked, axis=1).tolist()
+        log_odds = (base + contributions.sum(axis=1)).tolist()
 
     #  respuesta
-    return {
-        #"input_used": {col: float(input_data[col]) for col in FEATURE_COLUMNS},
-        "prediction": int(pred),
-        "prediction_meaning": "riesgo" if int(pred) == 1 else "no_riesgo",
-        #"prediction_label": "riesgo" if int(pred) == 1 else "no_riesgo",
-        "probability_riesgo": prob_risk,
-        #"model_path": model_path,
-    }
\ No newline at end of file
+    results = []
+    for i in range(len(X)):
+        pred = int(predictions[i])
+        result = {
+            #"input_used": {col: float(input_data[col]) for col in FEATURE_COLUMNS},
+            "prediction": pred,
+            "prediction_meaning": "riesgo" if pred == 1 else "no_riesgo",
+            #"prediction_label": "riesgo" if int(pred) == 1 else "no_riesgo",
+            "probability_riesgo": float(probabilities[i]) if probabilities is not None else None,
+            "threshold": thresholds[i],
+            #"model_path": model_path,
+        }
+
+        if imputed_rows is not None and imputed_rows[i]:
+            result["imputed_features"] = [
+                FEATURE_COLUMNS[j] for j in np.flatnonzero(imputed[i]).tolist()
+            ]
+
+        k = top_ks[i]
+        if k is not None:
+            if contributions is None:
+                result["contributions"] = None
+            else:
+                result["base_log_odds"] = base
+                result["log_odds"] = log_odds[i]
+                result["contributions"] = [
+                    {"feature": FEATURE_COLUMNS[j], "value": value, "contribution": contribution}
+                    for j, value, contribution in zip(
+                        ranked_features[i][:k], ranked_values[i][:k], ranked_contributions[i][:k]
+                    )
+                ]
+
+        results.append(result)
+
+    return results
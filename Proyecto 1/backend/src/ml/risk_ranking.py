@@ -0,0 +1,268 @@
+"""
+Ranking persistente de estudiantes por probabilidad de riesgo.
+
+Guarda, por cada fila del dataset puntuado, su índice, la probabilidad de
+riesgo y la versión del modelo que la calculó, ordenados de mayor a menor
+probabilidad. Así "los 200 con más riesgo" o "todos arriba de 0.7" se
+responden con una búsqueda binaria + un slice (O(log n + k)).
+
+Solo /api/risk/build puntúa: las consultas nunca corren el modelo y, si el
+modelo activo cambió desde la última construcción, fallan con
+StaleRankingError hasta que se vuelva a construir.
+"""
+import os
+import time
+import threading
+
+import numpy as np
+
+from src.config import FEATURE_COLUMNS
+from src.ml.model_registry import SAVED_MODELS_DIR, registry, atomic_write
+from src.ml.prediction import score_matrix
+
+RISK_SCORES_FILENAME = "risk_scores.npz"
+
+# Filas que se puntúan por llamada al modelo al reconstruir
+SCORE_CHUNK_ROWS = 50_000
+
+
+class StaleRankingError(RuntimeError):
+    """
+    El ranking guardado se calculó con una versión del modelo distinta a
+    la activa; hay que regenerarlo con /api/risk/build.
+    """
+
+
+def _row_hashes(df):
+    """
+    Hash por fila de (índice, features): identifica filas ya puntuadas.
+    """
+    import pandas as pd
+
+    return pd.util.hash_pandas_object(df[FEATURE_COLUMNS], index=True).to_numpy(dtype=np.uint64)
+
+
+class RiskRanking:
+    """
+    Tabla de resultados puntuados con índice ordenado por probabilidad.
+
+    Arreglos (todos en el mismo orden, probabilidad descendente):
+        row_index, probability, model_version, row_hash
+    """
+
+    # Únicos arreglos que se guardan en disco (nunca las features)
+    STORED_KEYS = ("row_index", "probability", "model_version", "row_hash")
+
+    def __init__(self, models_dir=SAVED_MODELS_DIR):
+        self.path = os.path.join(models_dir, RISK_SCORES_FILENAME)
+        self._lock = threading.Lock()
+        # Estado inmutable: se reemplaza completo al reconstruir
+        self._state = None
+        self._loaded = False
+
+    # ------------------------------------------------------------------
+    # Persistencia
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        if self._loaded:
+            return
+        if os.path.exists(self.path):
+            with np.load(self.path) as data:
+                self._state = self._with_search_key({key: data[key] for key in self.STORED_KEYS})
+        self._loaded = True
+
+    def _save(self, state):
+        arrays = {key: state[key] for key in self.STORED_KEYS}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        atomic_write(self.path, lambda f: np.savez(f, **arrays))
+
+    def clear(self):
+        """
+        Descarta el ranking (en memoria y en disco), por ejemplo al
+        reiniciar el sistema: sus filas son de un dataset que ya no está.
+        """
+        with self._lock:
+            self._state = None
+            self._loaded = True
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    @staticmethod
+    def _with_search_key(state):
+        # Probabilidad negada: ascendente, lista para np.searchsorted
+        state["neg_probability"] = -state["probability"]
+        # Versión común a todas las filas (None si hay mezcla): permite
+        # comprobar en O(1) si el ranking está al día con el modelo activo
+        versions = np.unique(state["model_version"])
+        state["ranked_version"] = str(versions[0]) if len(versions) == 1 else None
+        return state
+
+    # ------------------------------------------------------------------
+    # Construcción
+    # ------------------------------------------------------------------
+
+    def _score(self, features):
+        """
+        Probabilidades del modelo activo por partes. Devuelve (probabilidades, versión).
+        """
+        model, _, metadata = registry.load_active()
+        version = metadata.get("version") or "legacy"
+
+        probabilities = np.empty(len(features), dtype=np.float64)
+        for start in range(0, len(features), SCORE_CHUNK_ROWS):
+            chunk = features[start:start + SCORE_CHUNK_ROWS]
+            _, proba = score_matrix(model, chunk, None)
+            if proba is None:
+                raise ValueError("El modelo activo no calcula probabilidades (predict_proba)")
+            probabilities[start:start + len(chunk)] = proba
+
+        return probabilities, version
+
+    def _merge(self, row_index, probability, model_version, row_hash):
+        # Mayor probabilidad primero; empates por índice de fila
+        order = np.lexsort((row_index, -probability))
+        return self._with_search_key({
+            "row_index": row_index[order],
+            "probability": probability[order],
+            "model_version": model_version[order],
+            "row_hash": row_hash[order],
+        })
+
+    def build(self, df):
+        """
+        Puntúa el dataset con el modelo activo y actualiza el ranking.
+
+        Es incremental: las filas que ya estaban puntuadas con la versión
+        activa (mismo índice y mismas features) se reutilizan y solo se
+        puntúan las nuevas o las que venían de otra versión.
+        """
+        missing = [col for col in FEATURE_COLUMNS if col not in df.columns]
+        if missing:
+            raise ValueError(f"Faltan las siguientes columnas: {', '.join(missing)}")
+
+        start = time.perf_counter()
+
+        with self._lock:
+            self._load()
+            active = registry.active_version() or "legacy"
+
+            row_index = df.index.to_numpy(dtype=np.int64)
+            row_hash = _row_hashes(df)
+            features = df[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+            probability = np.full(len(df), np.nan)
+            model_version = np.full(len(df), active, dtype="<U16")
+
+            # Reutilizar probabilidades ya calculadas con esta versión
+            old = self._state
+            if old is not None:
+                current = old["model_version"] == active
+                old_hashes = old["row_hash"][current]
+                old_proba = old["probability"][current]
+
+                if len(old_hashes):
+                    order = np.argsort(old_hashes)
+                    old_hashes, old_proba = old_hashes[order], old_proba[order]
+                    pos = np.minimum(np.searchsorted(old_hashes, row_hash), len(old_hashes) - 1)
+                    hit = old_hashes[pos] == row_hash
+                    probability[hit] = old_proba[pos[hit]]
+
+            pending = np.isnan(probability)
+            if pending.any():
+                probability[pending], version = self._score(features[pending])
+                model_version[pending] = version
+
+            state = self._merge(row_index, probability, model_version, row_hash)
+            self._save(state)
+            self._state = state
+
+        return {
+            "rows": int(len(df)),
+            "scored": int(pending.sum()),
+            "reused": int(len(df) - pending.sum()),
+            "model_version": str(model_version[0]) if len(df) else active,
+            "seconds": round(time.perf_counter() - start, 4),
+        }
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def _current_state(self):
+        """
+        Ranking listo para consultar. No puntúa: si el modelo activo cambió
+        desde la última construcción lanza StaleRankingError.
+        """
+        with self._lock:
+            self._load()
+            state = self._state
+        if state is None:
+            raise LookupError("No hay ranking de riesgo. Primero genera uno con /api/risk/build")
+
+        active = registry.active_version() or "legacy"
+        if len(state["row_index"]) and state["ranked_version"] != active:
+            raise StaleRankingError(
+                f"El ranking se calculó con la versión {state['ranked_version']} y el modelo "
+                f"activo es {active}. Regenera el ranking con /api/risk/build"
+            )
+        return state
+
+    @staticmethod
+    def _rows(state, start, stop):
+        return [
+            {
+                "rank": int(rank) + 1,
+                "row_index": int(state["row_index"][rank]),
+                "probability_riesgo": float(state["probability"][rank]),
+                "model_version": str(state["model_version"][rank]),
+            }
+            for rank in range(start, stop)
+        ]
+
+    def top(self, k):
+        """
+        Las k filas con mayor probabilidad de riesgo.
+        """
+        state = self._current_state()
+        k = max(0, min(int(k), len(state["row_index"])))
+        return {"total": int(len(state["row_index"])), "results": self._rows(state, 0, k)}
+
+    def in_range(self, min_probability=0.0, max_probability=1.0, offset=0, limit=100):
+        """
+        Filas con min_probability <= probabilidad <= max_probability,
+        de mayor a menor, paginadas con offset / limit.
+        """
+        if min_probability > max_probability:
+            raise ValueError("min debe ser menor o igual que max")
+
+        state = self._current_state()
+        neg = state["neg_probability"]
+        first = int(np.searchsorted(neg, -max_probability, side="left"))
+        last = int(np.searchsorted(neg, -min_probability, side="right"))
+
+        start = min(first + max(0, int(offset)), last)
+        stop = min(start + max(0, int(limit)), last)
+        return {"total": last - first, "results": self._rows(state, start, stop)}
+
+    def page(self, page=1, per_page=50):
+        """
+        Página del ranking completo (page empieza en 1).
+        """
+        if page < 1 or per_page < 1:
+            raise ValueError("page y per_page deben ser mayores que 0")
+
+        state = self._current_state()
+        total = len(state["row_index"])
+        start = min((page - 1) * per_page, total)
+        stop = min(start + per_page, total)
+        return {
+            "total": int(total),
+            "page": page,
+            "per_page": per_page,
+            "pages": (total + per_page - 1) // per_page,
+            "results": self._rows(state, start, stop),
+        }
+
+
+# Instancia compartida por la API
+risk_ranking = RiskRanking()
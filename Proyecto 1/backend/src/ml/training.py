@@ -1,10 +1,8 @@
-import os
-import joblib
-import numpy as np
+import time
+
 import pandas as pd
 
 from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import (
     accuracy_score,
     precision_score,
@@ -13,10 +11,21 @@ from sklearn.metrics import (
 )
 
 from src.config import FEATURE_COLUMNS, TARGET_COLUMN
-
-# Carpeta donde se guardará el modelo
-SAVED_MODELS_DIR = "saved_models"
-MODEL_FILENAME = "studentguard_model.pkl"
+from src.ml.model_registry import registry, dataset_fingerprint
+from src.ml.evaluation import ThresholdSweep, confusion_matrix_dict
+from src.ml import drift
+from src.ml import cross_validation
+from src.data.cleaning_transform import CleaningTransform
+from src.ml.engines import (
+    DEFAULT_ENGINE,
+    LATENCY_BATCH_ROWS,
+    MODEL_ENGINES,
+    artifact_size,
+    build_logistic_regression,
+    build_model,
+    fit_iterations,
+    predict_latency
+)
 
 
 def train_model(df: pd.DataFrame):
@@ -24,16 +33,18 @@ def train_model(df: pd.DataFrame):
     return train_model_with_params(df, hyperparams=None)
 
 
-def train_model_with_params(df: pd.DataFrame, hyperparams: dict = None):
+def build_pipeline(max_iter=1000, C=0.5, solver='lbfgs', scale=True):
+    """
+    Pipeline de regresión logística (motor por defecto), sin entrenar.
+    """
+    model, _ = build_logistic_regression(max_iter=max_iter, C=C, solver=solver, scale=scale)
+    return model
 
-    # Valores por defecto de hiperparámetros
-    if hyperparams is None:
-        hyperparams = {}
-    
-    max_iter = hyperparams.get('max_iter', 1000)
-    C = hyperparams.get('C', 0.5)
-    solver = hyperparams.get('solver', 'lbfgs')
 
+def _split(df: pd.DataFrame):
+    """
+    Valida las columnas y separa train / test (estratificado, 80/20).
+    """
     if TARGET_COLUMN not in df.columns:
         raise ValueError(f"La columna '{TARGET_COLUMN}' no está presente en los datos limpios.")
 
@@ -42,29 +53,11 @@ def train_model_with_params(df: pd.DataFrame, hyperparams: dict = None):
     if missing_cols:
         raise ValueError(f"Faltan las siguientes columnas: {', '.join(missing_cols)}")
 
-    # Extraer  las columnas necesairas
-    X = df[FEATURE_COLUMNS].copy()
-    y = df[TARGET_COLUMN].copy()
+    # Extraer  las columnas necesairas y convertir a numpy
+    X = df[FEATURE_COLUMNS].values
+    y = df[TARGET_COLUMN].values
 
-    print(f"\n Entrenando con {len(FEATURE_COLUMNS)} features:")
-    for i, col in enumerate(FEATURE_COLUMNS, 1):
-        print(f"   {i}. {col}")
-    
-    print(f"\n Total de muestras: {len(X)}")
-    print(f"   - Riesgo (1): {int(y.sum())} ({100*y.mean():.1f}%)")
-    print(f"   - No Riesgo (0): {int((1-y).sum())} ({100*(1-y.mean()):.1f}%)")
-
-    print(f"\n Hiperparámetros del modelo:")
-    print(f"   - max_iter: {max_iter}")
-    print(f"   - C (regularización): {C}")
-    print(f"   - solver: {solver}")
-
-    # Convertir a numpy
-    X = X.values
-    y = y.values
-
-    # Separar train / test
-    X_train, X_test, y_train, y_test = train_test_split(
+    return train_test_split(
         X,
         y,
         test_size=0.2,
@@ -72,43 +65,134 @@ def train_model_with_params(df: pd.DataFrame, hyperparams: dict = None):
         stratify=y 
     )
 
-    # Definir modelo con hiperparámetros personalizados
-    model = LogisticRegression(
-        max_iter=max_iter,
-        C=C,
-        solver=solver,
-        random_state=42
-    )
+
+def fit_and_evaluate(X_train, X_test, y_train, y_test, hyperparams: dict = None,
+                     measure_latency=False):
+    """
+    Camino común a todos los motores: construir, entrenar, evaluar y medir
+    el tamaño del artefacto. Devuelve (modelo, métricas, barrido).
+
+    measure_latency=True agrega predict_latency_ms (50 predicciones de una
+    fila + lotes de 10k filas); solo lo pide compare_engines, un
+    entrenamiento normal no paga esa medición.
+    """
+    hyperparams = dict(hyperparams or {})
+    engine = hyperparams.pop('engine', None) or DEFAULT_ENGINE
+    model, hyperparams_used = build_model(engine, **hyperparams)
+
+    print(f"\n Motor: {engine}")
+    print(f" Hiperparámetros del modelo:")
+    for key, value in hyperparams_used.items():
+        if key != 'engine':
+            print(f"   - {key}: {value}")
 
     # Entrenar
     print("\n Entrenando modelo...")
+    fit_start = time.perf_counter()
     model.fit(X_train, y_train)
-    print("    Entrenamiento completado")
+    fit_time = time.perf_counter() - fit_start
+    n_iter = fit_iterations(model)
+    print(f"    Entrenamiento completado en {fit_time:.3f} s"
+          + (f" ({n_iter} iteraciones)" if n_iter is not None else ""))
 
-    # Predecir en test
+    # Predecir en test (las probabilidades se guardan una sola vez)
     y_pred = model.predict(X_test)
+    y_proba = model.predict_proba(X_test)[:, 1]
+
+    # Barrido de umbrales: un solo ordenamiento para ROC, PR y consultas por umbral
+    sweep = ThresholdSweep(y_test, y_proba)
+
+    # Convergencia solo aplica al optimizador de la regresión logística
+    # (en el boosting max_iter es el número de árboles)
+    max_iter = hyperparams_used.get('max_iter') if engine == 'logistic_regression' else None
 
     # Calcular métricas
     metrics = {
+        "engine": engine,
         "accuracy": float(accuracy_score(y_test, y_pred)),
         "precision": float(precision_score(y_test, y_pred, zero_division=0)),
         "recall": float(recall_score(y_test, y_pred, zero_division=0)),
         "f1_score": float(f1_score(y_test, y_pred, zero_division=0)),
         "n_train": int(len(y_train)),
         "n_test": int(len(y_test)),
-        "hyperparams_used": {
-            "max_iter": max_iter,
-            "C": C,
-            "solver": solver
-        }
+        "hyperparams_used": hyperparams_used,
+        "n_iter": n_iter,
+        "converged": None if n_iter is None or max_iter is None else n_iter < max_iter,
+        "fit_time_s": round(fit_time, 4),
+        "artifact_size_bytes": artifact_size(model),
+        "confusion_matrix": confusion_matrix_dict(y_test, y_pred),
+        "roc_curve": sweep.roc_curve(),
+        "pr_curve": sweep.pr_curve()
     }
 
-    os.makedirs(SAVED_MODELS_DIR, exist_ok=True)
+    if measure_latency:
+        latency = predict_latency(model, X_test)
+        metrics["predict_latency_ms"] = latency
+        print(f"    Predicción: {latency['single_row_ms']:.3f} ms (1 fila), "
+              f"{latency['batch_10k_ms']:.1f} ms ({LATENCY_BATCH_ROWS} filas)")
+
+    return model, metrics, sweep
+
+
+def train_model_with_params(df: pd.DataFrame, hyperparams: dict = None):
+    """
+    Entrena, evalúa y guarda una versión nueva del modelo.
+
+    Con hyperparams['cv_folds'] (>= 2) además corre validación cruzada
+    estratificada en paralelo y agrega 'cross_validation' a las métricas,
+    con intervalos bootstrap (bootstrap_resamples, confidence). El modelo
+    guardado es el mismo de siempre (80/20).
+    """
+    hyperparams = dict(hyperparams or {})
+    cv_folds = hyperparams.pop('cv_folds', None)
+    cv_resamples = hyperparams.pop('bootstrap_resamples', cross_validation.DEFAULT_RESAMPLES)
+    cv_confidence = hyperparams.pop('confidence', cross_validation.DEFAULT_CONFIDENCE)
+
+    X_train, X_test, y_train, y_test = _split(df)
+    y = df[TARGET_COLUMN]
+    if cv_folds is not None:
+        cross_validation.validate_params(cv_folds, cv_resamples, cv_confidence, y.values)
+
+    print(f"\n Entrenando con {len(FEATURE_COLUMNS)} features:")
+    for i, col in enumerate(FEATURE_COLUMNS, 1):
+        print(f"   {i}. {col}")
+    
+    print(f"\n Total de muestras: {len(y)}")
+    print(f"   - Riesgo (1): {int(y.sum())} ({100*y.mean():.1f}%)")
+    print(f"   - No Riesgo (0): {int((1-y).sum())} ({100*(1-y.mean()):.1f}%)")
 
-    model_path = os.path.join(SAVED_MODELS_DIR, MODEL_FILENAME)
-    joblib.dump(model, model_path)
+    model, metrics, sweep = fit_and_evaluate(X_train, X_test, y_train, y_test, hyperparams)
+
+    if cv_folds is not None:
+        print(f"\n Validación cruzada: {cv_folds} folds en paralelo...")
+        cv = cross_validation.cross_validate(
+            df[FEATURE_COLUMNS].values, y.values,
+            dict(hyperparams, engine=metrics["engine"]),
+            folds=cv_folds, n_resamples=cv_resamples, confidence=cv_confidence
+        )
+        metrics["cross_validation"] = cv
+        intervals = cv["confidence_intervals"]
+        print(f"    F1 out-of-fold: {cv['out_of_fold']['f1_score']:.3f} "
+              f"[{intervals['f1_score']['low']:.3f}, {intervals['f1_score']['high']:.3f}] "
+              f"({100 * cv_confidence:.0f}%) en {cv['folds_time_s'] + cv['bootstrap_time_s']:.2f} s")
+
+    # Guardar como nueva versión en el registro (escritura atómica)
+    version, model_path = registry.save_model(
+        model,
+        metrics=dict(metrics),
+        hyperparams=metrics["hyperparams_used"],
+        fingerprint=dataset_fingerprint(df[FEATURE_COLUMNS + [TARGET_COLUMN]]),
+        extras={
+            "threshold_sweep": sweep.to_arrays(),
+            # Distribución de entrenamiento para /api/drift
+            "feature_histograms": drift.reference_arrays(drift.histogram(X_train)),
+            # Medianas y rangos para limpiar las entradas de /api/predict
+            "cleaning_transform": CleaningTransform.fit(X_train).to_arrays()
+        }
+    )
 
     metrics["model_path"] = model_path
+    metrics["model_version"] = version
 
     print(f"\n Modelo guardado en: {model_path}")
     print(f"\n Métricas del modelo:")
@@ -117,4 +201,46 @@ def train_model_with_params(df: pd.DataFrame, hyperparams: dict = None):
     print(f"   • Recall:    {metrics['recall']:.3f}")
     print(f"   • F1-Score:  {metrics['f1_score']:.3f}")
 
-    return metrics
\ No newline at end of file
+    return metrics
+
+
+def compare_engines(df: pd.DataFrame, engines=None, hyperparams: dict = None):
+    """
+    Entrena cada motor con la misma partición (sin guardarlos en el
+    registro) y compara tiempo de ajuste, latencia de predicción para una
+    fila y para 10k filas, tamaño del artefacto y F1.
+
+    hyperparams: {motor: {hiperparámetros}} opcional.
+    """
+    engines = list(engines or MODEL_ENGINES)
+    unknown = [engine for engine in engines if engine not in MODEL_ENGINES]
+    if unknown:
+        raise ValueError(
+            f"Motores no soportados: {', '.join(unknown)}. Opciones: {', '.join(MODEL_ENGINES)}"
+        )
+    hyperparams = hyperparams or {}
+
+    X_train, X_test, y_train, y_test = _split(df)
+
+    results = []
+    for engine in engines:
+        params = dict(hyperparams.get(engine) or {}, engine=engine)
+        _, metrics, _ = fit_and_evaluate(X_train, X_test, y_train, y_test, params, measure_latency=True)
+        results.append({
+            "engine": engine,
+            "f1_score": metrics["f1_score"],
+            "fit_time_s": metrics["fit_time_s"],
+            "single_row_ms": metrics["predict_latency_ms"]["single_row_ms"],
+            "batch_10k_ms": metrics["predict_latency_ms"]["batch_10k_ms"],
+            "artifact_size_bytes": metrics["artifact_size_bytes"],
+            "hyperparams_used": metrics["hyperparams_used"],
+        })
+
+    return {
+        "n_train": int(len(y_train)),
+        "n_test": int(len(y_test)),
+        "engines": results,
+        "best_f1": max(results, key=lambda r: r["f1_score"])["engine"],
+        "fastest_single_row": min(results, key=lambda r: r["single_row_ms"])["engine"],
+        "fastest_batch_10k": min(results, key=lambda r: r["batch_10k_ms"])["engine"],
+    }
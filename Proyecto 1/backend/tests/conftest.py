@@ -0,0 +1,55 @@
+"""
+Configuración de pytest: las pruebas importan el backend como 'src.*'.
+
+Uso (desde la carpeta backend):
+    python -m pytest -q
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def make_students(rows, seed=0):
+    """
+    Dataset sintético con las columnas de REQUIRED_COLUMNS y las mismas
+    escalas que el real (porcentajes 0-100, horas 0-24, conteos chicos).
+    El riesgo depende sobre todo del promedio, la asistencia, los cursos
+    reprobados y los reportes, así los modelos tienen algo que aprender.
+    """
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'promedio_actual': rng.uniform(30, 100, rows),
+        'asistencia_clases': rng.uniform(20, 100, rows),
+        'tareas_entregadas': rng.uniform(10, 100, rows),
+        'participacion_clase': rng.uniform(0, 100, rows),
+        'horas_estudio': rng.uniform(0, 24, rows),
+        'promedio_evaluaciones': rng.uniform(30, 100, rows),
+        'cursos_reprobados': rng.integers(0, 5, rows),
+        'actividades_extracurriculares': rng.integers(0, 4, rows),
+        'reportes_disciplinarios': rng.integers(0, 3, rows),
+    })
+    score = (
+        -0.08 * (df['promedio_actual'] - 65)
+        - 0.03 * (df['asistencia_clases'] - 60)
+        + 0.8 * df['cursos_reprobados']
+        + 0.5 * df['reportes_disciplinarios']
+        + rng.normal(0, 1, rows)
+    )
+    df['riesgo'] = (score > 1).astype(int)
+    return df
+
+
+@pytest.fixture
+def synthetic_dataset():
+    """
+    Generador de datasets sintéticos: synthetic_dataset(filas, seed=0).
+    """
+    return make_students
@@ -0,0 +1,65 @@
+"""
+PredictBatcher: micro-lotes de predicciones concurrentes.
+"""
+import contextlib
+import io
+
+import pytest
+
+from src.config import FEATURE_COLUMNS
+from src.ml import batching
+from src.ml.batching import PredictBatcher
+from src.ml.prediction import predict_risk
+from src.ml.training import train_model
+
+
+def students(df, n):
+    return [{col: df[col].iloc[i] for col in FEATURE_COLUMNS} for i in range(n)]
+
+
+def test_batched_results_match_single_predictions(tmp_path, monkeypatch, synthetic_dataset):
+    monkeypatch.chdir(tmp_path)
+    df = synthetic_dataset(400)
+    with contextlib.redirect_stdout(io.StringIO()):
+        train_model(df)
+
+    inputs = students(df, 12)
+    # Espera larga: las 12 solicitudes entran en pocos lotes
+    batcher = PredictBatcher(max_batch_size=8, max_wait_ms=200)
+    futures = [batcher.submit(data, threshold=0.4 if i % 2 else None, explain=2 if i % 3 == 0 else None)
+               for i, data in enumerate(inputs)]
+    results = [future.result(timeout=10) for future in futures]
+
+    for i, (data, result) in enumerate(zip(inputs, results)):
+        expected = predict_risk(data, threshold=0.4 if i % 2 else None, explain=2 if i % 3 == 0 else None)
+        # El lote puede diferir del cálculo de una fila en el último dígito
+        assert result['probability_riesgo'] == pytest.approx(expected['probability_riesgo'])
+        assert result['prediction'] == expected['prediction']
+        assert result.keys() == expected.keys()
+    assert batcher.stats['rows'] == 12
+    assert 1 < batcher.stats['max_batch'] <= 8
+    assert batcher.stats['batches'] < 12
+
+
+def test_a_failing_row_only_fails_its_own_request(monkeypatch, synthetic_dataset):
+    def fake_predict_batch(rows, thresholds=None, explain=None):
+        if any(row[0] == -1 for row in rows):
+            raise ValueError("fila inválida")
+        return [{"promedio_actual": row[0]} for row in rows]
+
+    monkeypatch.setattr(batching, 'predict_batch', fake_predict_batch)
+    inputs = students(synthetic_dataset(5), 5)
+    inputs[2]['promedio_actual'] = -1
+
+    batcher = PredictBatcher(max_wait_ms=200)
+    futures = [batcher.submit(data) for data in inputs]
+
+    with pytest.raises(ValueError, match="fila inválida"):
+        futures[2].result(timeout=10)
+    for i in (0, 1, 3, 4):
+        assert futures[i].result(timeout=10) == {"promedio_actual": inputs[i]['promedio_actual']}
+
+
+def test_validation_errors_are_raised_in_the_calling_thread():
+    with pytest.raises(ValueError, match="Faltan"):
+        PredictBatcher().submit({'promedio_actual': 80})
@@ -0,0 +1,58 @@
+"""
+DataBrowser: filtros, orden y cursores sobre los datos limpios.
+"""
+import pandas as pd
+import pytest
+
+from src.data.data_browser import DataBrowser, parse_filters, parse_sort
+
+
+def make_frame():
+    return pd.DataFrame({
+        'promedio_actual': [7.5, 9.0, 6.0, 9.0, 8.0],
+        'nombre': ['ana', 'beto', 'caro', 'dani', 'eli'],
+        # Columna de features que no se convirtió (mezcla de números y texto)
+        'horas_estudio': pd.Series([10, 'n/a', 3, 8, 1], dtype=object),
+    }, index=[10, 11, 12, 13, 14])
+
+
+def test_sort_filter_and_cursor_pages():
+    df = make_frame()
+    browser = DataBrowser()
+    first = browser.query(df, columns=['promedio_actual'],
+                          filters=parse_filters({'min_promedio_actual': '7'}, df.columns),
+                          sort=parse_sort('-promedio_actual', df.columns), limit=2)
+
+    assert first['matched'] == 4
+    # Orden estable: los empates conservan el orden original
+    assert [row['row_index'] for row in first['rows']] == [11, 13]
+
+    second = browser.query(df, cursor=first['next_cursor'])
+    assert [row['row_index'] for row in second['rows']] == [14, 10]
+    assert second['next_cursor'] is None
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'sort': ('nombre', False)},
+    {'sort': ('horas_estudio', True)},
+    {'filters': (('horas_estudio', 2.0, None),)},
+    {'filters': (('nombre', None, 5.0),)},
+])
+def test_non_numeric_columns_are_rejected(kwargs):
+    with pytest.raises(ValueError, match='numéricas'):
+        DataBrowser().query(make_frame(), **kwargs)
+
+
+def test_endpoint_returns_400_for_text_column(monkeypatch):
+    from src.app.app import create_app, snapshots
+    from src.app.state import Snapshot
+
+    client = create_app(prewarm=False).test_client()
+    snapshot = Snapshot(cleaned_data=make_frame())
+    monkeypatch.setattr(snapshots, 'current', lambda: snapshot)
+
+    assert client.get('/api/data/rows?sort=-promedio_actual').status_code == 200
+    for query in ('sort=nombre', 'min_horas_estudio=2'):
+        r = client.get(f'/api/data/rows?{query}')
+        assert r.status_code == 400
+        assert 'numéricas' in r.get_json()['error']
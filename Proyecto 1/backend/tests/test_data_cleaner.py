@@ -0,0 +1,54 @@
+"""
+DataCleaner.append_data: limpieza incremental con los parámetros aprendidos.
+"""
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+
+from src.config import REQUIRED_COLUMNS
+from src.data.data_cleaner import DataCleaner
+
+
+def make_rows(promedios, start):
+    # Filas distintas entre sí (asistencia_clases creciente)
+    n = len(promedios)
+    df = pd.DataFrame({col: np.ones(n) for col in REQUIRED_COLUMNS})
+    df['asistencia_clases'] = np.arange(start, start + n, dtype=float)
+    df['promedio_actual'] = promedios
+    df['riesgo'] = 0
+    return df
+
+
+def test_recomputed_median_ignores_imputed_values():
+    first = make_rows([10, 20, 30] + [np.nan] * 5, start=0)
+    second = make_rows([80, 90, 100, np.nan], start=50)
+
+    cleaner = DataCleaner()
+    with contextlib.redirect_stdout(io.StringIO()):
+        cleaned = cleaner.clean_data(first)
+        assert cleaner.medians['promedio_actual'] == 20
+        merged = cleaner.append_data(cleaned, second, recompute_medians=True)
+
+    # Mediana de los valores reales (10..100); con los rellenos daría 20
+    assert cleaner.medians['promedio_actual'] == 55
+    assert merged.loc[merged.index[-1], 'promedio_actual'] == 55
+    assert len(cleaner.imputed_rows['promedio_actual']) == 6
+
+    # Un segundo append sigue descontando las 6 celdas imputadas
+    with contextlib.redirect_stdout(io.StringIO()):
+        cleaner.append_data(merged, make_rows([40, 50], start=90), recompute_medians=True)
+    assert cleaner.medians['promedio_actual'] == float(np.median([10, 20, 30, 40, 50, 80, 90, 100]))
+
+
+def test_append_without_recompute_keeps_learned_medians():
+    cleaner = DataCleaner()
+    with contextlib.redirect_stdout(io.StringIO()):
+        cleaned = cleaner.clean_data(make_rows([10, 20, 30, np.nan], start=0))
+        # La fila repetida se descarta por su huella
+        merged = cleaner.append_data(cleaned, make_rows([10, 90, np.nan], start=0))
+
+    assert cleaner.medians['promedio_actual'] == 20
+    assert len(merged) == 6
+    assert merged['promedio_actual'].tolist()[-2:] == [90, 20]
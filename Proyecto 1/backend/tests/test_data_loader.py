@@ -0,0 +1,35 @@
+"""
+DataLoader: el parser de Arrow y el de pandas leen igual un CSV sucio.
+"""
+import pandas as pd
+import pytest
+
+from src.config import REQUIRED_COLUMNS
+from src.data import data_loader
+from src.data.data_cleaner import coerce_column
+
+DIRTY_CSV = """promedio_actual,asistencia_clases,tareas_entregadas,participacion_clase,horas_estudio,promedio_evaluaciones,cursos_reprobados,actividades_extracurriculares,reportes_disciplinarios,riesgo,nombre
+80,90,"70",1e2,,-5,2,3,1,1,ana
+noventa, 85 ,NaN,50,3.5,60,1.0,"['a', 'b']",0,riesgo,beto
+75,NA,null,N/A,4,70,,[],,no riesgo,
+Sí,88.5,60,40,2,65,0,"3",2,0,caro
+"""
+
+
+@pytest.mark.skipif(not data_loader.PYARROW_AVAILABLE, reason="requiere pyarrow")
+def test_arrow_and_c_parsers_agree_on_dirty_csv(tmp_path):
+    path = tmp_path / 'sucio.csv'
+    path.write_text(DIRTY_CSV, encoding='utf-8')
+
+    c_df = data_loader.read_csv_c(str(path))
+    arrow_df = data_loader.read_csv_arrow(str(path))
+
+    # Mismos tipos y valores en las columnas que usa el modelo
+    pd.testing.assert_frame_equal(c_df[REQUIRED_COLUMNS], arrow_df[REQUIRED_COLUMNS])
+
+    for col in REQUIRED_COLUMNS:
+        c_values = coerce_column(col, c_df[col])[0]
+        arrow_values = coerce_column(col, arrow_df[col])[0]
+        pd.testing.assert_series_equal(c_values, arrow_values)
+
+    assert coerce_column('actividades_extracurriculares', arrow_df['actividades_extracurriculares'])[0].tolist() == [3, 2, 0, 3]
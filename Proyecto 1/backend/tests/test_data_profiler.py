@@ -0,0 +1,57 @@
+"""
+DataProfiler: perfil de calidad armado mientras se lee el CSV.
+"""
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.config import REQUIRED_COLUMNS
+from src.data import data_loader
+from src.data.data_loader import DataLoader
+from src.data.data_profiler import DataProfiler
+
+
+def write_csv(path, rows):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({col: rng.integers(0, 3, rows) for col in REQUIRED_COLUMNS}).astype(object)
+    df['promedio_actual'] = np.round(rng.uniform(0, 100, rows), 3)
+    df.loc[::7, 'horas_estudio'] = 'muchas'
+    df.loc[::11, 'actividades_extracurriculares'] = "['coro']"
+    df.loc[::13, 'riesgo'] = 'riesgo'
+    df.to_csv(path, index=False)
+
+
+def test_cardinality_stops_counting_after_max_distinct(monkeypatch):
+    monkeypatch.setattr(DataProfiler, 'MAX_DISTINCT', 5)
+    profiler = DataProfiler(columns=['a', 'b'])
+    profiler.update(pd.DataFrame({'a': [1, 2, 3, 1], 'b': ['x', 'y', 'z', 'w']}))
+    profiler.update(pd.DataFrame({'a': [4, 5, 5, None], 'b': ['u', 'v', 't', 's']}))
+
+    columns = profiler.finalize()['columns']
+    assert columns['a']['cardinality'] == 5
+    assert columns['b']['cardinality'] == '>5'
+
+
+@pytest.mark.skipif(not data_loader.PYARROW_AVAILABLE, reason="requiere pyarrow")
+def test_profile_while_reading_matches_profile_after_reading(tmp_path, monkeypatch):
+    # Chunks chicos: el perfil del parser 'c' se arma en varias partes
+    monkeypatch.setattr(data_loader, 'COMPRESSED_CHUNKSIZE', 100)
+    path = tmp_path / 'datos.csv'
+    write_csv(path, 450)
+
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for parser in ('c', 'pyarrow'):
+            profiler = DataProfiler()
+            df, error = DataLoader(str(tmp_path), parser=parser).load_csv(str(path), profiler=profiler)
+            assert error is None
+            results[parser] = (df, profiler)
+
+    (c_df, c_profile), (arrow_df, arrow_profile) = results['c'], results['pyarrow']
+    assert c_profile.report == arrow_profile.report
+    assert c_profile.report['columns']['horas_estudio']['non_numeric'] == len(range(0, 450, 7))
+    pd.testing.assert_frame_equal(c_profile.coerced, arrow_profile.coerced, check_dtype=False)
+    assert len(c_df) == len(arrow_df) == 450
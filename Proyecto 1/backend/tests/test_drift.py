@@ -0,0 +1,62 @@
+"""
+DriftMonitor: contadores por versión del modelo y PSI contra el
+histograma de entrenamiento.
+"""
+import numpy as np
+import pytest
+
+from src.config import FEATURE_COLUMNS
+from src.ml import drift
+from src.ml.drift import DriftMonitor, histogram
+
+
+@pytest.fixture
+def X(synthetic_dataset):
+    return synthetic_dataset(2000)[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+
+
+def test_single_rows_and_batches_fill_the_same_bins(X):
+    X = X[:200].copy()
+    X[::9, 0] = np.nan
+    X[::7, 1] = 140.0   # sobre el máximo
+    X[::5, 2] = -3.0    # bajo el mínimo
+    X[::11, 6] = 25     # conteo "10 o más"
+    X[::13, 4] = 24.0   # justo en el máximo
+
+    by_row, by_batch = DriftMonitor(enabled=True), DriftMonitor(enabled=True)
+    for row in X:
+        by_row.observe(row[None, :], 'v0001')
+    by_batch.observe(X, 'v0001')
+
+    counts, rows, _ = by_row.snapshot('v0001')
+    np.testing.assert_array_equal(counts, histogram(X))
+    np.testing.assert_array_equal(counts, by_batch.snapshot('v0001')[0])
+    assert rows == by_batch.snapshot('v0001')[1] == 200
+
+
+def test_each_model_version_has_its_own_window(X, monkeypatch):
+    monitor = DriftMonitor(enabled=True, max_windows=2)
+    monkeypatch.setattr(drift, 'load_reference', lambda version: histogram(X[:1000]))
+
+    shifted = X[1000:].copy()
+    shifted[:, 0] = np.clip(shifted[:, 0] - 40, 0, None)
+    monitor.observe(X[1000:], 'v0001')
+    monitor.observe(shifted, 'v0002')
+
+    assert monitor.report('v0001')['status'] == 'estable'
+    report = monitor.report('v0002')
+    assert report['features']['promedio_actual']['status'] == 'significativo'
+    assert report['window']['model_version'] == 'v0002'
+    assert report['observed_rows'] == 1000
+
+    # Una tercera versión saca de memoria la ventana más vieja
+    monitor.observe(X[:10], 'v0003')
+    assert monitor.snapshot('v0001')[1] == 0
+    assert monitor.snapshot('v0002')[1] == 1000
+    assert monitor.report('v0001')['status'] == 'sin_datos'
+
+
+def test_disabled_monitor_does_not_count(X):
+    monitor = DriftMonitor(enabled=False)
+    monitor.observe(X, 'v0001')
+    assert monitor.snapshot('v0001')[1] == 0
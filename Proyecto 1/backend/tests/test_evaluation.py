@@ -0,0 +1,45 @@
+"""
+ThresholdSweep contra las métricas de sklearn.
+"""
+import numpy as np
+import pytest
+from sklearn.metrics import (average_precision_score, confusion_matrix, precision_score,
+                             recall_score, roc_auc_score)
+
+from src.ml.evaluation import ThresholdSweep
+
+
+@pytest.fixture
+def scored():
+    rng = np.random.default_rng(7)
+    y = rng.integers(0, 2, 2000)
+    # Probabilidades con empates (redondeadas) y algo de señal
+    scores = np.clip(np.round(0.35 * y + rng.uniform(0, 0.65, 2000), 2), 0, 1)
+    return y, scores
+
+
+@pytest.mark.parametrize('t', [0.0, 0.05, 0.3, 0.5, 0.51, 0.77, 1.0])
+def test_metrics_at_matches_sklearn(scored, t):
+    y, scores = scored
+    metrics = ThresholdSweep(y, scores).metrics_at(t)
+    y_pred = (scores >= t).astype(int)
+
+    assert metrics['precision'] == pytest.approx(precision_score(y, y_pred, zero_division=0))
+    assert metrics['recall'] == pytest.approx(recall_score(y, y_pred))
+    tn, fp, fn, tp = confusion_matrix(y, y_pred, labels=[0, 1]).ravel()
+    assert metrics['confusion_matrix'] == {
+        'true_positives': tp, 'false_positives': fp,
+        'false_negatives': fn, 'true_negatives': tn,
+    }
+
+
+def test_curves_match_sklearn_and_survive_saving(scored):
+    y, scores = scored
+    sweep = ThresholdSweep(y, scores)
+
+    assert sweep.roc_curve()['auc'] == pytest.approx(roc_auc_score(y, scores))
+    assert sweep.pr_curve()['average_precision'] == pytest.approx(average_precision_score(y, scores))
+
+    restored = ThresholdSweep.from_arrays(sweep.to_arrays())
+    for t in (0.2, 0.5, 0.9):
+        assert restored.counts_at(t) == sweep.counts_at(t)
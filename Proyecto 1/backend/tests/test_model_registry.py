@@ -0,0 +1,85 @@
+"""
+ModelRegistry: versiones, puntero a la activa, rollback y extras.
+"""
+import contextlib
+import io
+import os
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from src.config import FEATURE_COLUMNS, TARGET_COLUMN
+from src.ml.model_registry import ModelRegistry
+
+
+def fit(df, C):
+    return LogisticRegression(C=C, max_iter=500).fit(df[FEATURE_COLUMNS], df[TARGET_COLUMN])
+
+
+def test_save_activate_and_rollback_round_trip(tmp_path, synthetic_dataset):
+    df = synthetic_dataset(300)
+    registry = ModelRegistry(models_dir=str(tmp_path))
+    first, second = fit(df, C=0.01), fit(df, C=10.0)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        v1, _ = registry.save_model(first, metrics={'f1_score': 0.7},
+                                    extras={'threshold_sweep': {'tps': np.arange(3)}})
+        v2, _ = registry.save_model(second, activate=False)
+
+    assert (v1, v2) == ('v0001', 'v0002')
+    assert registry.active_version() == v1
+    assert registry.get_metadata(v1)['metrics'] == {'f1_score': 0.7}
+    assert registry.load_extra(v1, 'threshold_sweep')['tps'].tolist() == [0, 1, 2]
+    assert registry.load_extra(v2, 'threshold_sweep') is None
+
+    X = df[FEATURE_COLUMNS].head(20)
+    model, _, metadata = registry.load_active()
+    assert metadata['version'] == v1
+    np.testing.assert_array_equal(model.predict_proba(X), first.predict_proba(X))
+
+    registry.activate(v2)
+    model, _, metadata = registry.load_active()
+    assert metadata['version'] == v2
+    np.testing.assert_array_equal(model.predict_proba(X), second.predict_proba(X))
+    assert [m['is_active'] for m in registry.list_versions()] == [True, False]
+
+    assert registry.rollback()['version'] == v1
+    assert registry.load_active()[2]['version'] == v1
+    with pytest.raises(ValueError):
+        registry.rollback()
+
+
+def test_incomplete_versions_cannot_be_activated(tmp_path, synthetic_dataset):
+    registry = ModelRegistry(models_dir=str(tmp_path))
+    with contextlib.redirect_stdout(io.StringIO()):
+        version, _ = registry.save_model(fit(synthetic_dataset(200), C=1.0))
+
+    # .pkl reservado sin .json: un entrenamiento que sigue guardando
+    reserved = registry._reserve_version()
+    assert reserved == 'v0002'
+    assert not registry.is_complete(reserved)
+    assert [m['version'] for m in registry.list_versions()] == [version]
+    for bad in (reserved, 'v0099', '../v0001'):
+        with pytest.raises(ValueError):
+            registry.activate(bad)
+
+    # Un rollback salta versiones que ya no están en disco
+    with contextlib.redirect_stdout(io.StringIO()):
+        newer, _ = registry.save_model(fit(synthetic_dataset(200, seed=1), C=1.0))
+    registry.activate(newer)
+    os.remove(registry.metadata_path(version))
+    with pytest.raises(ValueError):
+        registry.rollback()
+    assert registry.active_version() == newer
+
+
+def test_threshold_is_stored_with_the_active_version(tmp_path, synthetic_dataset):
+    registry = ModelRegistry(models_dir=str(tmp_path))
+    with contextlib.redirect_stdout(io.StringIO()):
+        registry.save_model(fit(synthetic_dataset(200), C=1.0))
+
+    assert registry.load_active()[2]['threshold'] == 0.5
+    registry.set_threshold(0.3)
+    # Reescribir el puntero invalida la caché del modelo activo
+    assert registry.load_active()[2]['threshold'] == 0.3
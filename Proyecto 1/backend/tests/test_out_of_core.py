@@ -0,0 +1,58 @@
+"""
+Entrenamiento out-of-core desde el CSV crudo subido.
+"""
+import contextlib
+import io
+
+import numpy as np
+
+from src.ml.evaluation import ThresholdSweep
+
+
+def dirty_csv(synthetic_dataset, rows=1500):
+    df = synthetic_dataset(rows, seed=3).astype(object)
+    df.loc[::11, 'promedio_actual'] = 'noventa'
+    df.loc[::13, 'horas_estudio'] = None
+    df.loc[::17, 'actividades_extracurriculares'] = "['futbol', 'coro']"
+    df.loc[::19, 'riesgo'] = 'no riesgo'
+    df.loc[::23, 'riesgo'] = None
+    return df.to_csv(index=False).encode()
+
+
+def test_trains_from_raw_upload_and_saves_threshold_sweep(tmp_path, monkeypatch, synthetic_dataset):
+    monkeypatch.chdir(tmp_path)
+    from src.app.app import create_app
+
+    client = create_app(prewarm=False).test_client()
+    with contextlib.redirect_stdout(io.StringIO()):
+        r = client.post('/api/upload', data={'file': (io.BytesIO(dirty_csv(synthetic_dataset)), 'crudo.csv')})
+        assert r.status_code == 200
+        r = client.post('/api/train_out_of_core', json={'filename': 'crudo.csv', 'chunksize': 400})
+        assert r.status_code == 200, r.get_json()
+        metrics = r.get_json()['metrics']
+
+        assert metrics['missing_values_handled'] > 0
+        assert metrics['n_train'] + metrics['n_test'] == 1500 - len(range(0, 1500, 23))
+        for key in ('n_iter', 'fit_time_s', 'roc_curve', 'pr_curve'):
+            assert metrics[key] is not None
+
+        r = client.get('/api/metrics/threshold?t=0.5')
+        assert r.status_code == 200
+        # El barrido con umbral 0.5 reproduce la matriz de confusión de predict
+        assert r.get_json()['metrics']['confusion_matrix'] == metrics['confusion_matrix']
+
+
+def test_sweep_from_counts_matches_sweep_on_grid_thresholds():
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, 2, 5000)
+    scores = np.round(rng.uniform(0, 1, 5000), 2)
+
+    exact = ThresholdSweep(y, scores)
+    bins = np.round(scores * 100).astype(int)
+    positives = np.bincount(bins[y == 1], minlength=101)
+    negatives = np.bincount(bins[y == 0], minlength=101)
+    binned = ThresholdSweep.from_counts(np.arange(101) / 100, positives, negatives)
+
+    for t in (0.0, 0.1, 0.37, 0.5, 0.9, 1.0):
+        assert binned.counts_at(t) == exact.counts_at(t)
+    assert binned.roc_curve()['auc'] == exact.roc_curve()['auc']
@@ -0,0 +1,33 @@
+"""
+Predicción de un estudiante con el modelo activo.
+"""
+import contextlib
+import io
+
+from src.config import FEATURE_COLUMNS
+from src.ml import prediction
+from src.ml.model_registry import registry
+from src.ml.training import train_model
+
+
+def test_predict_risk_loads_the_active_model_once(tmp_path, monkeypatch, synthetic_dataset):
+    monkeypatch.chdir(tmp_path)
+    df = synthetic_dataset(300)
+    with contextlib.redirect_stdout(io.StringIO()):
+        train_model(df)
+
+    calls = []
+    load_active = registry.load_active
+
+    def counting_load_active():
+        calls.append(1)
+        return load_active()
+
+    monkeypatch.setattr(registry, 'load_active', counting_load_active)
+    student = {col: df[col].iloc[0] for col in FEATURE_COLUMNS}
+    student['horas_estudio'] = None  # faltante: se valida con el mismo modelo
+
+    result = prediction.predict_risk(student, explain=2)
+    assert calls == [1]
+    assert result['prediction'] in (0, 1)
+    assert 0.0 <= result['probability_riesgo'] <= 1.0
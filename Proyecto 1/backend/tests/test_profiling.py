@@ -0,0 +1,43 @@
+"""
+Perfilado bajo demanda: un perfil a la vez y X-Request-ID validado.
+"""
+import re
+
+from src.app import profiling
+
+
+def make_client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from src.app.app import create_app
+
+    return create_app(prewarm=False, profiling=True).test_client()
+
+
+def test_request_id_is_used_only_if_valid(tmp_path, monkeypatch):
+    client = make_client(tmp_path, monkeypatch)
+
+    r = client.get('/api/health', headers={'X-Profile': '1', 'X-Request-ID': 'carga_42-a'})
+    assert r.headers['X-Profile-Id'] == 'carga_42-a'
+
+    for bad in ('a b', 'x' * 65, '<script>', ''):
+        r = client.get('/api/health', headers={'X-Profile': '1', 'X-Request-ID': bad})
+        assert re.fullmatch(r'[0-9a-f]{32}', r.headers['X-Profile-Id'])
+
+
+def test_profiled_request_is_skipped_while_another_runs(tmp_path, monkeypatch):
+    client = make_client(tmp_path, monkeypatch)
+
+    # Simula un perfil en curso en otro hilo
+    assert profiling._profiling_lock.acquire(blocking=False)
+    try:
+        r = client.get('/api/health?profile=1')
+        assert r.status_code == 200
+        assert 'X-Profile-Id' not in r.headers
+    finally:
+        profiling._profiling_lock.release()
+
+    # Al terminar cada perfil el lock queda libre para el siguiente
+    for _ in range(2):
+        r = client.get('/api/health?profile=1')
+        assert 'X-Profile-Id' in r.headers
+    assert not profiling._profiling_lock.locked()
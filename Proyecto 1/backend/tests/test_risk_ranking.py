@@ -0,0 +1,48 @@
+"""
+Ranking de riesgo: solo /api/risk/build puntúa y el archivo guardado no
+contiene las features de los estudiantes.
+"""
+import contextlib
+import io
+import os
+
+import numpy as np
+
+
+
+def test_reads_never_rescore_and_report_stale_ranking(tmp_path, monkeypatch, synthetic_dataset):
+    monkeypatch.chdir(tmp_path)
+    from src.app.app import create_app
+    from src.ml import risk_ranking as ranking_module
+
+    monkeypatch.setattr(ranking_module, 'risk_ranking', ranking_module.RiskRanking())
+    client = create_app(prewarm=False).test_client()
+    csv = synthetic_dataset(600, seed=5).to_csv(index=False).encode()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert client.post('/api/upload', data={'file': (io.BytesIO(csv), 'datos.csv')}).status_code == 200
+        assert client.post('/api/clean').status_code == 200
+        assert client.post('/api/train').status_code == 200
+        assert client.get('/api/risk/top?k=5').status_code == 404
+
+        r = client.post('/api/risk/build')
+        assert r.status_code == 200, r.get_json()
+        top = client.get('/api/risk/top?k=5').get_json()['results']
+        assert len(top) == 5
+        assert [row['probability_riesgo'] for row in top] == sorted(
+            (row['probability_riesgo'] for row in top), reverse=True)
+
+        with np.load(os.path.join('saved_models', 'risk_scores.npz')) as data:
+            assert sorted(data.files) == sorted(ranking_module.RiskRanking.STORED_KEYS)
+
+        # Un modelo nuevo deja el ranking viejo: las consultas no puntúan
+        scored = []
+        monkeypatch.setattr(ranking_module.RiskRanking, '_score',
+                            lambda self, features: scored.append(len(features)))
+        assert client.post('/api/train').status_code == 200
+        for url in ('/api/risk/top', '/api/risk/range?min=0.5', '/api/risk/page'):
+            r = client.get(url)
+            assert r.status_code == 409
+            assert r.get_json()['stale'] is True
+        assert scored == []
+        client.post('/api/reset')
@@ -0,0 +1,161 @@
+"""
+Carga concurrente sobre el estado de la API (snapshots).
+
+Varios hilos llaman a la vez /api/upload (dos archivos distintos),
+/api/clean, /api/reset, /api/data/info, /api/data/compare y /api/train
+un número fijo de veces, y se verifica que cada respuesta sea consistente
+consigo misma:
+
+- /api/data/compare nunca mezcla los datos originales de un archivo con
+  los limpios de otro
+- /api/data/info reporta el número de filas de uno de los dos archivos
+  (original o limpio), nunca un estado a medio actualizar
+- /api/clean responde 200, 400 o 409 (los datos cambiaron mientras limpiaba)
+- ninguna solicitud termina en 500
+- al final, los snapshots viejos se liberaron (live_snapshots() queda
+  solo con el actual)
+"""
+import contextlib
+import gc
+import io
+import random
+import threading
+
+import pandas as pd
+
+from src.data.data_cleaner import DataCleaner
+
+THREADS = 6
+ITERATIONS = 40
+
+
+def make_dataset(synthetic_dataset, rows, duplicates, seed):
+    df = synthetic_dataset(rows, seed=seed)
+    df = pd.concat([df, df.head(duplicates)], ignore_index=True)
+    raw = df.to_csv(index=False).encode()
+    with contextlib.redirect_stdout(io.StringIO()):
+        cleaned_rows = len(DataCleaner().clean_data(df))
+    return {"raw": raw, "rows": len(df), "cleaned_rows": cleaned_rows}
+
+
+def test_concurrent_requests_see_consistent_snapshots(tmp_path, monkeypatch, synthetic_dataset):
+    # uploads/ y saved_models/ son relativos al directorio actual
+    monkeypatch.chdir(tmp_path)
+    from src.app.app import create_app, snapshots
+
+    app = create_app(prewarm=False)
+    # snapshots es global del módulo: partir sin datos de otras pruebas
+    with contextlib.redirect_stdout(io.StringIO()):
+        app.test_client().post("/api/reset")
+
+    datasets = {
+        "a.csv": make_dataset(synthetic_dataset, 600, 40, seed=1),
+        "b.csv": make_dataset(synthetic_dataset, 900, 90, seed=2),
+    }
+    # filas originales -> filas limpias del mismo archivo
+    expected_pairs = {d["rows"]: d["cleaned_rows"] for d in datasets.values()}
+
+    errors = []
+    lock = threading.Lock()
+
+    def record(name, response, problem=None):
+        with lock:
+            if response.status_code >= 500:
+                errors.append(f"{name}: {response.status_code} {response.get_data(as_text=True)[:200]}")
+            if problem:
+                errors.append(f"{name}: {problem}")
+
+    def upload(client, rng):
+        name = rng.choice(list(datasets))
+        r = client.post("/api/upload", data={"file": (io.BytesIO(datasets[name]["raw"]), name)})
+        record("upload", r)
+
+    def clean(client, rng):
+        r = client.post("/api/clean")
+        problem = None
+        if r.status_code not in (200, 400, 409):
+            problem = f"estado inesperado {r.status_code}"
+        elif r.status_code == 200:
+            rows = r.get_json()["cleaned_info"]["total_rows"]
+            if rows not in expected_pairs.values():
+                problem = f"filas limpias inesperadas: {rows}"
+        record("clean", r, problem)
+
+    def reset(client, rng):
+        record("reset", client.post("/api/reset"))
+
+    def info(client, rng):
+        r = client.get("/api/data/info")
+        problem = None
+        if r.status_code == 200:
+            body = r.get_json()
+            rows = body["total_rows"]
+            valid = expected_pairs.values() if body["is_cleaned"] else expected_pairs
+            if rows not in valid:
+                problem = f"filas inesperadas: {rows} (is_cleaned={body['is_cleaned']})"
+        record("info", r, problem)
+
+    def compare(client, rng):
+        r = client.get("/api/data/compare")
+        problem = None
+        if r.status_code == 200:
+            body = r.get_json()
+            original, cleaned = body["original"]["rows"], body["cleaned"]["rows"]
+            if expected_pairs.get(original) != cleaned:
+                problem = f"original {original} con limpios {cleaned}"
+        record("compare", r, problem)
+
+    def train(client, rng):
+        record("train", client.post("/api/train_with_params", json={"max_iter": 200}))
+
+    actions = [upload, clean, clean, reset, info, info, compare, compare, train]
+
+    def worker(seed):
+        rng = random.Random(seed)
+        client = app.test_client()
+        try:
+            for _ in range(ITERATIONS):
+                rng.choice(actions)(client, rng)
+        except Exception as e:
+            with lock:
+                errors.append(f"hilo {seed}: {type(e).__name__}: {e}")
+
+    # Los endpoints imprimen mucho; se descarta la salida durante la carga
+    with contextlib.redirect_stdout(io.StringIO()):
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(THREADS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert not errors, f"{len(errors)} inconsistencias: {errors[:10]}"
+
+    gc.collect()
+    live = [snapshot.version for snapshot in snapshots.live_snapshots()]
+    assert live == [snapshots.current().version], f"snapshots viejos sin liberar: {live}"
+
+
+def test_reset_during_training_is_not_undone(tmp_path, monkeypatch, synthetic_dataset):
+    monkeypatch.chdir(tmp_path)
+    from src.app.app import create_app, snapshots
+    from src.ml import training
+
+    client = create_app(prewarm=False).test_client()
+    raw = synthetic_dataset(300, seed=4).to_csv(index=False).encode()
+
+    def train_then_reset(df, *args):
+        # Un /api/reset llega mientras se entrena
+        client.post("/api/reset")
+        return {"accuracy": 1.0}
+
+    monkeypatch.setattr(training, "train_model", train_then_reset)
+    monkeypatch.setattr(training, "train_model_with_params", train_then_reset)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for url in ("/api/train", "/api/train_with_params"):
+            assert client.post("/api/upload", data={"file": (io.BytesIO(raw), "datos.csv")}).status_code == 200
+            assert client.post("/api/clean").status_code == 200
+            r = client.post(url, json={})
+            assert r.status_code == 409, r.get_json()
+            assert snapshots.current().current_data is None
+            assert snapshots.current().last_metrics_results is None
@@ -0,0 +1,71 @@
+"""
+Arranque en frío: /api/health debe responder dentro del presupuesto y sin
+haber cargado pandas ni scikit-learn.
+
+Cada medición corre en un intérprete nuevo para medir imports reales. El
+presupuesto se puede ajustar con STUDENTGUARD_STARTUP_BUDGET_MS (por
+defecto 300 ms, mediana de STARTUP_RUNS corridas).
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from conftest import BACKEND_DIR
+
+STARTUP_BUDGET_MS = float(os.environ.get('STUDENTGUARD_STARTUP_BUDGET_MS', 300))
+STARTUP_RUNS = 3
+
+HEAVY_MODULES = ('pandas', 'sklearn')
+
+# Tiempo desde el primer import hasta la respuesta de /api/health (con precarga, como en producción)
+HEALTH_SCRIPT = r"""
+import json, time
+t0 = time.perf_counter()
+from src.app.app import app
+response = app.test_client().get('/api/health')
+print(json.dumps({
+    "status": response.status_code,
+    "health_ready_ms": (time.perf_counter() - t0) * 1000,
+}))
+"""
+
+# Módulos cargados después de create_app() (sin el hilo de precarga, que
+# importa scikit-learn a propósito)
+MODULES_SCRIPT = r"""
+import json, sys
+from src.app.app import create_app
+create_app(prewarm=False)
+print(json.dumps({"modules": sorted(name for name in sys.modules if "." not in name)}))
+"""
+
+
+def run_child(script, **env):
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **env},
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    # La última línea es el JSON (antes pueden salir prints del backend)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_health_ready_within_budget():
+    results = [run_child(HEALTH_SCRIPT) for _ in range(STARTUP_RUNS)]
+
+    assert all(r["status"] == 200 for r in results)
+    median = statistics.median(r["health_ready_ms"] for r in results)
+    assert median < STARTUP_BUDGET_MS, (
+        f"/api/health tardó {median:.1f} ms en arrancar (presupuesto {STARTUP_BUDGET_MS:.0f} ms)"
+    )
+
+
+def test_create_app_does_not_import_heavy_modules():
+    modules = run_child(MODULES_SCRIPT, STUDENTGUARD_PREWARM="0")["modules"]
+
+    heavy = [name for name in HEAVY_MODULES if name in modules]
+    assert not heavy, f"create_app() cargó {', '.join(heavy)}"
@@ -0,0 +1,31 @@
+"""
+Entrenamiento y comparación de motores.
+"""
+import contextlib
+import io
+
+from src.ml import engines
+from src.ml.training import compare_engines, train_model_with_params
+
+
+def test_latency_is_measured_only_when_comparing_engines(tmp_path, monkeypatch, synthetic_dataset):
+    monkeypatch.chdir(tmp_path)
+    calls = []
+    original = engines.predict_latency
+
+    def counting_latency(model, X, *args, **kwargs):
+        calls.append(len(X))
+        return original(model, X, single_repeats=1, batch_repeats=1)
+
+    monkeypatch.setattr('src.ml.training.predict_latency', counting_latency)
+    df = synthetic_dataset(400)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        metrics = train_model_with_params(df, {'engine': 'random_forest', 'n_estimators': 5})
+        assert 'predict_latency_ms' not in metrics
+        assert calls == []
+
+        report = compare_engines(df, ['logistic_regression', 'random_forest'],
+                                 {'random_forest': {'n_estimators': 5}})
+    assert len(calls) == 2
+    assert all(r['single_row_ms'] >= 0 and r['batch_10k_ms'] >= 0 for r in report['engines'])
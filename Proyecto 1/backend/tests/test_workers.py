@@ -0,0 +1,30 @@
+"""
+run_for_data: los datasets chicos se limpian en el hilo, los grandes en el
+pool de procesos (con el costo de ida y vuelta medido).
+"""
+import contextlib
+import io
+
+from src.app import workers
+
+
+def test_small_inputs_run_inline_and_large_ones_in_the_pool(monkeypatch, synthetic_dataset):
+    df = synthetic_dataset(200)
+    before = workers.transfer_stats()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        inline, _ = workers.run_for_data(workers.clean_in_worker, df)
+    stats = workers.transfer_stats()
+    assert stats['inline'] == before['inline'] + 1
+    assert stats['offloaded'] == before['offloaded']
+
+    monkeypatch.setattr(workers, 'PROCESS_MIN_CELLS', df.size)
+    try:
+        pooled, cleaner = workers.run_for_data(workers.clean_in_worker, df)
+    finally:
+        workers.shutdown()
+    stats = workers.transfer_stats()
+    assert stats['offloaded'] == before['offloaded'] + 1
+    assert stats['last_transfer_s'] >= 0
+    assert pooled.equals(inline)
+    assert cleaner.medians